@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
-from configuration.base import settings
+from configuration.base import get_settings
 from infrastructure.db.models import Base
 
 load_dotenv()
@@ -25,7 +25,7 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-config.set_main_option("sqlalchemy.url", settings.get_postgres_url_async)
+config.set_main_option("sqlalchemy.url", get_settings().get_postgres_url_async)
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
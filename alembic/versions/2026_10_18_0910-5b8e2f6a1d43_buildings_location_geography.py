@@ -0,0 +1,39 @@
+"""buildings location geography
+
+Revision ID: 5b8e2f6a1d43
+Revises: c27db30f22b9
+Create Date: 2026-10-18 09:10:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import geoalchemy2
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f6a1d43'
+down_revision: Union[str, Sequence[str], None] = 'c27db30f22b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS postgis')
+    # Генерируемая колонка: при добавлении PostgreSQL заполняет её
+    # для всех существующих строк из latitude/longitude
+    op.add_column('buildings', sa.Column(
+        'location',
+        geoalchemy2.types.Geography(geometry_type='POINT', srid=4326, spatial_index=False),
+        sa.Computed('ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography', persisted=True),
+        nullable=False,
+    ))
+    op.create_index('idx_buildings_location', 'buildings', ['location'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_buildings_location', table_name='buildings', postgresql_using='gist')
+    op.drop_column('buildings', 'location')
@@ -0,0 +1,49 @@
+"""activities ltree path
+
+Revision ID: 9a7c3e1b2f58
+Revises: 5b8e2f6a1d43
+Create Date: 2026-10-18 09:40:31.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7c3e1b2f58'
+down_revision: Union[str, Sequence[str], None] = '5b8e2f6a1d43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS ltree')
+    op.execute('ALTER TABLE activities ADD COLUMN path ltree')
+    # Метка узла - его ID без дефисов, путь строится от корня
+    op.execute("""
+        WITH RECURSIVE tree AS (
+            SELECT id, text2ltree(replace(id::text, '-', '')) AS path
+            FROM activities
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT a.id, tree.path || replace(a.id::text, '-', '')
+            FROM activities a
+            JOIN tree ON a.parent_id = tree.id
+        )
+        UPDATE activities
+        SET path = tree.path
+        FROM tree
+        WHERE activities.id = tree.id
+    """)
+    op.alter_column('activities', 'path', nullable=False)
+    op.create_index('ix_activities_path', 'activities', ['path'], unique=False, postgresql_using='gist')
+    op.create_index('ix_organization_activities_activity_id', 'organization_activities', ['activity_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organization_activities_activity_id', table_name='organization_activities')
+    op.drop_index('ix_activities_path', table_name='activities', postgresql_using='gist')
+    op.drop_column('activities', 'path')
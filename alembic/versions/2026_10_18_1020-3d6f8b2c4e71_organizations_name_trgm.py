@@ -0,0 +1,31 @@
+"""organizations name trgm
+
+Revision ID: 3d6f8b2c4e71
+Revises: 9a7c3e1b2f58
+Create Date: 2026-10-18 10:20:12.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d6f8b2c4e71'
+down_revision: Union[str, Sequence[str], None] = '9a7c3e1b2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_organizations_name_trgm', 'organizations', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organizations_name_trgm', table_name='organizations', postgresql_using='gin')
@@ -0,0 +1,55 @@
+"""organization counts
+
+Revision ID: 7e2a9c4d1b06
+Revises: 3d6f8b2c4e71
+Create Date: 2026-10-18 11:40:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2a9c4d1b06'
+down_revision: Union[str, Sequence[str], None] = '3d6f8b2c4e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'building_organization_counts',
+        sa.Column('building_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organizations', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('building_id'),
+    )
+    op.create_table(
+        'activity_organization_counts',
+        sa.Column('activity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organizations', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['activity_id'], ['activities.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('activity_id'),
+    )
+    op.execute("""
+        INSERT INTO building_organization_counts (building_id, organizations)
+        SELECT building_id, count(*) FROM organizations GROUP BY building_id
+    """)
+    # Организация учитывается у каждого предка своих видов деятельности один раз
+    op.execute("""
+        INSERT INTO activity_organization_counts (activity_id, organizations)
+        SELECT a.id, count(DISTINCT oa.organization_id)
+        FROM organization_activities oa
+        JOIN activities leaf ON leaf.id = oa.activity_id
+        JOIN activities a ON a.path @> leaf.path
+        GROUP BY a.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('activity_organization_counts')
+    op.drop_table('building_organization_counts')
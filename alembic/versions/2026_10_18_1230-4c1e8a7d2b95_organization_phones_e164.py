@@ -0,0 +1,52 @@
+"""organization phones e164
+
+Revision ID: 4c1e8a7d2b95
+Revises: 7e2a9c4d1b06
+Create Date: 2026-10-18 12:30:44.913062
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e8a7d2b95'
+down_revision: Union[str, Sequence[str], None] = '7e2a9c4d1b06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('organization_phones', sa.Column('phone_e164', sa.String(length=16), nullable=True))
+    # Как domain.phones.normalize_phone: +7 и 10 цифр номера; у записей в обход API
+    # с лишними цифрами берутся последние 10
+    op.execute(r"""
+        UPDATE organization_phones
+        SET phone_e164 = '+7' || right(regexp_replace(phone, '\D', '', 'g'), 10)
+    """)
+    # Разные записи одного номера у организации схлопываются в одну
+    op.execute("""
+        DELETE FROM organization_phones a
+        USING organization_phones b
+        WHERE a.organization_id = b.organization_id AND a.phone_e164 = b.phone_e164 AND a.id > b.id
+    """)
+    op.alter_column('organization_phones', 'phone_e164', nullable=False)
+    op.drop_constraint('uq_org_phone_unique', 'organization_phones', type_='unique')
+    op.create_unique_constraint('uq_org_phone_unique', 'organization_phones', ['organization_id', 'phone_e164'])
+    op.drop_index('ix_organization_phones_phone', table_name='organization_phones')
+    op.create_index(
+        'ix_organization_phones_phone_e164', 'organization_phones', ['phone_e164'], unique=False,
+        postgresql_include=['organization_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organization_phones_phone_e164', table_name='organization_phones')
+    op.create_index('ix_organization_phones_phone', 'organization_phones', ['phone'], unique=False)
+    op.drop_constraint('uq_org_phone_unique', 'organization_phones', type_='unique')
+    op.create_unique_constraint('uq_org_phone_unique', 'organization_phones', ['organization_id', 'phone'])
+    op.drop_column('organization_phones', 'phone_e164')
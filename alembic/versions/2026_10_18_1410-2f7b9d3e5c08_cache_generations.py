@@ -0,0 +1,32 @@
+"""cache generations
+
+Revision ID: 2f7b9d3e5c08
+Revises: 8b5d2f9e6a14
+Create Date: 2026-10-18 14:10:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7b9d3e5c08'
+down_revision: Union[str, Sequence[str], None] = '8b5d2f9e6a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'cache_generations',
+        sa.Column('key', sa.Text(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cache_generations')
@@ -0,0 +1,184 @@
+"""
+Сравнение выборки организаций по поддереву видов деятельности:
+рекурсивный CTE + IN-список (прежний план) против фильтра по ltree-пути.
+
+Данные генерируются в отдельной схеме, рабочие таблицы не затрагиваются:
+
+    python -m benchmarks.activity_subtree --activities 10000 --links 1000000
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from configuration.base import get_settings
+from infrastructure.db.database import Database
+
+SCHEMA = "bench_activity_subtree"
+
+CTE_DESCENDANTS = text("""
+    WITH RECURSIVE descendants AS (
+        SELECT id FROM activities WHERE id = :root
+        UNION ALL
+        SELECT a.id FROM activities a JOIN descendants d ON a.parent_id = d.id
+    )
+    SELECT id FROM descendants
+""")
+
+CTE_ORGANIZATIONS = text("""
+    SELECT o.id, o.name
+    FROM organizations o
+    WHERE EXISTS (
+        SELECT 1 FROM organization_activities oa
+        WHERE oa.organization_id = o.id AND oa.activity_id = ANY(:ids)
+    )
+    ORDER BY o.name, o.id
+    LIMIT :limit
+""")
+
+PATH_ORGANIZATIONS = text("""
+    SELECT o.id, o.name
+    FROM organizations o
+    WHERE o.id IN (
+        SELECT oa.organization_id
+        FROM organization_activities oa
+        JOIN activities a ON a.id = oa.activity_id
+        WHERE a.path <@ (SELECT path FROM activities WHERE id = :root)
+    )
+    ORDER BY o.name, o.id
+    LIMIT :limit
+""")
+
+
+def _branching(activities: int) -> int:
+    """Число детей на узел, при котором дерево из 3 уровней близко к activities узлам"""
+    b = 1
+    while (b + 1) + (b + 1) ** 2 + (b + 1) ** 3 <= activities:
+        b += 1
+    return b
+
+
+async def _generate(conn: AsyncConnection, activities: int, links: int, links_per_org: int) -> None:
+    b = _branching(activities)
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+    await conn.execute(text("""
+        CREATE TABLE activities (
+            id uuid PRIMARY KEY,
+            name text NOT NULL UNIQUE,
+            parent_id uuid REFERENCES activities (id),
+            path ltree NOT NULL
+        )
+    """))
+    await conn.execute(text("CREATE TABLE organizations (id uuid PRIMARY KEY, name text NOT NULL UNIQUE)"))
+    await conn.execute(text("""
+        CREATE TABLE organization_activities (
+            organization_id uuid NOT NULL,
+            activity_id uuid NOT NULL,
+            PRIMARY KEY (organization_id, activity_id)
+        )
+    """))
+    await conn.execute(text("""
+        INSERT INTO activities
+        SELECT s.id, 'activity-' || s.n, NULL, text2ltree(replace(s.id::text, '-', ''))
+        FROM (SELECT gen_random_uuid() AS id, n FROM generate_series(1, :b) n) s
+    """), {"b": b})
+    for level in (1, 2):
+        await conn.execute(text("""
+            INSERT INTO activities
+            SELECT s.id, p.name || '-' || s.n, p.id, p.path || replace(s.id::text, '-', '')
+            FROM activities p
+            CROSS JOIN LATERAL (SELECT gen_random_uuid() AS id, n FROM generate_series(1, :b) n) s
+            WHERE nlevel(p.path) = :level
+        """), {"b": b, "level": level})
+    await conn.execute(text("""
+        INSERT INTO organizations
+        SELECT gen_random_uuid(), 'organization-' || n FROM generate_series(1, :count) n
+    """), {"count": links // links_per_org})
+    await conn.execute(text("""
+        WITH ids AS (SELECT array_agg(id) AS arr FROM activities)
+        INSERT INTO organization_activities
+        SELECT o.id, ids.arr[1 + floor(random() * array_length(ids.arr, 1))::int]
+        FROM organizations o, ids, generate_series(1, :per_org)
+        ON CONFLICT DO NOTHING
+    """), {"per_org": links_per_org})
+    await conn.execute(text("CREATE INDEX ON activities USING gist (path)"))
+    await conn.execute(text("CREATE INDEX ON organization_activities (activity_id)"))
+    await conn.execute(text("ANALYZE"))
+    await conn.commit()
+
+
+async def _time_cte(conn: AsyncConnection, root, limit: int) -> float:
+    started = time.perf_counter()
+    ids = (await conn.execute(CTE_DESCENDANTS, {"root": root})).scalars().all()
+    (await conn.execute(CTE_ORGANIZATIONS, {"ids": list(ids), "limit": limit})).all()
+    return (time.perf_counter() - started) * 1000
+
+
+async def _time_path(conn: AsyncConnection, root, limit: int) -> float:
+    started = time.perf_counter()
+    (await conn.execute(PATH_ORGANIZATIONS, {"root": root, "limit": limit})).all()
+    return (time.perf_counter() - started) * 1000
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    database = Database(get_settings())
+    try:
+        async with database.engine.connect() as conn:
+            if not args.reuse:
+                await _generate(conn, args.activities, args.links, args.links_per_org)
+            await conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+            counts = (await conn.execute(text(
+                "SELECT (SELECT count(*) FROM activities), (SELECT count(*) FROM organization_activities)"
+            ))).one()
+            results = {"activities": counts[0], "links": counts[1], "levels": {}}
+            for level in (1, 2, 3):
+                roots = (await conn.execute(
+                    text("SELECT id FROM activities WHERE nlevel(path) = :level"), {"level": level}
+                )).scalars().all()
+                roots = random.sample(list(roots), min(args.samples, len(roots)))
+                cte, path = [], []
+                for root in roots:
+                    for _ in range(args.repeat):
+                        cte.append(await _time_cte(conn, root, args.limit))
+                        path.append(await _time_path(conn, root, args.limit))
+                results["levels"][level] = {"cte": _summary(cte), "path": _summary(path)}
+            if not args.keep:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+                await conn.commit()
+    finally:
+        await database.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activities", type=int, default=10_000)
+    parser.add_argument("--links", type=int, default=1_000_000)
+    parser.add_argument("--links-per-org", type=int, default=2)
+    parser.add_argument("--samples", type=int, default=20, help="Корней на каждый уровень дерева")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50, help="Размер страницы, как у API")
+    parser.add_argument("--keep", action="store_true", help="Не удалять схему с данными")
+    parser.add_argument("--reuse", action="store_true", help="Использовать ранее сохранённую схему")
+    results = asyncio.run(run(parser.parse_args()))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Генератор синтетических данных для нагрузочных тестов.
+
+Здания разбросаны вокруг крупных городов России, виды деятельности образуют
+дерево из 3 уровней, у организаций несколько телефонов и видов деятельности.
+Всё загружается многострочными INSERT пачками в рабочие таблицы:
+
+    python -m benchmarks.generate_data --buildings 50000 --organizations 200000 --truncate
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections.abc import Iterator
+
+from sqlalchemy import insert, text, Table
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from configuration.base import get_settings
+from domain.phones import unique_phones
+from infrastructure.db.database import Database
+from infrastructure.db.models import (
+    BuildingModel, ActivityModel, OrganizationModel, OrganizationPhoneModel, organization_activities,
+)
+from infrastructure.db.types import child_path
+from infrastructure.repositories.organization_counts import rebuild_counts
+
+# Город, широта, долгота центра и разброс в градусах
+CITIES = (
+    ("Москва", 55.7558, 37.6173, 0.30),
+    ("Санкт-Петербург", 59.9343, 30.3351, 0.25),
+    ("Новосибирск", 55.0084, 82.9357, 0.20),
+    ("Екатеринбург", 56.8389, 60.6057, 0.18),
+    ("Казань", 55.7963, 49.1088, 0.15),
+    ("Нижний Новгород", 56.2965, 43.9361, 0.15),
+    ("Челябинск", 55.1644, 61.4368, 0.15),
+    ("Самара", 53.1959, 50.1002, 0.15),
+    ("Ростов-на-Дону", 47.2357, 39.7015, 0.15),
+    ("Уфа", 54.7388, 55.9721, 0.15),
+    ("Красноярск", 56.0153, 92.8932, 0.15),
+    ("Пермь", 58.0105, 56.2502, 0.12),
+    ("Воронеж", 51.6720, 39.1843, 0.12),
+    ("Волгоград", 48.7080, 44.5133, 0.15),
+    ("Саратов", 51.5406, 46.0086, 0.10),
+)
+# Веса городов примерно по численности населения
+CITY_WEIGHTS = (13, 5.6, 1.6, 1.5, 1.3, 1.2, 1.2, 1.2, 1.1, 1.1, 1.1, 1.0, 1.0, 1.0, 0.9)
+
+STREETS = (
+    "ул. Ленина", "ул. Советская", "ул. Мира", "пр. Кирова", "ул. Гагарина", "ул. Пушкина", "Невский пр.",
+    "ул. Баумана", "Красный пр.", "ул. Садовая", "ул. Лесная", "ул. Молодёжная", "ул. Школьная", "ул. Победы",
+)
+
+ACTIVITY_ROOTS = (
+    "Еда", "Автомобили", "Строительство", "Розничная торговля", "Медицина", "Образование", "IT",
+    "Финансы", "Красота", "Спорт", "Туризм", "Логистика",
+)
+ACTIVITY_WORDS = (
+    "Оптовая", "Розничная", "Сервис", "Производство", "Ремонт", "Доставка", "Консалтинг", "Аренда",
+    "Продажа", "Обслуживание", "Монтаж", "Обучение",
+)
+
+ORGANIZATION_FORMS = ("ООО", "АО", "ИП", "ПАО", "НКО")
+ORGANIZATION_WORDS = (
+    "Рога и Копыта", "Вектор", "Альфа", "Северный ветер", "Гранит", "Меридиан", "Прогресс", "Восход",
+    "СтройМаркет", "Пышки и Кофе", "КазанСофт", "СибирьСтрой", "Технопарк", "Лидер", "Горизонт",
+)
+
+
+def _chunks(rows: list[dict], size: int) -> Iterator[list[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def _insert(conn: AsyncConnection, table: Table, rows: list[dict], batch_size: int) -> None:
+    for chunk in _chunks(rows, batch_size):
+        await conn.execute(insert(table), chunk)
+
+
+def _buildings(rng: random.Random, count: int) -> list[dict]:
+    rows = []
+    for i in range(count):
+        city, lat, lon, spread = rng.choices(CITIES, weights=CITY_WEIGHTS)[0]
+        rows.append({
+            "id": uuid.uuid4(),
+            "address": f"г. {city}, {rng.choice(STREETS)}, {i + 1}",
+            "latitude": round(rng.gauss(lat, spread / 2), 6),
+            "longitude": round(rng.gauss(lon, spread / 2), 6),
+        })
+    return rows
+
+
+def _activities(branching: int) -> list[dict]:
+    """Дерево из 3 уровней: корни из ACTIVITY_ROOTS и по branching детей на узел"""
+    rows = []
+
+    def add(name: str, parent: dict | None) -> dict:
+        activity_id = uuid.uuid4()
+        row = {
+            "id": activity_id,
+            "name": name,
+            "parent_id": parent["id"] if parent else None,
+            "path": child_path(parent["path"] if parent else None, activity_id),
+        }
+        rows.append(row)
+        return row
+
+    for root_name in ACTIVITY_ROOTS:
+        root = add(root_name, None)
+        for i in range(branching):
+            child = add(f"{root_name}: {ACTIVITY_WORDS[i % len(ACTIVITY_WORDS)]} {i + 1}", root)
+            for j in range(branching):
+                add(f"{child['name']}.{j + 1}", child)
+    return rows
+
+
+def _phone(rng: random.Random) -> str:
+    digits = [rng.randint(0, 9) for _ in range(7)]
+    return f"+7 ({rng.randint(900, 999)}) {digits[0]}{digits[1]}{digits[2]}-{digits[3]}{digits[4]}-{digits[5]}{digits[6]}"
+
+
+def _organizations(
+    rng: random.Random, count: int, buildings: list[dict], activities: list[dict], max_phones: int, max_activities: int,
+) -> tuple[list[dict], list[dict], list[dict]]:
+    organizations, phones, links = [], [], []
+    for i in range(count):
+        organization_id = uuid.uuid4()
+        organizations.append({
+            "id": organization_id,
+            "name": f"{rng.choice(ORGANIZATION_FORMS)} «{rng.choice(ORGANIZATION_WORDS)} {i + 1}»",
+            "building_id": rng.choice(buildings)["id"],
+        })
+        for phone_e164, phone in unique_phones(_phone(rng) for _ in range(rng.randint(1, max_phones))).items():
+            phones.append({
+                "id": uuid.uuid4(), "organization_id": organization_id, "phone": phone, "phone_e164": phone_e164,
+            })
+        for activity in rng.sample(activities, rng.randint(1, max_activities)):
+            links.append({"organization_id": organization_id, "activity_id": activity["id"]})
+    return organizations, phones, links
+
+
+async def generate(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    buildings = _buildings(rng, args.buildings)
+    activities = _activities(args.branching)
+    organizations, phones, links = _organizations(
+        rng, args.organizations, buildings, activities, args.max_phones, args.max_activities,
+    )
+
+    database = Database(get_settings())
+    try:
+        async with database.engine.begin() as conn:
+            existing = (await conn.execute(text("SELECT count(*) FROM organizations"))).scalar_one()
+            if existing and not args.truncate:
+                raise SystemExit("В БД уже есть организации, запустите с --truncate, чтобы очистить таблицы")
+            if args.truncate:
+                await conn.execute(text(
+                    "TRUNCATE organization_activities, organization_phones, organizations, activities, buildings CASCADE"
+                ))
+            await _insert(conn, BuildingModel.__table__, buildings, args.batch_size)
+            await _insert(conn, ActivityModel.__table__, activities, args.batch_size)
+            await _insert(conn, OrganizationModel.__table__, organizations, args.batch_size)
+            await _insert(conn, OrganizationPhoneModel.__table__, phones, args.batch_size)
+            await _insert(conn, organization_activities, links, args.batch_size)
+            for stmt in rebuild_counts():
+                await conn.execute(stmt)
+        async with database.engine.connect() as conn:
+            await conn.execute(text("ANALYZE"))
+            await conn.commit()
+    finally:
+        await database.dispose()
+    return {
+        "buildings": len(buildings),
+        "activities": len(activities),
+        "organizations": len(organizations),
+        "phones": len(phones),
+        "links": len(links),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buildings", type=int, default=50_000)
+    parser.add_argument("--organizations", type=int, default=200_000)
+    parser.add_argument("--branching", type=int, default=6, help="Детей у каждого узла дерева деятельности")
+    parser.add_argument("--max-phones", type=int, default=3)
+    parser.add_argument("--max-activities", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="Очистить таблицы перед загрузкой")
+    print(json.dumps(asyncio.run(generate(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+"""
+Нагрузочный тест HTTP API: прогоняет все маршруты зданий, видов деятельности
+и организаций с заданной конкурентностью и считает p50/p95/p99 и пропускную способность.
+
+Сервер должен быть запущен заранее, данные - сгенерированы benchmarks.generate_data.
+Образцы ID и названий берутся через само API. Результаты пишутся в JSON
+вместе с коммитом, чтобы сравнивать прогоны между коммитами:
+
+    python -m benchmarks.load --concurrency 32 --requests 2000 --output before.json
+    python -m benchmarks.load --concurrency 32 --requests 2000 --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import urlencode, urlsplit, quote
+
+from configuration.base import get_settings
+from infrastructure.db.geo import point_tiles
+
+# Выгрузка читает всю таблицу, поэтому для неё число запросов ограничено
+EXPORT_REQUESTS = 5
+
+
+class HttpError(Exception):
+    """Сервер вернул некорректный ответ или закрыл соединение"""
+
+
+class HttpConnection:
+    """
+    Минимальный клиент HTTP/1.1 с keep-alive поверх asyncio-потоков
+    Нужен, чтобы не тянуть HTTP-библиотеку в зависимости проекта
+    """
+
+    def __init__(self, host: str, port: int, headers: dict[str, str]):
+        self.host = host
+        self.port = port
+        self.headers = headers
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def request(self, method: str, path: str, body: Any = None) -> tuple[int, bytes]:
+        try:
+            return await self._request(method, path, body)
+        except (ConnectionError, asyncio.IncompleteReadError, HttpError):
+            await self.close()
+            raise
+
+    async def _request(self, method: str, path: str, body: Any) -> tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = b"" if body is None else json.dumps(body).encode()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(payload)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in self.headers.items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HttpError("Соединение закрыто сервером")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304):
+            data = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            data = await self._read_chunked()
+        elif "content-length" in response_headers:
+            data = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            data = await self.reader.read()
+            await self.close()
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, data
+
+    async def _read_chunked(self) -> bytes:
+        parts = []
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Завершающие заголовки не используются
+                while await self.reader.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(parts)
+            parts.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+@dataclass
+class Sample:
+    """Реальные ID и названия, на которых строятся запросы"""
+    buildings: list[dict]
+    organizations: list[dict]
+    activities: list[dict]
+    # Виды деятельности, созданные во время прогона: их безопасно удалять
+    created_activity_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Возвращает путь с query-строкой и тело запроса
+    build: Callable[[random.Random, Sample], tuple[str, Any]]
+    write: bool = False
+    max_requests: int | None = None
+    # Коды ответов, которые не считаются ошибкой (например, 404 при удалении)
+    ok_statuses: tuple[int, ...] = ()
+
+
+def _query(path: str, **params: Any) -> str:
+    return f"{path}?{urlencode({k: v for k, v in params.items() if v is not None})}"
+
+
+def _point(rng: random.Random, sample: Sample) -> tuple[float, float]:
+    building = rng.choice(sample.buildings)
+    return building["latitude"], building["longitude"]
+
+
+def _square(rng: random.Random, sample: Sample, half: float = 0.02) -> dict[str, float]:
+    lat, lon = _point(rng, sample)
+    return {"lat_min": lat - half, "lon_min": lon - half, "lat_max": lat + half, "lon_max": lon + half}
+
+
+def _circle(rng: random.Random, sample: Sample, radius: float = 2000) -> dict[str, float]:
+    lat, lon = _point(rng, sample)
+    return {"lat": lat, "lon": lon, "radius": radius}
+
+
+def _batch(rng: random.Random, items: list[dict], size: int = 50) -> dict:
+    return {"ids": [item["id"] for item in rng.sample(items, min(size, len(items)))]}
+
+
+def _name_prefix(rng: random.Random, sample: Sample) -> str:
+    # Пропускаем организационно-правовую форму, чтобы префикс был избирательным
+    name = rng.choice(sample.organizations)["name"]
+    return name.split("«", 1)[-1][:4]
+
+
+def _create_building(rng: random.Random, sample: Sample) -> tuple[str, Any]:
+    lat, lon = _point(rng, sample)
+    return "/buildings/", {"address": f"bench {uuid.uuid4().hex}", "latitude": lat, "longitude": lon}
+
+
+def _create_activity(rng: random.Random, sample: Sample) -> tuple[str, Any]:
+    return "/activities/", {"name": f"bench-{uuid.uuid4().hex}"}
+
+
+def _delete_activity(rng: random.Random, sample: Sample) -> tuple[str, Any]:
+    activity_id = sample.created_activity_ids.pop() if sample.created_activity_ids else str(uuid.uuid4())
+    return f"/activities/{activity_id}", None
+
+
+def _nearest(rng: random.Random, sample: Sample) -> tuple[str, Any]:
+    lat, lon = _point(rng, sample)
+    return _query("/organization/geo/nearest", lat=lat, lon=lon, k=10), None
+
+
+def _clusters(rng: random.Random, sample: Sample) -> tuple[str, Any]:
+    # Окно карты примерно 1920x1080 на zoom 11
+    lat, lon = _point(rng, sample)
+    bbox = f"{lon - 0.33},{lat - 0.1},{lon + 0.33},{lat + 0.1}"
+    return _query("/organization/geo/clusters", bbox=bbox, zoom=11), None
+
+
+def _by_phone(rng: random.Random, sample: Sample) -> tuple[str, Any]:
+    # Номер в другой записи, чем сохранён: 8XXXXXXXXXX
+    phones = [phone for org in sample.organizations for phone in org["phones"]] or ["+7 (900) 000-00-00"]
+    digits = "".join(char for char in rng.choice(phones) if char.isdigit())
+    return f"/organization/by-phone/{quote('8' + digits[-10:])}", None
+
+
+def _tile(rng: random.Random, sample: Sample) -> tuple[str, Any]:
+    lat, lon = _point(rng, sample)
+    z = rng.randint(10, 16)
+    ((x, y),) = point_tiles(lat, lon, z)
+    return f"/tiles/{z}/{x}/{y}.mvt", None
+
+
+def _create_organization(rng: random.Random, sample: Sample) -> tuple[str, Any]:
+    return "/organization/", {
+        "name": f"bench-{uuid.uuid4().hex}",
+        "building_id": rng.choice(sample.buildings)["id"],
+        "phones": [f"+7 ({rng.randint(900, 999)}) {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}"],
+        "activity_ids": [a["id"] for a in rng.sample(sample.activities, min(2, len(sample.activities)))],
+    }
+
+
+SCENARIOS: list[Scenario] = [
+    # Здания
+    Scenario("buildings.create", "POST", _create_building, write=True),
+    Scenario("buildings.get", "GET", lambda rng, s: (f"/buildings/{rng.choice(s.buildings)['id']}", None)),
+    Scenario("buildings.list", "GET", lambda rng, s: (_query("/buildings/", limit=50), None)),
+    Scenario("buildings.batch", "POST", lambda rng, s: ("/buildings/batch", _batch(rng, s.buildings))),
+    Scenario("buildings.geo.square", "GET", lambda rng, s: (_query("/buildings/geo/square", **_square(rng, s), limit=50), None)),
+    Scenario("buildings.geo.radius", "GET", lambda rng, s: (
+        _query("/buildings/geo/radius", **_circle(rng, s), limit=50), None,
+    )),
+    # Виды деятельности
+    Scenario("activities.create", "POST", _create_activity, write=True),
+    Scenario("activities.get", "GET", lambda rng, s: (f"/activities/{rng.choice(s.activities)['id']}", None)),
+    Scenario("activities.children", "GET", lambda rng, s: (_query("/activities/", parent_id=rng.choice(s.activities)["id"]), None)),
+    Scenario("activities.subtree", "GET", lambda rng, s: (f"/activities/{rng.choice(s.activities)['id']}/subtree", None)),
+    Scenario("activities.subtree.by_name", "GET", lambda rng, s: (
+        _query("/activities/subtree/by-name", name=rng.choice(s.activities)["name"]), None,
+    )),
+    Scenario("activities.batch", "POST", lambda rng, s: ("/activities/batch", _batch(rng, s.activities))),
+    Scenario("activities.delete", "DELETE", _delete_activity, write=True, ok_statuses=(404,)),
+    # Организации
+    Scenario("organizations.create", "POST", _create_organization, write=True),
+    Scenario("organizations.get", "GET", lambda rng, s: (f"/organization/{rng.choice(s.organizations)['id']}", None)),
+    Scenario("organizations.get.include_all", "GET", lambda rng, s: (
+        _query(f"/organization/{rng.choice(s.organizations)['id']}", include="building,phones,activities"), None,
+    )),
+    Scenario("organizations.batch", "POST", lambda rng, s: ("/organization/batch", _batch(rng, s.organizations))),
+    Scenario("organizations.list", "GET", lambda rng, s: (_query("/organization/", limit=50), None)),
+    Scenario("organizations.by_building", "GET", lambda rng, s: (
+        _query(f"/organization/building/{rng.choice(s.buildings)['id']}", limit=50), None,
+    )),
+    Scenario("organizations.by_activity", "GET", lambda rng, s: (
+        _query(f"/organization/by-activity/{rng.choice(s.activities)['id']}", limit=50), None,
+    )),
+    Scenario("organizations.by_activity_name", "GET", lambda rng, s: (
+        _query("/organization/by-activity-name", name=rng.choice(s.activities)["name"], limit=50), None,
+    )),
+    Scenario("organizations.count.by_building", "GET", lambda rng, s: (
+        f"/organization/count/by-building/{rng.choice(s.buildings)['id']}", None,
+    )),
+    Scenario("organizations.count.by_activity", "GET", lambda rng, s: (
+        f"/organization/count/by-activity/{rng.choice(s.activities)['id']}", None,
+    )),
+    Scenario("organizations.by_phone", "GET", _by_phone),
+    Scenario("organizations.search.name", "GET", lambda rng, s: (
+        _query("/organization/search/name", name=rng.choice(s.organizations)["name"]), None,
+    )),
+    Scenario("organizations.search.prefix", "GET", lambda rng, s: (
+        _query("/organization/search", q=_name_prefix(rng, s), mode="prefix", limit=20), None,
+    )),
+    Scenario("organizations.search.fuzzy", "GET", lambda rng, s: (
+        _query("/organization/search", q=_name_prefix(rng, s), mode="fuzzy", limit=20), None,
+    )),
+    Scenario("organizations.query", "GET", lambda rng, s: (
+        _query("/organization/query", activity_id=rng.choice(s.activities)["id"], **_square(rng, s, 0.1), limit=50), None,
+    )),
+    Scenario("organizations.geo.square", "GET", lambda rng, s: (
+        _query("/organization/geo/square", **_square(rng, s), limit=50), None,
+    )),
+    Scenario("organizations.geo.radius", "GET", lambda rng, s: (
+        _query("/organization/geo/radius", **_circle(rng, s), limit=50), None,
+    )),
+    Scenario("organizations.geo.nearest", "GET", _nearest),
+    Scenario("organizations.geo.clusters", "GET", _clusters),
+    Scenario("tiles.buildings", "GET", _tile),
+    Scenario("organizations.export", "GET", lambda rng, s: ("/organization/export", None), max_requests=EXPORT_REQUESTS),
+]
+
+
+async def _load_sample(conn: HttpConnection, size: int) -> Sample:
+    """Набрать образцы данных через API"""
+    status, body = await conn.request("GET", _query("/buildings/", limit=size))
+    if status != 200:
+        raise SystemExit(f"Не удалось получить здания: HTTP {status} {body[:200]!r}")
+    buildings = json.loads(body)["buildings"]
+    status, body = await conn.request("GET", _query("/organization/", limit=size, include="phones,activities"))
+    if status != 200:
+        raise SystemExit(f"Не удалось получить организации: HTTP {status} {body[:200]!r}")
+    organizations = json.loads(body)["organizations"]
+    activities = list({a["id"]: a for org in organizations for a in org["activities"]}.values())
+    if not buildings or not organizations or not activities:
+        raise SystemExit("В БД нет данных, сначала запустите python -m benchmarks.generate_data")
+    return Sample(buildings=buildings, organizations=organizations, activities=activities)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_scenario(
+    scenario: Scenario, connections: list[HttpConnection], sample: Sample, requests: int, rng: random.Random,
+) -> dict:
+    total = min(requests, scenario.max_requests or requests)
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    remaining = total
+
+    async def worker(conn: HttpConnection) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            path, body = scenario.build(rng, sample)
+            started = time.perf_counter()
+            try:
+                status, data = await conn.request(scenario.method, path, body)
+            except (OSError, asyncio.IncompleteReadError, HttpError) as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if status >= 400 and status not in scenario.ok_statuses:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+            elif scenario.name == "activities.create":
+                sample.created_activity_ids.append(json.loads(data)["id"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(conn) for conn in connections[:total]))
+    elapsed = time.perf_counter() - started
+    result = {"requests": total, "errors": errors, "seconds": round(elapsed, 3), "rps": round(total / elapsed, 1)}
+    if latencies:
+        result.update({
+            f"{name}_ms": round(value * 1000, 2) for name, value in (
+                ("p50", _percentile(latencies, 0.50)),
+                ("p95", _percentile(latencies, 0.95)),
+                ("p99", _percentile(latencies, 0.99)),
+                ("mean", statistics.fmean(latencies)),
+                ("max", max(latencies)),
+            )
+        })
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: dict, baseline: dict | None) -> None:
+    header = f"{'scenario':<36}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in results["scenarios"].items():
+        line = (
+            f"{name:<36}{stats['rps']:>9}{stats.get('p50_ms', '-'):>10}"
+            f"{stats.get('p95_ms', '-'):>10}{stats.get('p99_ms', '-'):>10}{sum(stats['errors'].values()):>8}"
+        )
+        before = (baseline or {}).get("scenarios", {}).get(name)
+        if before and "p95_ms" in before and "p95_ms" in stats:
+            line += (
+                f"   p95 {(stats['p95_ms'] / before['p95_ms'] - 1) * 100:+.1f}%"
+                f"   rps {(stats['rps'] / before['rps'] - 1) * 100:+.1f}%"
+            )
+        print(line)
+    if baseline:
+        print(f"\nБазовый прогон: коммит {baseline.get('commit')}, {baseline.get('timestamp')}")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    url = urlsplit(args.base_url)
+    headers = {"X-API-Key": args.api_key, "Connection": "keep-alive"}
+    connections = [HttpConnection(url.hostname, url.port or 80, headers) for _ in range(args.concurrency)]
+    rng = random.Random(args.seed)
+    selected = [
+        scenario for scenario in SCENARIOS
+        if not (args.read_only and scenario.write)
+        and (not args.scenario or any(scenario.name.startswith(prefix) for prefix in args.scenario))
+    ]
+    try:
+        sample = await _load_sample(connections[0], args.sample_size)
+        scenarios = {}
+        for scenario in selected:
+            if args.warmup:
+                await run_scenario(scenario, connections, sample, args.warmup, rng)
+            scenarios[scenario.name] = await run_scenario(scenario, connections, sample, args.requests, rng)
+            print(f"{scenario.name}: {scenarios[scenario.name]['rps']} rps", flush=True)
+    finally:
+        for conn in connections:
+            await conn.close()
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "read_only": args.read_only,
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--concurrency", type=int, default=16, help="Число одновременных соединений")
+    parser.add_argument("--requests", type=int, default=1000, help="Запросов на сценарий")
+    parser.add_argument("--warmup", type=int, default=50, help="Прогревочных запросов на сценарий (не учитываются)")
+    parser.add_argument("--sample-size", type=int, default=500, help="Сколько записей взять как образцы")
+    parser.add_argument("--scenario", action="append", help="Префикс имени сценария, можно указать несколько раз")
+    parser.add_argument("--read-only", action="store_true", help="Не запускать сценарии записи")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Куда сохранить результаты в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    args = parser.parse_args()
+    args.api_key = args.api_key or get_settings().api_key
+
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print()
+    _print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Сравнение создания организации: прежний ORM-путь (add, flush, SELECT видов
+деятельности, commit, refresh) против одного запроса с data-modifying CTE.
+
+Организации создаются в рабочих таблицах со служебными здание и видами деятельности,
+после прогона всё созданное удаляется:
+
+    python -m benchmarks.organization_create --creates 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from configuration.base import get_settings
+from domain.entities.activities import Activity
+from domain.entities.organizations import Organization
+from domain.phones import normalize_phone
+from infrastructure.cache.activity_tree import ActivityTree
+from infrastructure.cache.response import ResponseCache, InMemoryCacheBackend
+from infrastructure.db.database import Database
+from infrastructure.db.models import BuildingModel, ActivityModel, OrganizationModel, OrganizationPhoneModel
+from infrastructure.db.types import child_path
+from infrastructure.metrics.request import start_request, end_request
+from infrastructure.repositories.activities import ActivitiesRepository
+from infrastructure.repositories.organizations import OrganizationsRepository
+
+PREFIX = "bench-create"
+
+
+async def _orm_create(session: AsyncSession, organization: Organization) -> None:
+    """Прежняя реализация OrganizationsRepository.create"""
+    organization_model = OrganizationModel(
+        name=organization.name, building_id=organization.building_id, activities=[], phones=[],
+    )
+    session.add(organization_model)
+    await session.flush()
+    for phone in organization.phones:
+        session.add(OrganizationPhoneModel(
+            organization_id=organization_model.id, phone=phone, phone_e164=normalize_phone(phone),
+        ))
+    res = await session.execute(
+        select(ActivityModel).where(ActivityModel.id.in_([activity.id for activity in organization.activities]))
+    )
+    organization_model.activities.extend(res.scalars().all())
+    await session.commit()
+    # Прежний refresh с selectin-загрузкой телефонов и видов деятельности
+    await session.scalar(
+        select(OrganizationModel)
+        .where(OrganizationModel.id == organization_model.id)
+        .options(selectinload(OrganizationModel.phones), selectinload(OrganizationModel.activities))
+        .execution_options(populate_existing=True)
+    )
+
+
+async def _cte_create(session: AsyncSession, organization: Organization) -> None:
+    cache = ResponseCache(backend=InMemoryCacheBackend(max_entries=1), ttl=0, enabled=False)
+    activities = ActivitiesRepository(session, ActivityTree(ttl=0), cache)
+    await OrganizationsRepository(session, activities, cache).create(organization)
+
+
+async def _setup(database: Database) -> tuple[uuid.UUID, list[Activity]]:
+    building_id = uuid.uuid4()
+    activities = [Activity(id=uuid.uuid4(), name=f"{PREFIX}-{uuid.uuid4().hex}", parent_id=None) for _ in range(3)]
+    async with database.engine.begin() as conn:
+        await conn.execute(insert(BuildingModel.__table__).values(
+            id=building_id, address=f"{PREFIX}-{building_id}", latitude=55.75, longitude=37.62,
+        ))
+        await conn.execute(insert(ActivityModel.__table__), [
+            {"id": a.id, "name": a.name, "parent_id": None, "path": child_path(None, a.id)} for a in activities
+        ])
+    return building_id, activities
+
+
+async def _cleanup(database: Database, building_id: uuid.UUID, activities: list[Activity]) -> None:
+    async with database.engine.begin() as conn:
+        await conn.execute(delete(OrganizationModel.__table__).where(OrganizationModel.building_id == building_id))
+        await conn.execute(delete(ActivityModel.__table__).where(ActivityModel.id.in_([a.id for a in activities])))
+        await conn.execute(delete(BuildingModel.__table__).where(BuildingModel.id == building_id))
+
+
+async def _measure(
+    database: Database,
+    create: Callable[[AsyncSession, Organization], Awaitable[None]],
+    building_id: uuid.UUID,
+    activities: list[Activity],
+    creates: int,
+    concurrency: int,
+) -> dict:
+    latencies: list[float] = []
+    statements: list[int] = []
+    remaining = creates
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            organization = Organization(
+                id=None,
+                name=f"{PREFIX}-{uuid.uuid4().hex}",
+                building_id=building_id,
+                phones=["+7 (900) 000-00-01", "+7 (900) 000-00-02"],
+                activities=activities,
+            )
+            metrics, token = start_request()
+            started = time.perf_counter()
+            try:
+                async with database.session_maker() as session:
+                    await create(session, organization)
+            finally:
+                end_request(token)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statements.append(metrics.statements)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "creates_per_second": round(creates / elapsed, 1),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "statements_per_create": statistics.fmean(statements),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    database = Database(get_settings())
+    building_id, activities = await _setup(database)
+    try:
+        results = {}
+        for name, create in (("orm", _orm_create), ("cte", _cte_create)):
+            # Прогрев: соединения пула и кэш компиляции запросов
+            await _measure(database, create, building_id, activities, args.concurrency, args.concurrency)
+            results[name] = await _measure(database, create, building_id, activities, args.creates, args.concurrency)
+    finally:
+        await _cleanup(database, building_id, activities)
+        await database.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--creates", type=int, default=2000, help="Созданий на каждый вариант")
+    parser.add_argument("--concurrency", type=int, default=8)
+    results = asyncio.run(run(parser.parse_args()))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import SettingsConfigDict, BaseSettings
 
@@ -18,6 +20,51 @@ class ProjectSettings(BaseSettings):
     db_name: str
     db_show_query: bool
     api_key: str
+    #DB pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_command_timeout: float | None = None
+    db_statement_timeout_ms: int | None = None
+    db_idle_in_transaction_timeout_ms: int | None = None
+    # PgBouncer в режиме transaction pooling не поддерживает именованные
+    # prepared statements и параметры запуска сессии
+    db_pgbouncer_mode: bool = False
+    #DB replica
+    db_replica_host: str | None = None
+    db_replica_port: int | None = None
+    # Сколько секунд после записи чтения клиента идут в основную БД
+    db_replica_stickiness_seconds: int = 5
+    #Cache
+    activity_tree_ttl: float = 60.0
+    response_cache_enabled: bool = True
+    # memory - сброс виден только своему процессу (один воркер uvicorn);
+    # postgres - счётчики поколений в БД, общие для всех воркеров и import_data.py
+    response_cache_backend: Literal["memory", "postgres"] = "memory"
+    response_cache_ttl: float = 30.0
+    response_cache_max_entries: int = 1024
+    # Счётчиков поколений (теги и отдельные тайлы); старые вытесняются
+    response_cache_max_counters: int = 100_000
+    #Bulk import
+    bulk_import_batch_size: int = 1000
+    #Export
+    export_batch_size: int = 1000
+    #Warm-up
+    # Сколько соединений каждого пула открыть при старте и прогнать на них частые запросы
+    db_warmup_connections: int = 2
+    db_warmup_retry_seconds: float = 5.0
+    #Jobs
+    # Исполнителей фоновых задач в процессе (0 - процесс задачи не выполняет)
+    jobs_workers: int = 2
+    jobs_poll_interval: float = 1.0
+    # Аренда захваченной задачи; продлевается, пока задача выполняется
+    jobs_lease_seconds: float = 60.0
+    # Попыток после падения процесса посреди выполнения
+    jobs_max_attempts: int = 3
+    jobs_import_max_bytes: int = 100 * 1024 * 1024
 
     @property
     def get_postgres_url_sync(self) -> str:
@@ -31,9 +78,20 @@ class ProjectSettings(BaseSettings):
             f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def get_replica_postgres_url_async(self) -> str | None:
+        if self.db_replica_host is None:
+            return None
+        port = self.db_replica_port or self.db_port
+        return (
+            f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_replica_host}:{port}/{self.db_name}"
+        )
+
+@lru_cache
 def get_settings() -> ProjectSettings:
-    """Возвращает общие настройки приложения"""
+    """
+    Возвращает общие настройки приложения
+    Читаются при первом обращении, поэтому импорт модулей не требует .env
+    """
     return ProjectSettings()
 
-settings = get_settings()
-
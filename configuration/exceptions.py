@@ -39,3 +39,11 @@ class BuildingCreateError(Exception):
 
 class DuplicateBuildingAddressError(Exception):
     """Здание с таким адресом уже существует"""
+
+
+class InvalidCursorError(Exception):
+    """Некорректный курсор пагинации"""
+
+
+class JobNotFoundError(Exception):
+    """Фоновая задача не найдена"""
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from uuid import UUID
 
-@dataclass
+@dataclass(slots=True)
 class Activity:
     id: UUID | None
     name: str
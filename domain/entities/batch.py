@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+from uuid import UUID
+
+T = TypeVar("T")
+
+
+@dataclass
+class BatchResult(Generic[T]):
+    """Результат выборки по списку ID: найденные записи в порядке запроса и ненайденные ID"""
+    items: list[T]
+    missing_ids: list[UUID]
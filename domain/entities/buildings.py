@@ -2,7 +2,7 @@ from uuid import UUID
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Building:
     id: UUID | None
     address: str
@@ -0,0 +1,60 @@
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+# Сколько ошибок строк хранится в отчёте; остальные только считаются
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportKind(StrEnum):
+    BUILDINGS = "buildings"
+    ACTIVITIES = "activities"
+    ORGANIZATIONS = "organizations"
+
+
+class ImportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+@dataclass
+class BuildingImportRow:
+    line: int
+    address: str
+    latitude: float
+    longitude: float
+
+
+@dataclass
+class ActivityImportRow:
+    line: int
+    name: str
+    parent_name: str | None
+
+
+@dataclass
+class OrganizationImportRow:
+    line: int
+    name: str
+    building_address: str
+    phones: list[str]
+    activity_names: list[str]
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    kind: ImportKind
+    processed: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line=line, message=message))
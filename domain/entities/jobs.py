@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+from uuid import UUID
+
+
+class JobKind(StrEnum):
+    IMPORT = "import"
+    RECOUNT_ORGANIZATIONS = "recount_organizations"
+    WARM_UP = "warm_up"
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """Фоновая задача; входные данные (тело загрузки) в сущность не попадают"""
+    id: UUID
+    kind: JobKind
+    status: JobStatus
+    payload: dict[str, Any]
+    result: dict[str, Any] | None
+    error: str | None
+    attempts: int
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
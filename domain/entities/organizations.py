@@ -1,12 +1,64 @@
 from dataclasses import dataclass
+from enum import StrEnum
 from uuid import UUID
 
 from domain.entities.activities import Activity
+from domain.entities.buildings import Building
 
-@dataclass
+@dataclass(slots=True)
 class Organization:
     id: UUID | None
     name: str
     building_id: UUID
     phones: list[str]
-    activities: list[Activity]
\ No newline at end of file
+    activities: list[Activity]
+    # Заполняется, только если здание запрошено в include
+    building: Building | None = None
+
+
+class OrganizationInclude(StrEnum):
+    """Связанные данные, которые можно запросить вместе с организацией"""
+    BUILDING = "building"
+    PHONES = "phones"
+    ACTIVITIES = "activities"
+
+
+OrganizationIncludes = frozenset[OrganizationInclude]
+
+# По умолчанию ответы совпадают с прежними: телефоны и виды деятельности без здания
+DEFAULT_INCLUDE: OrganizationIncludes = frozenset({OrganizationInclude.PHONES, OrganizationInclude.ACTIVITIES})
+
+
+@dataclass(slots=True)
+class OrganizationFilters:
+    """Фильтры организаций; заданные фильтры объединяются через И"""
+    activity_id: UUID | None = None
+    building_id: UUID | None = None
+    # (lat_min, lon_min, lat_max, lon_max)
+    square: tuple[float, float, float, float] | None = None
+    # (широта, долгота, радиус в метрах)
+    radius: tuple[float, float, float] | None = None
+    name_prefix: str | None = None
+
+
+class OrganizationSearchMode(StrEnum):
+    PREFIX = "prefix"
+    SUBSTRING = "substring"
+    FUZZY = "fuzzy"
+
+
+@dataclass(slots=True)
+class ClusterActivity:
+    """Вид деятельности в ячейке кластеризации и число его организаций в ячейке"""
+    id: UUID
+    name: str
+    count: int
+
+
+@dataclass(slots=True)
+class OrganizationCluster:
+    """Ячейка сетки на карте: центр масс организаций, их число и самые частые виды деятельности"""
+    latitude: float
+    longitude: float
+    count: int
+    top_activities: list[ClusterActivity]
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """Страница результатов keyset-пагинации"""
+    items: list[T]
+    next_cursor: str | None
@@ -1,3 +1,5 @@
+from sqlalchemy import Row
+
 from domain.entities.buildings import Building
 from infrastructure.db.models import BuildingModel
 
@@ -7,4 +9,12 @@ def map_building_to_entity(model: BuildingModel) -> Building:
         address=model.address,
         latitude=model.latitude,
         longitude=model.longitude,
-    )
\ No newline at end of file
+    )
+
+
+# Колонки для выборки зданий без построения ORM-объектов
+BUILDING_COLUMNS = (BuildingModel.id, BuildingModel.address, BuildingModel.latitude, BuildingModel.longitude)
+
+
+def map_building_row_to_entity(row: Row) -> Building:
+    return Building(id=row.id, address=row.address, latitude=row.latitude, longitude=row.longitude)
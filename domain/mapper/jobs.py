@@ -0,0 +1,25 @@
+from sqlalchemy import Row
+
+from domain.entities.jobs import Job, JobKind, JobStatus
+from infrastructure.db.models import JobModel
+
+# Колонки задачи без входных данных: тело загрузки может быть большим
+JOB_COLUMNS = (
+    JobModel.id, JobModel.kind, JobModel.status, JobModel.payload, JobModel.result, JobModel.error,
+    JobModel.attempts, JobModel.created_at, JobModel.started_at, JobModel.finished_at,
+)
+
+
+def map_job_row_to_entity(row: Row) -> Job:
+    return Job(
+        id=row.id,
+        kind=JobKind(row.kind),
+        status=JobStatus(row.status),
+        payload=row.payload,
+        result=row.result,
+        error=row.error,
+        attempts=row.attempts,
+        created_at=row.created_at,
+        started_at=row.started_at,
+        finished_at=row.finished_at,
+    )
@@ -1,8 +1,13 @@
+from sqlalchemy import Row
+
+from domain.entities.activities import Activity
+from domain.entities.buildings import Building
 from domain.entities.organizations import Organization
 from domain.mapper.activities import map_activity_to_entity
 from infrastructure.db.models import OrganizationModel
 
 def map_organization_to_entity(model: OrganizationModel | None) -> Organization | None:
+    """Модель должна быть загружена с selectinload телефонов и видов деятельности"""
     if model is None:
         return None
     return Organization(
@@ -11,4 +16,16 @@ def map_organization_to_entity(model: OrganizationModel | None) -> Organization
         building_id=model.building_id,
         phones=[p.phone for p in model.phones],
         activities=[map_activity_to_entity(a) for a in model.activities],
-    )
\ No newline at end of file
+    )
+
+
+# Колонки для выборки организаций без построения ORM-объектов
+ORGANIZATION_COLUMNS = (OrganizationModel.id, OrganizationModel.name, OrganizationModel.building_id)
+
+
+def map_organization_row_to_entity(
+    row: Row, phones: list[str], activities: list[Activity], building: Building | None = None,
+) -> Organization:
+    return Organization(
+        id=row.id, name=row.name, building_id=row.building_id, phones=phones, activities=activities, building=building,
+    )
@@ -0,0 +1,47 @@
+import re
+from collections.abc import Iterable
+
+PHONE_REGEX = re.compile(
+    r"""
+    ^\s*                   
+    (?:\+?7|8)                 # код страны (+7, 7 или 8)
+    [\s\-()]*                  # возможные пробелы и скобки
+    (?:\d[\s\-()]*){10}        # ровно 10 цифр после кода страны
+    \s*$                       
+    """,
+    re.VERBOSE
+)
+
+
+# Длина номера без кода страны
+NATIONAL_NUMBER_DIGITS = 10
+
+
+def is_valid_phone(phone: str) -> bool:
+    """Проверить, что номер похож на российский номер телефона"""
+    return PHONE_REGEX.match(phone) is not None
+
+
+def normalize_phone(phone: str) -> str | None:
+    """
+    Привести номер к E.164 (+7XXXXXXXXXX)
+    Разные записи одного номера дают одну строку; None - если номер некорректен
+    """
+    if not is_valid_phone(phone):
+        return None
+    digits = "".join(char for char in phone if char.isdigit())
+    return "+7" + digits[-NATIONAL_NUMBER_DIGITS:]
+
+
+def unique_phones(phones: Iterable[str]) -> dict[str, str]:
+    """
+    Корректные номера без повторов: E.164 -> запись для отображения
+    Из разных записей одного номера остаётся первая
+    """
+    result: dict[str, str] = {}
+    for phone in phones:
+        phone = phone.strip()
+        normalized = normalize_phone(phone)
+        if normalized is not None:
+            result.setdefault(normalized, phone)
+    return result
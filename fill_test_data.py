@@ -1,7 +1,9 @@
 import asyncio
 import uuid
 from sqlalchemy import insert, text, select, func
-from infrastructure.db.database import async_session_maker
+from configuration.base import get_settings
+from domain.phones import normalize_phone
+from infrastructure.db.database import Database
 from infrastructure.db.models import (
     BuildingModel,
     OrganizationModel,
@@ -9,10 +11,13 @@ from infrastructure.db.models import (
     ActivityModel,
     organization_activities,
 )
+from infrastructure.db.types import child_path
+from infrastructure.repositories.organization_counts import rebuild_counts
 
 
 async def fill_full_data():
-    async with async_session_maker() as session:
+    database = Database(get_settings())
+    async with database.session_maker() as session:
         try:
             existing = await session.scalar(select(func.count(BuildingModel.id)))
             if existing and existing > 0:
@@ -30,12 +35,21 @@ async def fill_full_data():
             await session.flush()
 
             # Деятельность
-            retail = ActivityModel(id=uuid.uuid4(), name="Розничная торговля", parent_id=None)
-            construction = ActivityModel(id=uuid.uuid4(), name="Строительство", parent_id=None)
-            fasteners = ActivityModel(id=uuid.uuid4(), name="Саморезы", parent_id=construction.id)
-            food = ActivityModel(id=uuid.uuid4(), name="Общественное питание", parent_id=None)
-            cafe = ActivityModel(id=uuid.uuid4(), name="Кафе", parent_id=food.id)
-            it = ActivityModel(id=uuid.uuid4(), name="Разработка ПО", parent_id=None)
+            def activity(name: str, parent: ActivityModel | None = None) -> ActivityModel:
+                activity_id = uuid.uuid4()
+                return ActivityModel(
+                    id=activity_id,
+                    name=name,
+                    parent_id=parent.id if parent else None,
+                    path=child_path(parent.path if parent else None, activity_id),
+                )
+
+            retail = activity("Розничная торговля")
+            construction = activity("Строительство")
+            fasteners = activity("Саморезы", construction)
+            food = activity("Общественное питание")
+            cafe = activity("Кафе", food)
+            it = activity("Разработка ПО")
             session.add_all([retail, construction, fasteners, food, cafe, it])
             await session.flush()
 
@@ -52,11 +66,16 @@ async def fill_full_data():
 
 
             phones = [
-                OrganizationPhoneModel(id=uuid.uuid4(), organization_id=organizations[0].id, phone="+7 (495) 111-11-11"),
-                OrganizationPhoneModel(id=uuid.uuid4(), organization_id=organizations[1].id, phone="+7 (8452) 222-22-22"),
-                OrganizationPhoneModel(id=uuid.uuid4(), organization_id=organizations[2].id, phone="+7 (812) 555-55-55"),
-                OrganizationPhoneModel(id=uuid.uuid4(), organization_id=organizations[3].id, phone="+7 (843) 444-44-44"),
-                OrganizationPhoneModel(id=uuid.uuid4(), organization_id=organizations[4].id, phone="+7 (383) 333-33-33"),
+                OrganizationPhoneModel(
+                    id=uuid.uuid4(), organization_id=organization.id, phone=phone, phone_e164=normalize_phone(phone),
+                )
+                for organization, phone in zip(organizations, [
+                    "+7 (495) 111-11-11",
+                    "+7 (8452) 22-22-22",
+                    "+7 (812) 555-55-55",
+                    "+7 (843) 444-44-44",
+                    "+7 (383) 333-33-33",
+                ])
             ]
             session.add_all(phones)
 
@@ -73,6 +92,10 @@ async def fill_full_data():
                 ],
             )
 
+            # Счётчики организаций по зданиям и видам деятельности
+            for stmt in rebuild_counts():
+                await session.execute(stmt)
+
             await session.commit()
             print("Полная база тестовых данных успешно создана!")
 
@@ -80,6 +103,8 @@ async def fill_full_data():
             await session.rollback()
             print(f"Ошибка при заполнении БД: {e}")
             raise
+        finally:
+            await database.dispose()
 
 
 if __name__ == "__main__":
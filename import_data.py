@@ -0,0 +1,69 @@
+"""
+Пакетная загрузка данных из файла в обход HTTP:
+
+    python import_data.py buildings buildings.csv
+    python import_data.py organizations organizations.ndjson --batch-size 5000
+
+Формат определяется по расширению (.csv, .ndjson, .jsonl) или задаётся --format.
+Кэш ответов API сбрасывается, если он хранит поколения в БД (RESPONSE_CACHE_BACKEND=postgres);
+иначе запущенные процессы API подхватят новые данные по истечении TTL.
+"""
+import argparse
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from dataclasses import asdict
+from pathlib import Path
+
+from configuration.base import get_settings
+from domain.entities.bulk_import import ImportKind, ImportFormat, ImportReport
+from infrastructure.cache.activity_tree import ActivityTree
+from infrastructure.cache.response import ResponseCache, create_cache_backend
+from infrastructure.db.database import Database
+from infrastructure.repositories.bulk_import import BulkImportRepository
+from infrastructure.services.bulk_import import BulkImportService
+
+EXTENSION_FORMATS = {".csv": ImportFormat.CSV, ".ndjson": ImportFormat.NDJSON, ".jsonl": ImportFormat.NDJSON}
+CHUNK_SIZE = 1 << 16
+
+
+async def read_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := await asyncio.to_thread(file.read, CHUNK_SIZE):
+            yield chunk
+
+
+async def import_file(kind: ImportKind, path: Path, fmt: ImportFormat, batch_size: int) -> ImportReport:
+    config = get_settings()
+    database = Database(config)
+    try:
+        async with database.session_maker() as session:
+            repository = BulkImportRepository(
+                session,
+                ActivityTree(ttl=config.activity_tree_ttl),
+                ResponseCache(backend=create_cache_backend(config, database), ttl=0, enabled=False),
+            )
+            service = BulkImportService(repository=repository, batch_size=batch_size)
+            return await service.import_stream(kind, fmt, read_chunks(path))
+    finally:
+        await database.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", type=ImportKind, choices=list(ImportKind))
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", dest="fmt", type=ImportFormat, choices=list(ImportFormat))
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+    batch_size = args.batch_size or get_settings().bulk_import_batch_size
+
+    fmt = args.fmt or EXTENSION_FORMATS.get(args.file.suffix.lower())
+    if fmt is None:
+        parser.error("Не удалось определить формат по расширению, укажите --format")
+    report = asyncio.run(import_file(args.kind, args.file, fmt, batch_size))
+    print(json.dumps(asdict(report), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
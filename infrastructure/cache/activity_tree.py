@@ -0,0 +1,108 @@
+import asyncio
+import time
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.db.models import ActivityModel
+from infrastructure.db.types import ltree_label
+
+
+class ActivityTree:
+    """
+    Кэш дерева видов деятельности в памяти процесса
+    Для каждого узла хранит предков (от корня до самого узла) и множество потомков
+    (включая сам узел), поэтому запросы по поддереву не ходят в БД.
+    Изменения из других процессов подхватываются не позже чем через ttl секунд
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._lock = asyncio.Lock()
+        self._loaded_at: float | None = None
+        self._version = 0
+        self._parents: dict[UUID, UUID | None] = {}
+        self._ancestors: dict[UUID, tuple[UUID, ...]] = {}
+        self._descendants: dict[UUID, set[UUID]] = {}
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        """Загрузить дерево, если кэш пуст или устарел"""
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if not self._is_fresh():
+                await self.reload(session)
+
+    async def reload(self, session: AsyncSession) -> None:
+        """Перечитать дерево целиком одним запросом"""
+        version = self._version
+        rows = await session.execute(select(ActivityModel.id, ActivityModel.parent_id))
+        self._rebuild({activity_id: parent_id for activity_id, parent_id in rows.all()})
+        # Если во время загрузки дерево менялось, снимок мог устареть
+        self._loaded_at = time.monotonic() if version == self._version else None
+
+    def invalidate(self) -> None:
+        """Сбросить кэш, следующее обращение перечитает дерево"""
+        self._loaded_at = None
+
+    def __contains__(self, activity_id: UUID) -> bool:
+        return activity_id in self._parents
+
+    def descendants(self, activity_id: UUID) -> frozenset[UUID]:
+        """ID узла и всех его потомков (пустое множество для неизвестного узла)"""
+        return frozenset(self._descendants.get(activity_id, ()))
+
+    def ancestors(self, activity_id: UUID) -> tuple[UUID, ...]:
+        """ID предков от корня до самого узла включительно"""
+        return self._ancestors.get(activity_id, ())
+
+    def path(self, activity_id: UUID) -> str:
+        """Материализованный путь узла в формате ltree"""
+        return ".".join(ltree_label(ancestor_id) for ancestor_id in self.ancestors(activity_id))
+
+    def depth(self, activity_id: UUID | None) -> int:
+        """Глубина узла (корень на глубине 1, None - на глубине 0)"""
+        if activity_id is None:
+            return 0
+        return len(self.ancestors(activity_id))
+
+    def add(self, activity_id: UUID, parent_id: UUID | None) -> None:
+        """Добавить новый лист в дерево"""
+        self._version += 1
+        self._parents[activity_id] = parent_id
+        chain = self.ancestors(parent_id) if parent_id is not None else ()
+        self._ancestors[activity_id] = (*chain, activity_id)
+        self._descendants[activity_id] = {activity_id}
+        for ancestor_id in chain:
+            self._descendants[ancestor_id].add(activity_id)
+
+    def remove(self, activity_id: UUID) -> None:
+        """Удалить лист из дерева"""
+        self._version += 1
+        self._parents.pop(activity_id, None)
+        self._descendants.pop(activity_id, None)
+        for ancestor_id in self._ancestors.pop(activity_id, ()):
+            self._descendants.get(ancestor_id, set()).discard(activity_id)
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self._ttl
+
+    def _rebuild(self, parents: dict[UUID, UUID | None]) -> None:
+        ancestors: dict[UUID, tuple[UUID, ...]] = {}
+
+        def chain(activity_id: UUID) -> tuple[UUID, ...]:
+            if activity_id not in ancestors:
+                parent_id = parents[activity_id]
+                prefix = chain(parent_id) if parent_id is not None else ()
+                ancestors[activity_id] = (*prefix, activity_id)
+            return ancestors[activity_id]
+
+        descendants: dict[UUID, set[UUID]] = {activity_id: set() for activity_id in parents}
+        for activity_id in parents:
+            for ancestor_id in chain(activity_id):
+                descendants[ancestor_id].add(activity_id)
+
+        self._parents = parents
+        self._ancestors = ancestors
+        self._descendants = descendants
@@ -0,0 +1,237 @@
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from enum import StrEnum
+from typing import Protocol
+
+from fastapi import Request, Response
+from sqlalchemy import select, Table
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette import status
+
+from configuration.base import ProjectSettings
+from infrastructure.db.database import requires_primary, Database
+from infrastructure.db.geo import point_tiles, TILE_BUFFER, TILE_EXTENT
+from infrastructure.db.models import CacheGenerationModel
+from infrastructure.db.types import any_of
+
+# Самый крупный масштаб векторных тайлов; при записи сбрасывается по тайлу на уровень
+MAX_TILE_ZOOM = 22
+
+
+class CacheTag(StrEnum):
+    """Группы данных, по которым сбрасывается кэш ответов"""
+    BUILDINGS = "buildings"
+    ORGANIZATIONS = "organizations"
+    ACTIVITIES = "activities"
+    # Все тайлы сразу (массовая загрузка); точечные изменения сбрасывают отдельные тайлы
+    TILES = "tiles"
+
+
+class CacheBackend(Protocol):
+    """
+    Хранилище кэша ответов
+    Сброс по тегам сделан через счётчики поколений, а не удалением ключей:
+    чтобы сброс был виден всем процессам API, общими должны быть только счётчики
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def counters(self, keys: Sequence[str]) -> list[int]: ...
+
+    async def incr(self, *keys: str) -> None: ...
+
+
+# Счётчиков поколений в памяти по умолчанию (теги и тайлы)
+DEFAULT_MAX_COUNTERS = 100_000
+
+
+class InMemoryCacheBackend:
+    """
+    LRU-кэш с TTL в памяти процесса
+    Сброс виден только этому процессу: при нескольких воркерах uvicorn
+    нужен PostgresCacheBackend (RESPONSE_CACHE_BACKEND=postgres).
+    Счётчики поколений тоже ограничены LRU: вытесненный счётчик при следующем
+    обращении начинается выше всех вытесненных значений, то есть считается сброшенным
+    """
+
+    def __init__(self, max_entries: int, max_counters: int = DEFAULT_MAX_COUNTERS):
+        self._max_entries = max_entries
+        self._max_counters = max_counters
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._counters: OrderedDict[str, int] = OrderedDict()
+        # Больше любого вытесненного значения счётчика
+        self._counter_floor = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def counters(self, keys: Sequence[str]) -> list[int]:
+        return [self._touch_counter(key, 0) for key in keys]
+
+    async def incr(self, *keys: str) -> None:
+        for key in keys:
+            self._touch_counter(key, 1)
+
+    def _touch_counter(self, key: str, delta: int) -> int:
+        value = self._counters.pop(key, self._counter_floor) + delta
+        self._counters[key] = value
+        while len(self._counters) > self._max_counters:
+            _, evicted = self._counters.popitem(last=False)
+            self._counter_floor = max(self._counter_floor, evicted + 1)
+        return value
+
+
+class PostgresCacheBackend:
+    """
+    Ответы в памяти процесса, счётчики поколений - в таблице основной БД
+    Ключ ответа включает поколения из общей таблицы, поэтому сброс в одном
+    воркере (или в import_data.py) сразу виден остальным. Цена - один запрос
+    к БД на каждый кэшируемый ответ вместо выполнения самого запроса
+    """
+
+    def __init__(self, engine: AsyncEngine, max_entries: int):
+        self._engine = engine
+        self._entries = InMemoryCacheBackend(max_entries=max_entries, max_counters=0)
+        self._table: Table = CacheGenerationModel.__table__
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._entries.set(key, value, ttl)
+
+    async def counters(self, keys: Sequence[str]) -> list[int]:
+        if not keys:
+            return []
+        async with self._engine.connect() as conn:
+            values = dict((await conn.execute(
+                select(self._table.c.key, self._table.c.value).where(any_of(self._table.c.key, keys))
+            )).all())
+        return [values.get(key, 0) for key in keys]
+
+    async def incr(self, *keys: str) -> None:
+        if not keys:
+            return
+        stmt = pg_insert(self._table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self._table.c.key], set_={"value": self._table.c.value + 1},
+        )
+        # Одинаковый порядок строк в параллельных сбросах исключает взаимные блокировки
+        async with self._engine.begin() as conn:
+            await conn.execute(stmt, [{"key": key, "value": 1} for key in sorted(set(keys))])
+
+
+def create_cache_backend(config: ProjectSettings, database: Database) -> CacheBackend:
+    """Хранилище кэша ответов по настройке RESPONSE_CACHE_BACKEND"""
+    if config.response_cache_backend == "postgres":
+        return PostgresCacheBackend(database.engine, max_entries=config.response_cache_max_entries)
+    return InMemoryCacheBackend(
+        max_entries=config.response_cache_max_entries,
+        max_counters=config.response_cache_max_counters,
+    )
+
+
+class ResponseCache:
+    """
+    Кэш готовых JSON-ответов горячих GET-эндпоинтов
+    Ключ - шаблон маршрута и нормализованные параметры плюс поколения тегов,
+    поэтому запись в репозитории сбрасывает все зависящие от тега ответы
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+
+    async def invalidate(self, *tags: CacheTag) -> None:
+        """Сбросить ответы, зависящие от указанных тегов"""
+        await self.backend.incr(*(f"generation:{tag}" for tag in tags))
+
+    async def invalidate_points(self, points: Iterable[tuple[float, float]]) -> None:
+        """
+        Сбросить тайлы, содержащие точки (широта, долгота), на всех уровнях масштаба
+        Тайлы точки считаются формулой (вместе с соседними, в запас которых она попадает),
+        поэтому обратный индекс точка -> тайлы не хранится
+        """
+        tiles = {
+            (z, tile_x, tile_y)
+            for latitude, longitude in points
+            for z in range(MAX_TILE_ZOOM + 1)
+            for tile_x, tile_y in point_tiles(latitude, longitude, z, TILE_BUFFER / TILE_EXTENT)
+        }
+        await self.backend.incr(*(tile_generation_key(z, x, y) for z, x, y in tiles))
+
+    async def respond(
+        self,
+        request: Request,
+        tags: Iterable[CacheTag],
+        render: Callable[[], Awaitable[bytes]],
+        media_type: str = "application/json",
+        generation_keys: Iterable[str] = (),
+    ) -> Response:
+        """
+        Вернуть ответ из кэша или построить его через render
+        generation_keys - дополнительные счётчики поколений помимо тегов (например, тайла)
+        Поддерживает If-None-Match: при совпадении ETag отдаётся 304 без тела
+        """
+        if not self.enabled or requires_primary(request):
+            body = await render()
+            etag = _etag(body)
+        else:
+            key = await self._key(request, tags, generation_keys)
+            cached = await self.backend.get(key)
+            if cached is not None:
+                etag_bytes, body = cached.split(b"\n", 1)
+                etag = etag_bytes.decode()
+            else:
+                body = await render()
+                etag = _etag(body)
+                await self.backend.set(key, etag.encode() + b"\n" + body, self.ttl)
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    async def _key(self, request: Request, tags: Iterable[CacheTag], generation_keys: Iterable[str] = ()) -> str:
+        route = request.scope.get("route")
+        template = getattr(route, "path", request.url.path)
+        path_params = sorted(request.path_params.items())
+        query_params = sorted(request.query_params.multi_items())
+        keys = [f"generation:{tag}" for tag in sorted(tags)] + list(generation_keys)
+        generations = await self.backend.counters(keys)
+        return f"{template}|{path_params}|{query_params}|{'.'.join(map(str, generations))}"
+
+
+def tile_generation_key(z: int, x: int, y: int) -> str:
+    return f"generation:tile:{z}/{x}/{y}"
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
@@ -1,20 +1,100 @@
+import uuid
 from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine, AsyncEngine
 
-from configuration.base import settings
+from configuration.base import get_settings, ProjectSettings
+from infrastructure.db.instrumentation import instrument_engine
+from infrastructure.db.pool import InstrumentedQueuePool, PoolStatus
 
-engine = create_async_engine(
-    url=settings.get_postgres_url_async,
-    echo=settings.db_show_query
-)
 
-async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
 
 
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+def _connect_args(config: ProjectSettings) -> dict:
+    """Параметры подключения asyncpg"""
+    connect_args: dict = {}
+    if config.db_command_timeout is not None:
+        connect_args["command_timeout"] = config.db_command_timeout
 
-    async with async_session_maker() as session:
+    if config.db_pgbouncer_mode:
+        # Кэши prepared statements выключены, а имена уникальны, поэтому
+        # запрос может попасть на любое серверное соединение PgBouncer.
+        # Таймауты в этом режиме задаются на стороне роли БД
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = _unique_statement_name
+        return connect_args
+
+    connect_args["prepared_statement_cache_size"] = config.db_statement_cache_size
+    server_settings = {}
+    if config.db_statement_timeout_ms is not None:
+        server_settings["statement_timeout"] = str(config.db_statement_timeout_ms)
+    if config.db_idle_in_transaction_timeout_ms is not None:
+        server_settings["idle_in_transaction_session_timeout"] = str(config.db_idle_in_transaction_timeout_ms)
+    if server_settings:
+        connect_args["server_settings"] = server_settings
+    return connect_args
+
+
+def _create_engine(url: str, config: ProjectSettings) -> AsyncEngine:
+    async_engine = create_async_engine(
+        url=url,
+        echo=config.db_show_query,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        pool_pre_ping=config.db_pool_pre_ping,
+        connect_args=_connect_args(config),
+    )
+    instrument_engine(async_engine)
+    return async_engine
+
+
+class Database:
+    """
+    Движки и фабрики сессий основной БД и реплики
+    Приложение создаёт объект при старте (lifespan), скрипты - сами перед работой
+    """
+
+    def __init__(self, config: ProjectSettings):
+        self.engine = _create_engine(config.get_postgres_url_async, config)
+        # Реплика для чтения; если не настроена, чтения идут в основную БД
+        replica_url = config.get_replica_postgres_url_async
+        self.replica_engine = _create_engine(replica_url, config) if replica_url is not None else None
+        self.session_maker = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.replica_session_maker = async_sessionmaker(
+            bind=self.replica_engine or self.engine, expire_on_commit=False,
+        )
+
+    def pool_statuses(self) -> dict[str, PoolStatus]:
+        """Состояние пулов по имени: primary и, если настроена, replica"""
+        pools = {"primary": self.engine.pool.snapshot()}
+        if self.replica_engine is not None:
+            pools["replica"] = self.replica_engine.pool.snapshot()
+        return pools
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        if self.replica_engine is not None:
+            await self.replica_engine.dispose()
+
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Клиент недавно писал: его чтения идут в основную БД, пока реплика догоняет
+READ_PRIMARY_COOKIE = "read_primary"
+# Явный запрос чтения из основной БД: "X-Read-Consistency: primary"
+READ_CONSISTENCY_HEADER = "x-read-consistency"
+
+
+@asynccontextmanager
+async def session_scope(session_maker: async_sessionmaker[AsyncSession]) -> AsyncGenerator[AsyncSession, None]:
+    async with session_maker() as session:
         try:
             yield session
             await session.commit()
@@ -22,4 +102,58 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+def get_database(request: Request) -> Database:
+    """Получить подключения к БД из состояния приложения"""
+    return request.app.state.database
+
+
+async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+
+    async with session_scope(get_database(request).session_maker) as session:
+        yield session
+
+
+async def get_routed_db_session(request: Request, response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия, маршрутизируемая по типу запроса
+    Чтения идут в реплику, записи - в основную БД. После записи клиент
+    получает cookie, и его чтения какое-то время тоже идут в основную БД
+    """
+    database = get_database(request)
+    if is_read_request(request) and not requires_primary(request):
+        session_maker = database.replica_session_maker
+    else:
+        session_maker = database.session_maker
+        if not is_read_request(request) and database.replica_engine is not None:
+            response.set_cookie(
+                READ_PRIMARY_COOKIE, "1",
+                max_age=get_settings().db_replica_stickiness_seconds,
+                httponly=True,
+            )
+
+    async with session_scope(session_maker) as session:
+        yield session
+
+
+def mark_read_only(request: Request) -> None:
+    """
+    Зависимость маршрута: запрос только читает данные, хотя метод не GET
+    (например, POST с большим списком ID). Указывается в dependencies маршрута
+    """
+    request.state.read_only = True
+
+
+def is_read_request(request: Request) -> bool:
+    """Только ли читает данные запрос"""
+    return request.method in READ_METHODS or getattr(request.state, "read_only", False)
+
+
+def requires_primary(request: Request) -> bool:
+    """Должен ли запрос читать из основной БД"""
+    return (
+        request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary"
+        or READ_PRIMARY_COOKIE in request.cookies
+    )
@@ -0,0 +1,133 @@
+import math
+
+from geoalchemy2 import Geography
+from sqlalchemy import cast, func
+
+WGS84_SRID = 4326
+WEB_MERCATOR_SRID = 3857
+EARTH_RADIUS_M = 6_371_008.8
+# Web mercator (EPSG:3857): радиус сферы проекции и предельная широта карты
+WEB_MERCATOR_RADIUS_M = 6_378_137.0
+WEB_MERCATOR_MAX_LATITUDE = 85.05112878
+# Векторные тайлы: размер сетки координат и запас вокруг тайла в её единицах
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+# Ячеек сетки кластеризации на сторону тайла карты (256px тайл - ячейки по 64px)
+CLUSTER_CELLS_PER_TILE = 4
+# Запас на разницу между сферой и эллипсоидом, по которому считает PostGIS
+_ELLIPSOID_MARGIN = 1.01
+# Больше четверти окружности Земли описанная окружность уже не отсекает кандидатов
+MAX_PREFILTER_RADIUS_M = math.pi * EARTH_RADIUS_M / 2
+
+
+def make_point(latitude: float, longitude: float):
+    """SQL-выражение точки geography(Point, 4326)"""
+    return cast(
+        func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), WGS84_SRID),
+        Geography(geometry_type="POINT", srid=WGS84_SRID),
+    )
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Расстояние между двумя точками по сфере в метрах"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def square_bounding_circle(
+    lat_min: float, lon_min: float, lat_max: float, lon_max: float,
+) -> tuple[float, float, float]:
+    """
+    Окружность (широта, долгота, радиус в метрах), покрывающая прямоугольник
+    Самые удалённые от центра точки прямоугольника - его углы
+    """
+    center_lat = (lat_min + lat_max) / 2
+    center_lon = (lon_min + lon_max) / 2
+    radius = max(
+        haversine_distance(center_lat, center_lon, lat, lon)
+        for lat in (lat_min, lat_max)
+        for lon in (lon_min, lon_max)
+    )
+    return center_lat, center_lon, radius * _ELLIPSOID_MARGIN
+
+
+def square_prefilter_circle(
+    lat_min: float, lon_min: float, lat_max: float, lon_max: float,
+) -> tuple[float, float, float] | None:
+    """
+    Окружность для отбора кандидатов в прямоугольник по GiST-индексу или None
+    Углы - самые удалённые точки только при разнице долгот до 180°: в более широком
+    прямоугольнике точки у его краёв лежат дальше углов. Слишком большая окружность
+    тоже не нужна - она покрывает почти всю Землю
+    """
+    if lon_max - lon_min > 180:
+        return None
+    circle = square_bounding_circle(lat_min, lon_min, lat_max, lon_max)
+    if circle[2] > MAX_PREFILTER_RADIUS_M:
+        return None
+    return circle
+
+
+def cluster_cell_size(zoom: int) -> float:
+    """Сторона ячейки сетки кластеризации на уровне zoom в метрах web mercator"""
+    return 2 * math.pi * WEB_MERCATOR_RADIUS_M / 2 ** zoom / CLUSTER_CELLS_PER_TILE
+
+
+def mercator_xy(latitude: float, longitude: float) -> tuple[float, float]:
+    """Координаты точки в проекции web mercator, метры"""
+    latitude = max(-WEB_MERCATOR_MAX_LATITUDE, min(WEB_MERCATOR_MAX_LATITUDE, latitude))
+    return (
+        WEB_MERCATOR_RADIUS_M * math.radians(longitude),
+        WEB_MERCATOR_RADIUS_M * math.log(math.tan(math.pi / 4 + math.radians(latitude) / 2)),
+    )
+
+
+def mercator_x_sql(longitude):
+    """SQL-выражение координаты x web mercator по долготе"""
+    return WEB_MERCATOR_RADIUS_M * func.radians(longitude)
+
+
+def mercator_y_sql(latitude):
+    """
+    SQL-выражение координаты y web mercator по широте
+    Считается формулой, а не ST_Transform: для агрегации по сетке этого достаточно
+    """
+    clamped = func.greatest(-WEB_MERCATOR_MAX_LATITUDE, func.least(WEB_MERCATOR_MAX_LATITUDE, latitude))
+    return WEB_MERCATOR_RADIUS_M * func.ln(func.tan(math.pi / 4 + func.radians(clamped) / 2))
+
+
+def tile_bounds(z: int, x: int, y: int, buffer: float = 0.0) -> tuple[float, float, float, float]:
+    """
+    Границы тайла z/x/y схемы XYZ как (lat_min, lon_min, lat_max, lon_max)
+    buffer - запас в долях стороны тайла с каждой стороны
+    """
+    tiles = 2 ** z
+
+    def latitude(tile_y: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / tiles))))
+
+    return (
+        max(-WEB_MERCATOR_MAX_LATITUDE, latitude(y + 1 + buffer)),
+        max(-180.0, (x - buffer) / tiles * 360 - 180),
+        min(WEB_MERCATOR_MAX_LATITUDE, latitude(y - buffer)),
+        min(180.0, (x + 1 + buffer) / tiles * 360 - 180),
+    )
+
+
+def point_tiles(latitude: float, longitude: float, z: int, buffer: float = 0.0) -> list[tuple[int, int]]:
+    """
+    Тайлы (x, y) уровня z, в которые попадает точка
+    С запасом buffer (в долях стороны тайла) точка у края попадает и в соседние тайлы
+    """
+    tiles = 2 ** z
+    latitude = max(-WEB_MERCATOR_MAX_LATITUDE, min(WEB_MERCATOR_MAX_LATITUDE, latitude))
+    x = (longitude + 180) / 360 * tiles
+    y = (1 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2 * tiles
+
+    def tile_range(position: float) -> range:
+        return range(max(0, math.floor(position - buffer)), min(tiles - 1, math.floor(position + buffer)) + 1)
+
+    return [(tile_x, tile_y) for tile_x in tile_range(x) for tile_y in tile_range(y)]
@@ -0,0 +1,31 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from infrastructure.metrics.request import current_metrics
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Считать число SQL-запросов и время их выполнения в метриках текущего HTTP-запроса"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started_at"].pop()
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.statements += 1
+            metrics.db_seconds += time.perf_counter() - started
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        # after_cursor_execute не вызывается для упавшего запроса
+        if context.connection is not None:
+            stack = context.connection.info.get("query_started_at")
+            if stack:
+                stack.pop()
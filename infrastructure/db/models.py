@@ -1,15 +1,19 @@
 import uuid
-from typing import Optional
+from datetime import datetime
+from typing import Any, Optional
 
 
+from geoalchemy2 import Geography, WKBElement
 from sqlalchemy import (
     String, ForeignKey, UniqueConstraint,
-    Table, Column, Index,
+    Table, Column, Index, Computed, DateTime, Integer, BigInteger, Text, LargeBinary, func, text,
 )
 
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship, DeclarativeBase
 
+from infrastructure.db.types import Ltree
+
 
 class Base(DeclarativeBase):
     ...
@@ -22,24 +26,37 @@ organization_activities = Table(
            ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True),
     Column("activity_id", UUID(as_uuid=True),
            ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_organization_activities_activity_id", "activity_id"),
 )
 
 class BuildingModel(Base):
     __tablename__ = "buildings"
     __table_args__ = (
         Index("idx_buildings_latitude_longitude", "latitude", "longitude"),
+        Index("idx_buildings_location", "location", postgresql_using="gist"),
     )
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
     address: Mapped[str] = mapped_column(String(255), nullable=False)
     latitude: Mapped[float] = mapped_column(nullable=False)
     longitude: Mapped[float] = mapped_column(nullable=False)
+    # Вычисляется БД из latitude/longitude, используется только в фильтрах
+    location: Mapped[WKBElement] = mapped_column(
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False),
+        Computed("ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography", persisted=True),
+        nullable=False,
+        deferred=True,
+    )
 
-    organizations: Mapped[list["OrganizationModel"]] = relationship(back_populates="building")
+    organizations: Mapped[list["OrganizationModel"]] = relationship(back_populates="building", lazy="raise")
 
 
 
 class OrganizationModel(Base):
     __tablename__ = "organizations"
+    __table_args__ = (
+        # Поиск по части названия и нечёткий поиск (pg_trgm)
+        Index("ix_organizations_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False, index=True, unique=True)
@@ -53,25 +70,27 @@ class OrganizationModel(Base):
 
     building: Mapped["BuildingModel"] = relationship(back_populates="organizations")
 
-
+    # Связи не загружаются неявно: репозиторий выбирает телефоны и виды деятельности
+    # пачкой на всю выборку, а ORM-объекту они нужны только с явным selectinload
     phones: Mapped[list["OrganizationPhoneModel"]] = relationship(
         back_populates="organization",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
 
-
     activities: Mapped[list["ActivityModel"]] = relationship(
         secondary=organization_activities,
         back_populates="organizations",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
 class OrganizationPhoneModel(Base):
     __tablename__ = "organization_phones"
     __table_args__ = (
-        UniqueConstraint("organization_id", "phone", name="uq_org_phone_unique"),
+        UniqueConstraint("organization_id", "phone_e164", name="uq_org_phone_unique"),
+        # Поиск владельца номера: organization_id в индексе даёт index-only scan
+        Index("ix_organization_phones_phone_e164", "phone_e164", postgresql_include=["organization_id"]),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
@@ -82,13 +101,19 @@ class OrganizationPhoneModel(Base):
         index=True,
     )
 
-    phone: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    # Номер в том виде, в котором его передали (для отображения)
+    phone: Mapped[str] = mapped_column(String(32), nullable=False)
+    # Нормализованный номер (E.164) для поиска и уникальности
+    phone_e164: Mapped[str] = mapped_column(String(16), nullable=False)
 
     organization: Mapped["OrganizationModel"] = relationship(back_populates="phones")
 
 
 class ActivityModel(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        Index("ix_activities_path", "path", postgresql_using="gist"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
@@ -97,14 +122,82 @@ class ActivityModel(Base):
         ForeignKey("activities.id", ondelete="RESTRICT"),
         nullable=True,
     )
+    # Материализованный путь от корня: метки - ID узлов без дефисов
+    path: Mapped[str] = mapped_column(Ltree, nullable=False, deferred=True)
 
     parent: Mapped[Optional["ActivityModel"]] = relationship(
         remote_side="ActivityModel.id",
 
     )
 
+    # Обратная сторона связи не загружается неявно: иначе selectin по
+    # OrganizationModel.activities каскадом подтягивает весь граф организаций
     organizations: Mapped[list["OrganizationModel"]] = relationship(
         secondary=organization_activities,
         back_populates="activities",
-        lazy="selectin",
-    )
\ No newline at end of file
+        lazy="raise",
+    )
+
+class BuildingOrganizationCountModel(Base):
+    """Число организаций в здании; поддерживается при записи, чтение - по ключу"""
+    __tablename__ = "building_organization_counts"
+
+    building_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("buildings.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    organizations: Mapped[int] = mapped_column(nullable=False, default=0)
+
+
+class ActivityOrganizationCountModel(Base):
+    """
+    Число различных организаций в поддереве вида деятельности (включая сам вид)
+    Организация учитывается у всех предков своих видов деятельности ровно один раз
+    """
+    __tablename__ = "activity_organization_counts"
+
+    activity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("activities.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    organizations: Mapped[int] = mapped_column(nullable=False, default=0)
+
+
+class JobModel(Base):
+    """Фоновая задача; очередь в БД переживает перезапуск процессов"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Выборка задач для захвата: ждущие и захваченные (с истёкшей арендой)
+        Index(
+            "ix_jobs_claimable", "created_at",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    # Входные данные задачи (тело загрузки); очищаются после выполнения
+    input: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+    result: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # До какого момента задача принадлежит захватившему её процессу
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class CacheGenerationModel(Base):
+    """
+    Счётчик поколения кэша ответов (тег или тайл), общий для всех процессов API
+    Используется, если кэш настроен на хранение поколений в БД
+    """
+    __tablename__ = "cache_generations"
+
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,65 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from infrastructure.metrics.request import current_metrics
+
+
+@dataclass
+class PoolStatus:
+    """Снимок состояния пула соединений"""
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    acquisitions: int
+    timeouts: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Очередь соединений, которая считает время ожидания соединения
+    Время включает установку нового соединения, если пул его создаёт
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.acquisitions += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            metrics = current_metrics()
+            if metrics is not None:
+                metrics.pool_wait_seconds += waited
+
+    def snapshot(self) -> PoolStatus:
+        """Счётчики пула; status() базового класса (строка для логов) не переопределяется"""
+        return PoolStatus(
+            size=self.size(),
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=max(self.overflow(), 0),
+            max_overflow=self._max_overflow,
+            acquisitions=self.acquisitions,
+            timeouts=self.timeouts,
+            total_wait_seconds=self.total_wait,
+            max_wait_seconds=self.max_wait,
+        )
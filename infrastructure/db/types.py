@@ -0,0 +1,53 @@
+from collections.abc import Iterable
+from uuid import UUID
+
+from sqlalchemy import func, any_, bindparam, Boolean, Text, ColumnElement
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import UserDefinedType
+
+
+class Ltree(UserDefinedType):
+    """
+    Тип ltree из расширения PostgreSQL
+    Значения передаются и читаются как текст, поэтому драйверу
+    не нужен отдельный кодек для ltree
+    """
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "LTREE"
+
+    def bind_expression(self, bindvalue):
+        return func.text2ltree(bindvalue, type_=self)
+
+    def column_expression(self, col):
+        return func.ltree2text(col, type_=Text)
+
+    class comparator_factory(UserDefinedType.Comparator):
+        def descendant_of(self, other):
+            """Узел лежит в поддереве other (оператор <@, включая сам other)"""
+            return self.op("<@", return_type=Boolean)(other)
+
+        def ancestor_of(self, other):
+            """Узел - предок other (оператор @>, включая сам other)"""
+            return self.op("@>", return_type=Boolean)(other)
+
+
+def ltree_label(activity_id: UUID) -> str:
+    """Метка узла ltree для вида деятельности"""
+    return activity_id.hex
+
+
+def child_path(parent_path: str | None, activity_id: UUID) -> str:
+    """Путь узла по пути родителя (None для корня)"""
+    label = ltree_label(activity_id)
+    return f"{parent_path}.{label}" if parent_path else label
+
+
+def any_of(column: ColumnElement, values: Iterable) -> ColumnElement[bool]:
+    """
+    Условие column = ANY(:values) с одним параметром-массивом
+    В отличие от IN число параметров не зависит от длины списка,
+    поэтому подходит для больших пакетов (asyncpg принимает не больше 32767)
+    """
+    return column == any_(bindparam(None, list(values), type_=ARRAY(column.type)))
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from domain.entities.organizations import OrganizationInclude
+from infrastructure.cache.activity_tree import ActivityTree
+from infrastructure.cache.response import ResponseCache
+from infrastructure.db.database import Database
+from infrastructure.repositories.activities import ActivitiesRepository
+from infrastructure.repositories.buildings import BuildingsRepository
+from infrastructure.repositories.organizations import OrganizationsRepository
+from infrastructure.repositories.pagination import DEFAULT_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_hot_queries(session: AsyncSession, tree: ActivityTree, cache: ResponseCache) -> None:
+    """
+    Выполнить частые запросы репозиториев
+    SQLAlchemy кэширует их компиляцию, asyncpg - prepared statements соединения
+    """
+    probe = uuid4()
+    activities = ActivitiesRepository(session, tree, cache)
+    buildings = BuildingsRepository(session, cache)
+    organizations = OrganizationsRepository(session, activities, cache)
+    await buildings.list_all(DEFAULT_PAGE_SIZE)
+    await buildings.get_many([probe])
+    await activities.get_many([probe])
+    await activities.get_children_list(None)
+    await organizations.list_all(DEFAULT_PAGE_SIZE, include=frozenset(OrganizationInclude))
+    await organizations.get_many([probe])
+    await organizations.find_by_phone("+70000000000")
+
+
+async def _warm_up_pool(
+    session_maker: async_sessionmaker[AsyncSession], connections: int, tree: ActivityTree, cache: ResponseCache,
+) -> None:
+    """
+    Открыть connections соединений пула одновременно и прогреть каждое
+    Ошибка одного соединения ломает барьер, чтобы остальные не ждали его вечно
+    """
+    barrier = asyncio.Barrier(connections)
+
+    async def warm_connection() -> None:
+        try:
+            async with session_maker() as session:
+                # Все сессии держат соединения до барьера, поэтому пул открывает разные
+                await session.connection()
+                await barrier.wait()
+                await _run_hot_queries(session, tree, cache)
+                await session.rollback()
+        except BaseException:
+            await barrier.abort()
+            raise
+
+    results = await asyncio.gather(*(warm_connection() for _ in range(connections)), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    # BrokenBarrierError - следствие ошибки другого соединения
+    failures = [error for error in errors if not isinstance(error, asyncio.BrokenBarrierError)] or errors
+    for error in failures:
+        logger.error("Прогрев соединения не удался", exc_info=error)
+    if failures:
+        raise failures[0]
+
+
+async def warm_up(database: Database, connections: int, tree: ActivityTree, cache: ResponseCache) -> None:
+    """
+    Подготовить процесс к первым запросам: загрузить дерево видов деятельности,
+    открыть соединения пулов и прогнать на них частые запросы
+    """
+    async with database.session_maker() as session:
+        await tree.ensure_loaded(session)
+    if connections <= 0:
+        return
+    await _warm_up_pool(database.session_maker, connections, tree, cache)
+    if database.replica_engine is not None:
+        await _warm_up_pool(database.replica_session_maker, connections, tree, cache)
+    logger.info("Прогрев завершён: %s соединений на пул", connections)
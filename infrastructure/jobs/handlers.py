@@ -0,0 +1,76 @@
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, asdict
+from typing import Any
+
+from configuration.base import ProjectSettings
+from domain.entities.bulk_import import ImportKind, ImportFormat
+from domain.entities.jobs import Job, JobKind
+from infrastructure.cache.activity_tree import ActivityTree
+from infrastructure.cache.response import ResponseCache
+from infrastructure.db.database import Database
+from infrastructure.db.warmup import warm_up
+from infrastructure.repositories.bulk_import import BulkImportRepository
+from infrastructure.repositories.jobs import JobsRepository
+from infrastructure.repositories.organization_counts import rebuild_counts
+from infrastructure.services.bulk_import import BulkImportService
+
+# Размер куска, которым тело загрузки отдаётся разбору
+IMPORT_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class JobContext:
+    """Общие объекты процесса, нужные задачам"""
+    database: Database
+    tree: ActivityTree
+    cache: ResponseCache
+    config: ProjectSettings
+
+
+JobHandler = Callable[[JobContext, Job], Awaitable[dict[str, Any] | None]]
+
+
+async def _chunks(data: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), IMPORT_CHUNK_SIZE):
+        yield data[start:start + IMPORT_CHUNK_SIZE]
+
+
+async def run_import(context: JobContext, job: Job) -> dict[str, Any]:
+    """
+    Пакетная загрузка из сохранённого тела запроса
+    Пакеты фиксируются по отдельности, поэтому при повторе уже загруженные строки
+    попадают в отчёт как дубликаты
+    """
+    async with context.database.session_maker() as session:
+        data = await JobsRepository(session).get_input(job.id)
+    async with context.database.session_maker() as session:
+        service = BulkImportService(
+            repository=BulkImportRepository(session, context.tree, context.cache),
+            batch_size=context.config.bulk_import_batch_size,
+        )
+        report = await service.import_stream(
+            ImportKind(job.payload["kind"]), ImportFormat(job.payload["format"]), _chunks(data),
+        )
+    return asdict(report)
+
+
+async def run_recount_organizations(context: JobContext, job: Job) -> None:
+    """Пересчитать счётчики организаций зданий и видов деятельности"""
+    async with context.database.session_maker() as session:
+        for stmt in rebuild_counts():
+            await session.execute(stmt)
+        await session.commit()
+
+
+async def run_warm_up(context: JobContext, job: Job) -> None:
+    """Прогреть процесс, захвативший задачу: дерево видов деятельности и соединения пулов"""
+    config = context.config
+    connections = min(config.db_warmup_connections, config.db_pool_size)
+    await warm_up(context.database, connections, context.tree, context.cache)
+
+
+HANDLERS: dict[JobKind, JobHandler] = {
+    JobKind.IMPORT: run_import,
+    JobKind.RECOUNT_ORGANIZATIONS: run_recount_organizations,
+    JobKind.WARM_UP: run_warm_up,
+}
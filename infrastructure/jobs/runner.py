@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from contextlib import suppress
+from uuid import UUID
+
+from domain.entities.jobs import Job
+from infrastructure.jobs.handlers import JobContext, HANDLERS
+from infrastructure.repositories.jobs import JobsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    """
+    Исполнитель фоновых задач в процессе
+    Опрос захватывает из таблицы jobs не больше задач, чем свободных исполнителей,
+    и передаёт их через ограниченную очередь. Пока задача выполняется, её аренда
+    продлевается; задачи упавшего процесса захватываются повторно после истечения аренды
+    """
+
+    def __init__(self, context: JobContext):
+        config = context.config
+        self.context = context
+        self._workers = config.jobs_workers
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(maxsize=max(1, config.jobs_workers))
+        self._idle = config.jobs_workers
+        self._running: set[UUID] = set()
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Запустить опрос и исполнителей"""
+        if self._workers <= 0:
+            return
+        self._tasks = [asyncio.create_task(self._poll())]
+        self._tasks += [asyncio.create_task(self._work()) for _ in range(self._workers)]
+
+    def notify(self) -> None:
+        """Разбудить опрос: в очередь поставлена задача"""
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Остановить исполнителей и вернуть в очередь незавершённые задачи процесса"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        unfinished = list(self._running)
+        while not self._queue.empty():
+            unfinished.append(self._queue.get_nowait().id)
+        if not unfinished:
+            return
+        try:
+            async with self.context.database.session_maker() as session:
+                await JobsRepository(session).release(unfinished)
+        except Exception:
+            logger.exception("Не удалось вернуть в очередь задачи %s", unfinished)
+
+    async def _poll(self) -> None:
+        config = self.context.config
+        while True:
+            self._wakeup.clear()
+            capacity = self._idle - self._queue.qsize()
+            if capacity > 0:
+                try:
+                    async with self.context.database.session_maker() as session:
+                        repository = JobsRepository(session)
+                        await repository.fail_abandoned(config.jobs_max_attempts)
+                        jobs = await repository.claim(capacity, config.jobs_lease_seconds, config.jobs_max_attempts)
+                except Exception:
+                    logger.exception("Не удалось захватить фоновые задачи")
+                    jobs = []
+                for job in jobs:
+                    self._queue.put_nowait(job)
+                if len(jobs) == capacity:
+                    # Свободные исполнители заняты, но в очереди могут остаться задачи
+                    continue
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), config.jobs_poll_interval)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._idle -= 1
+            self._running.add(job.id)
+            try:
+                await self._run(job)
+            except Exception:
+                # Результат не записан: задача будет повторена после истечения аренды
+                logger.exception("Не удалось завершить задачу %s", job.id)
+            finally:
+                self._running.discard(job.id)
+                self._idle += 1
+                self._wakeup.set()
+
+    async def _run(self, job: Job) -> None:
+        heartbeat = asyncio.create_task(self._extend_lease(job.id))
+        try:
+            result = await HANDLERS[job.kind](self.context, job)
+        except Exception as e:
+            logger.exception("Задача %s (%s) завершилась ошибкой", job.id, job.kind)
+            outcome = {"error": str(e) or type(e).__name__}
+        else:
+            outcome = {"result": result}
+        finally:
+            heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeat
+        async with self.context.database.session_maker() as session:
+            await JobsRepository(session).finish(job.id, **outcome)
+
+    async def _extend_lease(self, job_id: UUID) -> None:
+        lease = self.context.config.jobs_lease_seconds
+        while True:
+            await asyncio.sleep(lease / 3)
+            try:
+                async with self.context.database.session_maker() as session:
+                    await JobsRepository(session).extend_lease(job_id, lease)
+            except Exception:
+                logger.warning("Не удалось продлить аренду задачи %s", job_id, exc_info=True)
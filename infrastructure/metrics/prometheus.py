@@ -0,0 +1,110 @@
+import math
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+
+from infrastructure.metrics.request import RequestMetrics
+
+LabelValues = tuple[str, ...]
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Рост числа запросов к БД на один HTTP-запрос - признак N+1
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: defaultdict[LabelValues, float] = defaultdict(float)
+
+    def inc(self, labels: LabelValues, amount: float = 1.0) -> None:
+        self._values[labels] += amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labels, labels)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = (*buckets, math.inf)
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: defaultdict[LabelValues, float] = defaultdict(float)
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        counts = self._counts.setdefault(labels, [0] * len(self.buckets))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        self._sums[labels] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, counts in self._counts.items():
+            for bound, count in zip(self.buckets, counts):
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                yield f"{self.name}_bucket{_format_labels((*self.labels, 'le'), (*labels, le))} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {self._sums[labels]}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {counts[-1]}"
+
+
+class RequestMetricsRegistry:
+    """
+    Агрегаты метрик запросов в памяти процесса в текстовом формате Prometheus
+    Метки - метод и шаблон маршрута, а не фактический путь, чтобы число рядов не росло
+    """
+
+    def __init__(self):
+        self.requests = Counter("http_requests_total", "HTTP-запросы", ("method", "route", "status"))
+        self.duration = Histogram(
+            "http_request_duration_seconds", "Длительность HTTP-запроса", ("method", "route"), DURATION_BUCKETS,
+        )
+        self.statements = Histogram(
+            "db_statements_per_request", "Число SQL-запросов на HTTP-запрос", ("method", "route"), STATEMENT_BUCKETS,
+        )
+        self.db_time = Counter("db_time_seconds_total", "Время выполнения SQL", ("method", "route"))
+        self.pool_wait = Counter("db_pool_wait_seconds_total", "Ожидание соединения из пула", ("method", "route"))
+        self.mapping = Counter("orm_mapping_seconds_total", "Сборка сущностей из строк БД", ("method", "route"))
+        self.serialization = Counter(
+            "response_serialization_seconds_total", "Сериализация ответов", ("method", "route"),
+        )
+
+    def observe(self, method: str, route: str, status: int, metrics: RequestMetrics, duration: float) -> None:
+        labels = (method, route)
+        self.requests.inc((method, route, str(status)))
+        self.duration.observe(labels, duration)
+        self.statements.observe(labels, metrics.statements)
+        self.db_time.inc(labels, metrics.db_seconds)
+        self.pool_wait.inc(labels, metrics.pool_wait_seconds)
+        self.mapping.inc(labels, metrics.mapping_seconds)
+        self.serialization.inc(labels, metrics.serialization_seconds)
+
+    def render(self) -> str:
+        metrics = (
+            self.requests, self.duration, self.statements,
+            self.db_time, self.pool_wait, self.mapping, self.serialization,
+        )
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+def render_gauges(name: str, documentation: str, label: str, samples: dict[str, float]) -> str:
+    """Отрисовать набор значений одной gauge-метрики"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    lines += [f"{name}{_format_labels((label,), (value_label,))} {value}" for value_label, value in samples.items()]
+    return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,61 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+
+
+@dataclass
+class RequestMetrics:
+    """Счётчики одного HTTP-запроса"""
+    statements: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    mapping_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Значение заголовка Server-Timing (длительности в миллисекундах)"""
+        return ", ".join((
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.statements} statements"',
+            f"pool;dur={self.pool_wait_seconds * 1000:.2f}",
+            f"mapping;dur={self.mapping_seconds * 1000:.2f}",
+            f"serialize;dur={self.serialization_seconds * 1000:.2f}",
+            f"total;dur={total_seconds * 1000:.2f}",
+        ))
+
+
+# Метрики текущего запроса. Движок SQLAlchemy выполняет запросы в greenlet
+# с контекстом вызывающей задачи, поэтому события БД видят ту же переменную
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> RequestMetrics | None:
+    """Метрики текущего запроса (None вне HTTP-запроса, например в CLI)"""
+    return _current.get()
+
+
+def start_request() -> tuple[RequestMetrics, Token]:
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def timed(field: str) -> Iterator[None]:
+    """
+    Добавить время выполнения блока к полю метрик текущего запроса
+    Работает и как декоратор: @timed("serialization_seconds")
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, field, getattr(metrics, field) + time.perf_counter() - started)
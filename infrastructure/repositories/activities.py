@@ -1,17 +1,26 @@
+import uuid
 from uuid import UUID
 
-from sqlalchemy import select, literal, func, delete, exists
+from sqlalchemy import select, delete, exists, ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.activities import Activity
+from domain.entities.batch import BatchResult
 from configuration.exceptions import ParentActivityNotFoundError, ActivityDepthLimitError, ActivityNotFoundError, \
     ActivityHasChildrenError
 from domain.mapper.activities import map_activity_to_entity
+from infrastructure.cache.activity_tree import ActivityTree
+from infrastructure.cache.response import ResponseCache, CacheTag
 from infrastructure.db.models import ActivityModel
+from infrastructure.db.types import child_path
+from infrastructure.repositories.batch import unique_ids, build_batch
+from infrastructure.repositories.organization_counts import recount_activity_counts
 
 class ActivitiesRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, tree: ActivityTree, cache: ResponseCache):
         self.session = session
+        self.tree = tree
+        self.cache = cache
 
     async def get_by_id(self, activity_id: UUID) -> Activity:
         """Получить вид деятельности по ID"""
@@ -28,6 +37,14 @@ class ActivitiesRepository:
             raise ActivityNotFoundError
         return map_activity_to_entity(activity)
 
+    async def get_many(self, activity_ids: list[UUID]) -> BatchResult[Activity]:
+        """Получить виды деятельности по списку ID одним запросом, сохраняя порядок запроса"""
+        ids = unique_ids(activity_ids)
+        stmt = select(ActivityModel.id, ActivityModel.name, ActivityModel.parent_id).where(ActivityModel.id.in_(ids))
+        res = await self.session.execute(stmt)
+        activities = [Activity(id=row.id, name=row.name, parent_id=row.parent_id) for row in res.all()]
+        return build_batch(ids, activities, lambda activity: activity.id)
+
     async def get_children_list(self, parent_id: UUID | None) -> list[Activity]:
         """Получить список дочерних активностей по ID родителя"""
         stmt = select(ActivityModel).where(ActivityModel.parent_id == parent_id).order_by(ActivityModel.name.asc())
@@ -39,23 +56,28 @@ class ActivitiesRepository:
         Создать новый вид деятельности
         Проверяет существование родителя и ограничение по глубине (до 3 уровней)
         """
-        if activity.parent_id is not None:
-            parent_exists = await self.session.scalar(
-                select(exists().where(ActivityModel.id == activity.parent_id))
-            )
-            if not parent_exists:
+        await self.tree.ensure_loaded(self.session)
+        if activity.parent_id is not None and activity.parent_id not in self.tree:
+            # Родитель мог появиться в другом процессе после загрузки кэша
+            await self.tree.reload(self.session)
+            if activity.parent_id not in self.tree:
                 raise ParentActivityNotFoundError
 
-        depth = await self._get_depth_from_node(activity.parent_id)
-        if depth >= 3:
+        if self.tree.depth(activity.parent_id) >= 3:
             raise ActivityDepthLimitError
+        activity_id = uuid.uuid4()
+        parent_path = self.tree.path(activity.parent_id) if activity.parent_id is not None else None
         activity_model= ActivityModel(
+            id=activity_id,
             name= activity.name,
-            parent_id=activity.parent_id
+            parent_id=activity.parent_id,
+            path=child_path(parent_path, activity_id),
         )
         self.session.add(activity_model)
         # await self.session.flush()
         await self.session.commit()
+        self.tree.add(activity_model.id, activity_model.parent_id)
+        await self.cache.invalidate(CacheTag.ACTIVITIES)
         return map_activity_to_entity(activity_model)
 
     async def delete(self, activity_id: UUID) -> None:
@@ -67,56 +89,29 @@ class ActivitiesRepository:
         children = await self.get_children_list(activity_id)
         if children:
             raise ActivityHasChildrenError
-        stmt = delete(ActivityModel).where(ActivityModel.id == activity_id)
-        await self.session.execute(stmt)
+        stmt = delete(ActivityModel).where(ActivityModel.id == activity_id).returning(ActivityModel.path)
+        deleted_path = await self.session.scalar(stmt)
+        if deleted_path is None:
+            raise ActivityNotFoundError
+        # Связи с организациями удалены каскадно: предкам пересчитываются счётчики.
+        # Предки берутся из БД в той же транзакции - кэш дерева процесса может отставать
+        ancestors = select(ActivityModel.id).where(ActivityModel.path.ancestor_of(deleted_path))
+        await self.session.execute(recount_activity_counts(ancestors))
         await self.session.commit()
-
-    async def get_descendant(self, root_id: UUID) -> list[UUID]:
-        cte = self._create_descendants_cte(root_id)
-        rows = await self.session.execute(select(cte.c.id))
-        return [r[0] for r in rows.all()]
-
+        self.tree.remove(activity_id)
+        await self.cache.invalidate(CacheTag.ACTIVITIES)
 
     @staticmethod
-    def _create_ancestors_cte(child_id: UUID):
-        base = select(
-            ActivityModel.id,
-            literal(1).label("depth"),
-        ).where(ActivityModel.id == child_id)
-
-        cte = base.cte(name="ancestors", recursive=True)
-
-        up = (
-            select(
-                ActivityModel.parent_id.label("id"),
-                (cte.c.depth + 1).label("depth"),
-            )
-            .join(ActivityModel, ActivityModel.id == cte.c.id)
-            .where(ActivityModel.parent_id.is_not(None))
-        )
-
-        return cte.union_all(up)
-
-    @staticmethod
-    def _create_descendants_cte(parent_id: UUID):
-        base_query = select(
-            ActivityModel.id,
-        ).where(ActivityModel.id == parent_id)
-
-        cte = base_query.cte(name="descendants", recursive=True)
-
-        recursive_query = select(
-            ActivityModel.id,
-        ).join(cte, ActivityModel.parent_id == cte.c.id)
-
-        cte = cte.union_all(recursive_query)
-
-        return cte
-
-    async def _get_depth_from_node(self, parent_id: UUID | None) -> int:
-        if parent_id is None:
-            return 0
-        cte = self._create_ancestors_cte(child_id=parent_id)
-        res = await self.session.execute(select(func.max(cte.c.depth)))
-        return res.scalar_one() or 0
+    def subtree_clause(root_id: UUID) -> ColumnElement[bool]:
+        """Условие принадлежности вида деятельности поддереву root_id по материализованному пути"""
+        root_path = select(ActivityModel.path).where(ActivityModel.id == root_id).scalar_subquery()
+        return ActivityModel.path.descendant_of(root_path)
 
+    async def get_descendant(self, root_id: UUID) -> list[UUID]:
+        """Получить ID вида деятельности и всех его потомков из кэша дерева"""
+        await self.tree.ensure_loaded(self.session)
+        if root_id not in self.tree and await self.session.scalar(select(exists().where(ActivityModel.id == root_id))):
+            # Вид деятельности мог появиться в другом процессе после загрузки кэша;
+            # несуществующий ID дерево не перечитывает
+            await self.tree.reload(self.session)
+        return list(self.tree.descendants(root_id))
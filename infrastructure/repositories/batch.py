@@ -0,0 +1,23 @@
+from collections.abc import Callable, Iterable, Sequence
+from typing import TypeVar
+from uuid import UUID
+
+from domain.entities.batch import BatchResult
+
+T = TypeVar("T")
+
+MAX_BATCH_SIZE = 500
+
+
+def unique_ids(ids: Iterable[UUID]) -> list[UUID]:
+    """ID без повторов в порядке первого появления"""
+    return list(dict.fromkeys(ids))
+
+
+def build_batch(ids: Sequence[UUID], items: Iterable[T], key: Callable[[T], UUID]) -> BatchResult[T]:
+    """Разложить найденные записи в порядке запрошенных ID и собрать ненайденные"""
+    by_id = {key(item): item for item in items}
+    return BatchResult(
+        items=[by_id[item_id] for item_id in ids if item_id in by_id],
+        missing_ids=[item_id for item_id in ids if item_id not in by_id],
+    )
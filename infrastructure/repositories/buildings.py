@@ -1,18 +1,28 @@
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, Select, func, and_, ColumnElement, Text, cast, distinct
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from domain.entities.batch import BatchResult
 from domain.entities.buildings import Building
+from domain.entities.pagination import Page
 from configuration.exceptions import DuplicateBuildingAddressError, BuildingCreateError, BuildingNotFoundError
-from domain.mapper.buildings import map_building_to_entity
-from infrastructure.db.models import BuildingModel
+from domain.mapper.buildings import map_building_to_entity, map_building_row_to_entity, BUILDING_COLUMNS
+from infrastructure.cache.response import ResponseCache, CacheTag
+from infrastructure.db.geo import make_point, square_prefilter_circle, tile_bounds, TILE_EXTENT, TILE_BUFFER, \
+    WGS84_SRID, WEB_MERCATOR_SRID
+from infrastructure.db.models import BuildingModel, OrganizationModel, BuildingOrganizationCountModel, \
+    organization_activities
+from infrastructure.metrics.request import timed
+from infrastructure.repositories.batch import unique_ids, build_batch
+from infrastructure.repositories.pagination import decode_cursor, parse_cursor_uuid, build_page
 
 
 
 class BuildingsRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: ResponseCache):
         self.session = session
+        self.cache = cache
 
     async def create(self, building: Building):
         """
@@ -36,6 +46,8 @@ class BuildingsRepository:
             await self.session.rollback()
             raise BuildingCreateError(str(e))
 
+        await self.cache.invalidate(CacheTag.BUILDINGS)
+        await self.cache.invalidate_points([(building.latitude, building.longitude)])
         return map_building_to_entity(building_model)
 
     async def get_by_id(self, building_id: UUID) -> Building:
@@ -45,20 +57,105 @@ class BuildingsRepository:
             raise BuildingNotFoundError
         return map_building_to_entity(building)
 
-    async def list_all(self) -> list[Building]:
-        """Получить список всех зданий"""
-        stmt = select(BuildingModel).order_by(BuildingModel.id)
-        buildings = await self.session.execute(stmt)
-        result = buildings.scalars().all()
-        return [map_building_to_entity(model) for model in result]
+    async def get_many(self, building_ids: list[UUID]) -> BatchResult[Building]:
+        """Получить здания по списку ID одним запросом, сохраняя порядок запроса"""
+        ids = unique_ids(building_ids)
+        res = await self.session.execute(select(*BUILDING_COLUMNS).where(BuildingModel.id.in_(ids)))
+        with timed("mapping_seconds"):
+            buildings = [map_building_row_to_entity(row) for row in res.all()]
+        return build_batch(ids, buildings, lambda building: building.id)
 
-    async def list_by_square( self, lat_min: float, lon_min: float, lat_max: float, lon_max: float):
-        """Получить здания, которые находятся в прямоугольной области"""
+    async def list_all(self, limit: int, cursor: str | None = None) -> Page[Building]:
+        """Получить страницу всех зданий"""
+        stmt = select(*BUILDING_COLUMNS)
+        return await self._list_page(stmt, limit, cursor)
+
+    async def list_by_square(
+        self, lat_min: float, lon_min: float, lat_max: float, lon_max: float, limit: int, cursor: str | None = None,
+    ) -> Page[Building]:
+        """Получить страницу зданий, которые находятся в прямоугольной области"""
+        stmt = select(*BUILDING_COLUMNS).where(self.square_clause(lat_min, lon_min, lat_max, lon_max))
+        return await self._list_page(stmt, limit, cursor)
+
+    async def list_by_radius(self, latitude: float, longitude: float, radius: float, limit: int) -> list[Building]:
+        """Получить ближайшие здания в радиусе radius метров, отсортированные по расстоянию"""
+        center = make_point(latitude, longitude)
         stmt = (
-            select(BuildingModel)
-            .where(BuildingModel.latitude.between(lat_min, lat_max))
-            .where(BuildingModel.longitude.between(lon_min, lon_max))
+            select(*BUILDING_COLUMNS)
+            .where(self.radius_clause(latitude, longitude, radius))
+            .order_by(func.ST_Distance(BuildingModel.location, center), BuildingModel.id)
+            .limit(limit)
+        )
+        res = await self.session.execute(stmt)
+        with timed("mapping_seconds"):
+            return [map_building_row_to_entity(row) for row in res.all()]
+
+    async def tile(self, z: int, x: int, y: int) -> bytes:
+        """
+        Векторный тайл (Mapbox Vector Tile) зданий тайла z/x/y со слоем buildings
+        Атрибуты: id, address, число организаций и ID их видов деятельности через запятую.
+        Здания отбираются тем же условием, что и list_by_square, с запасом TILE_BUFFER
+        """
+        lat_min, lon_min, lat_max, lon_max = tile_bounds(z, x, y, TILE_BUFFER / TILE_EXTENT)
+        point = func.ST_Transform(
+            func.ST_SetSRID(func.ST_MakePoint(BuildingModel.longitude, BuildingModel.latitude), WGS84_SRID),
+            WEB_MERCATOR_SRID,
+        )
+        activity_ids = (
+            select(func.string_agg(distinct(cast(organization_activities.c.activity_id, Text)), ","))
+            .select_from(OrganizationModel)
+            .join(organization_activities, organization_activities.c.organization_id == OrganizationModel.id)
+            .where(OrganizationModel.building_id == BuildingModel.id)
+            .scalar_subquery()
         )
-        res = await self.session.scalars(stmt)
-        return [map_building_to_entity(m) for m in res.all()]
+        features = (
+            select(
+                cast(BuildingModel.id, Text).label("id"),
+                BuildingModel.address,
+                func.coalesce(BuildingOrganizationCountModel.organizations, 0).label("organizations"),
+                activity_ids.label("activity_ids"),
+                func.ST_AsMVTGeom(point, func.ST_TileEnvelope(z, x, y), TILE_EXTENT, TILE_BUFFER).label("geom"),
+            )
+            .outerjoin(
+                BuildingOrganizationCountModel, BuildingOrganizationCountModel.building_id == BuildingModel.id,
+            )
+            .where(self.square_clause(lat_min, lon_min, lat_max, lon_max))
+            .subquery("features")
+        )
+        stmt = select(func.ST_AsMVT(features.table_valued(), "buildings", TILE_EXTENT, "geom"))
+        return await self.session.scalar(stmt) or b""
+
+    @staticmethod
+    def square_clause(lat_min: float, lon_min: float, lat_max: float, lon_max: float) -> ColumnElement[bool]:
+        """
+        Условие попадания здания в прямоугольную область
+        ST_DWithin по описанной окружности отбирает кандидатов по GiST-индексу,
+        точная проверка идёт по широте и долготе. Для очень больших областей
+        окружности нет, остаётся только точная проверка
+        """
+        bounds = and_(
+            BuildingModel.latitude.between(lat_min, lat_max),
+            BuildingModel.longitude.between(lon_min, lon_max),
+        )
+        circle = square_prefilter_circle(lat_min, lon_min, lat_max, lon_max)
+        if circle is None:
+            return bounds
+        center_lat, center_lon, radius = circle
+        return and_(func.ST_DWithin(BuildingModel.location, make_point(center_lat, center_lon), radius), bounds)
+
+    @staticmethod
+    def radius_clause(latitude: float, longitude: float, radius: float) -> ColumnElement[bool]:
+        """Условие попадания здания в радиус radius метров от точки"""
+        return func.ST_DWithin(BuildingModel.location, make_point(latitude, longitude), radius)
+
+    async def _list_page(self, stmt: Select, limit: int, cursor: str | None) -> Page[Building]:
+        """Выполнить запрос с keyset-пагинацией по id"""
+        if cursor is not None:
+            (building_id,) = decode_cursor(cursor, 1)
+            stmt = stmt.where(BuildingModel.id > parse_cursor_uuid(building_id))
+        stmt = stmt.order_by(BuildingModel.id.asc()).limit(limit + 1)
+        res = await self.session.execute(stmt)
+        with timed("mapping_seconds"):
+            buildings = [map_building_row_to_entity(row) for row in res.all()]
+        return build_page(buildings, limit, lambda building: (building.id,))
 
@@ -0,0 +1,235 @@
+import uuid
+from collections.abc import Callable, Sequence
+from typing import TypeVar, Any
+
+from sqlalchemy import select, insert, Executable
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.bulk_import import (
+    BuildingImportRow, ActivityImportRow, OrganizationImportRow, ImportReport,
+)
+from domain.phones import unique_phones
+from infrastructure.cache.activity_tree import ActivityTree
+from infrastructure.cache.response import ResponseCache, CacheTag
+from infrastructure.db.models import (
+    BuildingModel, ActivityModel, OrganizationModel, OrganizationPhoneModel, organization_activities,
+)
+from infrastructure.db.types import child_path, any_of
+from infrastructure.repositories.organization_counts import add_organization_counts
+
+RowT = TypeVar("RowT", BuildingImportRow, ActivityImportRow, OrganizationImportRow)
+# Запрос и строки для executemany (None - обычное выполнение)
+Statement = tuple[Executable, list[dict[str, Any]] | None]
+
+
+class BulkImportRepository:
+    """
+    Пакетная загрузка зданий, видов деятельности и организаций
+    Каждый пакет - несколько INSERT в форме executemany и один commit:
+    SQLAlchemy сам делит строки на страницы в пределах лимита параметров драйвера.
+    Ошибки отдельных строк попадают в отчёт и не прерывают загрузку
+    """
+
+    def __init__(self, session: AsyncSession, tree: ActivityTree, cache: ResponseCache):
+        self.session = session
+        self.tree = tree
+        self.cache = cache
+
+    async def import_buildings(self, rows: list[BuildingImportRow], report: ImportReport) -> None:
+        """Загрузить пакет зданий, пропуская уже существующие адреса"""
+        rows = self._unique(rows, lambda row: row.address, report, "Адрес повторяется в файле")
+        existing = set(await self.session.scalars(
+            select(BuildingModel.address).where(any_of(BuildingModel.address, [row.address for row in rows]))
+        ))
+        new_rows = []
+        for row in rows:
+            if row.address in existing:
+                report.add_error(row.line, f"Здание с адресом '{row.address}' уже существует")
+            else:
+                new_rows.append(row)
+        if not new_rows:
+            return
+
+        values = [
+            {"id": uuid.uuid4(), "address": row.address, "latitude": row.latitude, "longitude": row.longitude}
+            for row in new_rows
+        ]
+        if await self._execute_batch([(insert(BuildingModel.__table__), values)], new_rows, report):
+            report.inserted += len(new_rows)
+            # Пакет затрагивает много тайлов: дешевле сбросить все, чем каждый по точкам
+            await self.cache.invalidate(CacheTag.BUILDINGS, CacheTag.TILES)
+
+    async def import_activities(self, rows: list[ActivityImportRow], report: ImportReport) -> None:
+        """
+        Загрузить пакет видов деятельности
+        Родитель указывается по названию и может находиться в том же пакете
+        """
+        rows = self._unique(rows, lambda row: row.name, report, "Название повторяется в файле")
+        names = {row.name for row in rows} | {row.parent_name for row in rows if row.parent_name}
+        known = dict((await self.session.execute(
+            select(ActivityModel.name, ActivityModel.id).where(any_of(ActivityModel.name, names))
+        )).all())
+        await self.tree.ensure_loaded(self.session)
+        if any(activity_id not in self.tree for activity_id in known.values()):
+            await self.tree.reload(self.session)
+
+        pending = []
+        for row in rows:
+            if row.name in known:
+                report.add_error(row.line, f"Вид деятельности '{row.name}' уже существует")
+            else:
+                pending.append(row)
+
+        # Родители вставляются раньше детей: строки разбираются волнами,
+        # пока находятся строки с уже известным родителем
+        created: dict[str, tuple[uuid.UUID, str, int]] = {}
+        rejected: set[str] = set()
+        accepted: list[ActivityImportRow] = []
+        values: list[dict] = []
+        progress = True
+        while pending and progress:
+            progress = False
+            waiting = []
+            for row in pending:
+                if row.parent_name is None:
+                    parent_id, parent_path, parent_depth = None, None, 0
+                elif row.parent_name in created:
+                    parent_id, parent_path, parent_depth = created[row.parent_name]
+                elif row.parent_name in known:
+                    parent_id = known[row.parent_name]
+                    parent_path, parent_depth = self.tree.path(parent_id), self.tree.depth(parent_id)
+                elif row.parent_name in rejected:
+                    progress = True
+                    rejected.add(row.name)
+                    report.add_error(row.line, f"Родитель '{row.parent_name}' не был загружен")
+                    continue
+                else:
+                    waiting.append(row)
+                    continue
+
+                progress = True
+                if parent_depth >= 3:
+                    rejected.add(row.name)
+                    report.add_error(row.line, "Превышена допустимая глубина иерархии (максимум 3 уровня)")
+                    continue
+                activity_id = uuid.uuid4()
+                path = child_path(parent_path, activity_id)
+                created[row.name] = (activity_id, path, parent_depth + 1)
+                accepted.append(row)
+                values.append({"id": activity_id, "name": row.name, "parent_id": parent_id, "path": path})
+            pending = waiting
+
+        for row in pending:
+            report.add_error(row.line, f"Родитель '{row.parent_name}' не найден")
+        if not values:
+            return
+
+        if await self._execute_batch([(insert(ActivityModel.__table__), values)], accepted, report):
+            report.inserted += len(values)
+            for value in values:
+                self.tree.add(value["id"], value["parent_id"])
+            await self.cache.invalidate(CacheTag.ACTIVITIES)
+
+    async def import_organizations(self, rows: list[OrganizationImportRow], report: ImportReport) -> None:
+        """
+        Загрузить пакет организаций с телефонами и видами деятельности
+        Здания и виды деятельности ищутся по адресу и названию одним запросом на пакет
+        """
+        rows = self._unique(rows, lambda row: row.name, report, "Название повторяется в файле")
+        addresses = {row.building_address for row in rows}
+        activity_names = {name for row in rows for name in row.activity_names}
+        building_ids: dict[str, uuid.UUID] = {}
+        for address, building_id in (await self.session.execute(
+            select(BuildingModel.address, BuildingModel.id).where(any_of(BuildingModel.address, addresses))
+        )).all():
+            building_ids.setdefault(address, building_id)
+        activity_ids = dict((await self.session.execute(
+            select(ActivityModel.name, ActivityModel.id).where(any_of(ActivityModel.name, activity_names))
+        )).all()) if activity_names else {}
+
+        candidates: dict[uuid.UUID, OrganizationImportRow] = {}
+        for row in rows:
+            if row.building_address not in building_ids:
+                report.add_error(row.line, f"Здание с адресом '{row.building_address}' не найдено")
+                continue
+            missing = [name for name in row.activity_names if name not in activity_ids]
+            if missing:
+                report.add_error(row.line, f"Виды деятельности не найдены: {', '.join(missing)}")
+                continue
+            candidates[uuid.uuid4()] = row
+        if not candidates:
+            return
+
+        organizations = OrganizationModel.__table__
+        stmt = (
+            pg_insert(organizations)
+            .on_conflict_do_nothing(index_elements=[organizations.c.name])
+            .returning(organizations.c.id)
+        )
+        values = [
+            {"id": organization_id, "name": row.name, "building_id": building_ids[row.building_address]}
+            for organization_id, row in candidates.items()
+        ]
+        try:
+            inserted_ids = set((await self.session.execute(stmt, values)).scalars().all())
+        except SQLAlchemyError as e:
+            await self._fail_batch(list(candidates.values()), report, e)
+            return
+
+        phones, links = [], []
+        for organization_id, row in candidates.items():
+            if organization_id not in inserted_ids:
+                report.add_error(row.line, f"Организация '{row.name}' уже существует")
+                continue
+            for phone_e164, phone in unique_phones(row.phones).items():
+                phones.append({
+                    "id": uuid.uuid4(), "organization_id": organization_id, "phone": phone, "phone_e164": phone_e164,
+                })
+            for name in dict.fromkeys(row.activity_names):
+                links.append({"organization_id": organization_id, "activity_id": activity_ids[name]})
+
+        statements: list[Statement] = []
+        if phones:
+            statements.append((insert(OrganizationPhoneModel.__table__), phones))
+        if links:
+            statements.append((insert(organization_activities), links))
+        if inserted_ids:
+            statements.extend((stmt, None) for stmt in add_organization_counts(list(inserted_ids)))
+        inserted_rows = [row for organization_id, row in candidates.items() if organization_id in inserted_ids]
+        if await self._execute_batch(statements, inserted_rows, report):
+            report.inserted += len(inserted_rows)
+            # Пакет затрагивает много тайлов: дешевле сбросить все, чем каждый по точкам
+            await self.cache.invalidate(CacheTag.ORGANIZATIONS, CacheTag.TILES)
+
+    async def _execute_batch(self, statements: Sequence[Statement], rows: Sequence[RowT], report: ImportReport) -> bool:
+        """Выполнить вставки пакета и зафиксировать; при ошибке все строки пакета считаются неудачными"""
+        try:
+            for stmt, params in statements:
+                await self.session.execute(stmt, params)
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self._fail_batch(rows, report, e)
+            return False
+        return True
+
+    async def _fail_batch(self, rows: Sequence[RowT], report: ImportReport, error: SQLAlchemyError) -> None:
+        await self.session.rollback()
+        message = f"Ошибка записи пакета: {error.__class__.__name__}: {getattr(error, 'orig', error)}"
+        for row in rows:
+            report.add_error(row.line, message)
+
+    @staticmethod
+    def _unique(
+        rows: list[RowT], key: Callable[[RowT], str], report: ImportReport, message: str,
+    ) -> list[RowT]:
+        seen: set[str] = set()
+        unique = []
+        for row in rows:
+            if key(row) in seen:
+                report.add_error(row.line, message)
+            else:
+                seen.add(key(row))
+                unique.append(row)
+        return unique
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, insert, update, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configuration.exceptions import JobNotFoundError
+from domain.entities.jobs import Job, JobKind, JobStatus
+from domain.mapper.jobs import map_job_row_to_entity, JOB_COLUMNS
+from infrastructure.db.models import JobModel
+
+
+class JobsRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(self, kind: JobKind, payload: dict[str, Any], data: bytes | None = None) -> Job:
+        """Поставить задачу в очередь"""
+        res = await self.session.execute(
+            insert(JobModel)
+            .values(id=uuid4(), kind=kind, status=JobStatus.QUEUED, payload=payload, input=data, attempts=0)
+            .returning(*JOB_COLUMNS)
+        )
+        job = map_job_row_to_entity(res.one())
+        await self.session.commit()
+        return job
+
+    async def get(self, job_id: UUID) -> Job:
+        """Получить задачу по ID"""
+        res = await self.session.execute(select(*JOB_COLUMNS).where(JobModel.id == job_id))
+        row = res.one_or_none()
+        if row is None:
+            raise JobNotFoundError
+        return map_job_row_to_entity(row)
+
+    async def get_input(self, job_id: UUID) -> bytes:
+        """Входные данные задачи"""
+        return await self.session.scalar(select(JobModel.input).where(JobModel.id == job_id)) or b""
+
+    async def claim(self, limit: int, lease_seconds: float, max_attempts: int) -> list[Job]:
+        """
+        Захватить до limit задач в порядке постановки
+        SKIP LOCKED пропускает строки, которые захватывают другие процессы,
+        поэтому задача достаётся одному исполнителю без блокировок очереди.
+        Задача с истёкшей арендой (процесс упал) захватывается повторно, пока есть попытки
+        """
+        now = func.now()
+        claimable = (
+            select(JobModel.id)
+            .where(or_(
+                JobModel.status == JobStatus.QUEUED,
+                and_(
+                    JobModel.status == JobStatus.RUNNING,
+                    JobModel.locked_until < now,
+                    JobModel.attempts < max_attempts,
+                ),
+            ))
+            .order_by(JobModel.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        res = await self.session.execute(
+            update(JobModel)
+            .where(JobModel.id.in_(claimable))
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=JobModel.attempts + 1,
+                locked_until=now + timedelta(seconds=lease_seconds),
+                started_at=now,
+            )
+            .returning(*JOB_COLUMNS)
+        )
+        jobs = [map_job_row_to_entity(row) for row in res.all()]
+        await self.session.commit()
+        return jobs
+
+    async def fail_abandoned(self, max_attempts: int) -> None:
+        """Завершить ошибкой задачи, аренда которых истекла после последней попытки"""
+        await self.session.execute(
+            update(JobModel)
+            .where(
+                JobModel.status == JobStatus.RUNNING,
+                JobModel.locked_until < func.now(),
+                JobModel.attempts >= max_attempts,
+            )
+            .values(
+                status=JobStatus.FAILED, error="Исполнитель не завершил задачу", input=None,
+                locked_until=None, finished_at=func.now(),
+            )
+        )
+        await self.session.commit()
+
+    async def extend_lease(self, job_id: UUID, lease_seconds: float) -> None:
+        """Продлить аренду выполняемой задачи"""
+        await self.session.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id, JobModel.status == JobStatus.RUNNING)
+            .values(locked_until=func.now() + timedelta(seconds=lease_seconds))
+        )
+        await self.session.commit()
+
+    async def finish(self, job_id: UUID, result: dict[str, Any] | None = None, error: str | None = None) -> None:
+        """Записать результат или ошибку задачи; входные данные больше не нужны"""
+        await self.session.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id)
+            .values(
+                status=JobStatus.FAILED if error is not None else JobStatus.SUCCEEDED,
+                result=result,
+                error=error,
+                input=None,
+                locked_until=None,
+                finished_at=func.now(),
+            )
+        )
+        await self.session.commit()
+
+    async def release(self, job_ids: list[UUID]) -> None:
+        """Вернуть в очередь захваченные, но не начатые задачи (при остановке процесса)"""
+        await self.session.execute(
+            update(JobModel)
+            .where(JobModel.id.in_(job_ids), JobModel.status == JobStatus.RUNNING)
+            .values(
+                status=JobStatus.QUEUED, attempts=JobModel.attempts - 1, locked_until=None, started_at=None,
+            )
+        )
+        await self.session.commit()
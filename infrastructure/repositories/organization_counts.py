@@ -0,0 +1,108 @@
+from collections.abc import Sequence
+from uuid import UUID
+
+from sqlalchemy import select, func, exists, update, text, literal, Table, Select, Executable, ColumnElement
+from sqlalchemy.dialects.postgresql import insert as pg_insert, Insert
+from sqlalchemy.orm import aliased
+
+from infrastructure.db.models import (
+    ActivityModel, OrganizationModel, BuildingOrganizationCountModel, ActivityOrganizationCountModel,
+    organization_activities,
+)
+from infrastructure.db.types import any_of
+
+# Запросы обновления счётчиков организаций. Выполняются в транзакции записи
+# организаций или видов деятельности, поэтому счётчики не расходятся с данными
+
+_building_counts: Table = BuildingOrganizationCountModel.__table__
+_activity_counts: Table = ActivityOrganizationCountModel.__table__
+
+
+def _add_counts(table: Table, key: str, rows: Select) -> Insert:
+    """Прибавить к счётчикам значения из rows (ключ, число); недостающие строки создаются"""
+    stmt = pg_insert(table).from_select([key, "organizations"], rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[key]],
+        set_={"organizations": table.c.organizations + stmt.excluded.organizations},
+    )
+
+
+def increment_building_count(building_id: UUID) -> Insert:
+    """Учесть новую организацию в здании"""
+    return _add_counts(_building_counts, "building_id", select(literal(building_id), literal(1)))
+
+
+def increment_activity_counts(leaf_path: ColumnElement) -> Insert:
+    """
+    Учесть новую организацию у всех предков её видов деятельности
+    leaf_path - путь вида деятельности организации (колонка CTE или подзапроса);
+    предок учитывается один раз, даже если у организации несколько видов в его поддереве
+    """
+    ancestors = (
+        select(ActivityModel.id, literal(1))
+        .where(exists().where(ActivityModel.path.ancestor_of(leaf_path)))
+    )
+    return _add_counts(_activity_counts, "activity_id", ancestors)
+
+
+def add_organization_counts(organization_ids: Sequence[UUID]) -> list[Insert]:
+    """Учесть уже вставленные организации (вместе со связями) в счётчиках зданий и видов деятельности"""
+    leaf = aliased(ActivityModel)
+    buildings = (
+        select(OrganizationModel.building_id, func.count())
+        .where(any_of(OrganizationModel.id, organization_ids))
+        .group_by(OrganizationModel.building_id)
+    )
+    activities = (
+        select(ActivityModel.id, func.count(organization_activities.c.organization_id.distinct()))
+        .select_from(organization_activities)
+        .join(leaf, leaf.id == organization_activities.c.activity_id)
+        .join(ActivityModel, ActivityModel.path.ancestor_of(leaf.path))
+        .where(any_of(organization_activities.c.organization_id, organization_ids))
+        .group_by(ActivityModel.id)
+    )
+    return [
+        _add_counts(_building_counts, "building_id", buildings),
+        _add_counts(_activity_counts, "activity_id", activities),
+    ]
+
+
+def recount_activity_counts(activity_ids: Sequence[UUID] | Select) -> Executable:
+    """
+    Пересчитать счётчики видов деятельности по связям
+    activity_ids - список ID или запрос, который их выбирает
+    Нужен после удаления связей, когда вычесть организацию нельзя: она может
+    оставаться в поддереве через другой вид деятельности
+    """
+    leaf = aliased(ActivityModel)
+    subtree_organizations = (
+        select(func.count(organization_activities.c.organization_id.distinct()))
+        .select_from(organization_activities)
+        .join(leaf, leaf.id == organization_activities.c.activity_id)
+        .join(ActivityModel, ActivityModel.id == _activity_counts.c.activity_id)
+        .where(leaf.path.descendant_of(ActivityModel.path))
+        .scalar_subquery()
+    )
+    return (
+        update(_activity_counts)
+        .where(_activity_counts.c.activity_id.in_(activity_ids))
+        .values(organizations=subtree_organizations)
+    )
+
+
+def rebuild_counts() -> list[Executable]:
+    """Пересчитать все счётчики с нуля (после загрузки данных в обход репозиториев)"""
+    leaf = aliased(ActivityModel)
+    buildings = select(OrganizationModel.building_id, func.count()).group_by(OrganizationModel.building_id)
+    activities = (
+        select(ActivityModel.id, func.count(organization_activities.c.organization_id.distinct()))
+        .select_from(organization_activities)
+        .join(leaf, leaf.id == organization_activities.c.activity_id)
+        .join(ActivityModel, ActivityModel.path.ancestor_of(leaf.path))
+        .group_by(ActivityModel.id)
+    )
+    return [
+        text(f"TRUNCATE {_building_counts.name}, {_activity_counts.name}"),
+        pg_insert(_building_counts).from_select(["building_id", "organizations"], buildings),
+        pg_insert(_activity_counts).from_select(["activity_id", "organizations"], activities),
+    ]
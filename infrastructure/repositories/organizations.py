@@ -1,165 +1,534 @@
-from uuid import UUID
+from collections import defaultdict
+from collections.abc import AsyncIterator, Sequence
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, insert, tuple_, literal, Select, func, ColumnElement, Row, Float, or_, and_, true
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from domain.entities.organizations import Organization
-from configuration.exceptions import OrganizationNotFoundError, OrganizationCreateError, ActivityNotFoundError
-from domain.mapper.organizations import map_organization_to_entity
-from infrastructure.db.models import OrganizationModel, OrganizationPhoneModel, ActivityModel, BuildingModel
+from domain.entities.organizations import Organization, OrganizationSearchMode, OrganizationFilters, \
+    OrganizationInclude, OrganizationIncludes, DEFAULT_INCLUDE, OrganizationCluster, ClusterActivity
+from domain.entities.batch import BatchResult
+from domain.entities.pagination import Page
+from configuration.exceptions import OrganizationNotFoundError, OrganizationCreateError, ActivityNotFoundError, \
+    InvalidCursorError, BuildingNotFoundError
+from domain.entities.activities import Activity
+from domain.entities.buildings import Building
+from domain.mapper.buildings import map_building_row_to_entity, BUILDING_COLUMNS
+from domain.phones import unique_phones
+from domain.mapper.organizations import map_organization_row_to_entity, ORGANIZATION_COLUMNS
+from infrastructure.cache.response import ResponseCache, CacheTag
+from infrastructure.db.geo import make_point, mercator_x_sql, mercator_y_sql
+from infrastructure.db.models import OrganizationModel, OrganizationPhoneModel, ActivityModel, BuildingModel, \
+    organization_activities, BuildingOrganizationCountModel, ActivityOrganizationCountModel
+from infrastructure.metrics.request import timed
 from infrastructure.repositories.activities import ActivitiesRepository
+from infrastructure.repositories.buildings import BuildingsRepository
+from infrastructure.repositories.batch import unique_ids, build_batch
+from infrastructure.repositories.organization_counts import increment_building_count, increment_activity_counts
+from infrastructure.repositories.pagination import decode_cursor, parse_cursor_uuid, build_page
 
 
 class OrganizationsRepository:
-    def __init__(self, session: AsyncSession, activity_repo: ActivitiesRepository):
+    def __init__(self, session: AsyncSession, activity_repo: ActivitiesRepository, cache: ResponseCache):
         self.session = session
         self.activity_repo = activity_repo
+        self.cache = cache
 
-    async def get_by_id(self, organization_id: UUID) -> Organization:
+    async def get_by_id(
+        self, organization_id: UUID, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Organization:
         """
         Получить организацию по её ID
-        Подгружает телефоны, виды деятельности и здание
+        Подгружает телефоны и виды деятельности
         """
-        stmt = (
-            select(OrganizationModel)
-            .options(
-                selectinload(OrganizationModel.phones),
-                selectinload(OrganizationModel.activities),
-                selectinload(OrganizationModel.building),
-            )
-        ).where(OrganizationModel.id == organization_id)
-
-        organ = await self.session.scalar(stmt)
+        stmt = select(*ORGANIZATION_COLUMNS).where(OrganizationModel.id == organization_id)
+        organizations = await self._fetch(stmt, include)
 
-        if not organ:
+        if not organizations:
             raise OrganizationNotFoundError
 
-        return map_organization_to_entity(organ)
+        return organizations[0]
 
+    async def get_many(
+        self, organization_ids: list[UUID], include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> BatchResult[Organization]:
+        """
+        Получить организации по списку ID, сохраняя порядок запроса
+        Организации, телефоны и виды деятельности - по одному запросу на весь список
+        """
+        ids = unique_ids(organization_ids)
+        organizations = await self._fetch(select(*ORGANIZATION_COLUMNS).where(OrganizationModel.id.in_(ids)), include)
+        return build_batch(ids, organizations, lambda org: org.id)
 
 
-    async def create(self, organization: Organization):
-        """Создать новую организацию с привязкой к зданию, телефонами и видами деятельности"""
+    async def create(self, organization: Organization) -> Organization:
+        """
+        Создать новую организацию с привязкой к зданию, телефонами и видами деятельности
+        Организация, телефоны и связи вставляются одним запросом (data-modifying CTE);
+        несуществующие ID видов деятельности пропускаются
+        """
+        organization_id = uuid4()
+        phones = unique_phones(organization.phones or [])
+        activity_ids = unique_ids([activity.id for activity in organization.activities or [] if activity.id])
         try:
-            organization_model = OrganizationModel(
-                name=organization.name,
-                building_id=organization.building_id,
-                activities=[],
-                phones=[],
-            )
-            self.session.add(organization_model)
-            await self.session.flush()
-
-
-            for phone in organization.phones or []:
-                org_phone = phone.strip()
-                if org_phone:
-                    self.session.add(
-                        OrganizationPhoneModel(
-                            organization_id=organization_model.id,
-                            phone=org_phone
-                        )
-                    )
-
-            if organization.activities:
-                activity_ids = [activity.id for activity in organization.activities if activity.id]
-                if activity_ids:
-                    res = await self.session.execute(
-                        select(ActivityModel).where(ActivityModel.id.in_(activity_ids))
-                    )
-                    loaded_activities = list(res.scalars().all())
-                    organization_model.activities.extend(loaded_activities)
-
+            res = await self.session.execute(self._create_statement(organization, organization_id, phones, activity_ids))
+            rows = res.all()
+            activities = [
+                Activity(id=row.id, name=row.name, parent_id=row.parent_id)
+                for row in rows if activity_ids and row.id is not None
+            ]
             await self.session.commit()
-            await self.session.refresh(organization_model)
         except Exception as e:
             await self.session.rollback()
             raise OrganizationCreateError(str(e))
-        return map_organization_to_entity(organization_model)
+        await self.cache.invalidate(CacheTag.ORGANIZATIONS)
+        await self.cache.invalidate_points({(row.latitude, row.longitude) for row in rows})
+        return Organization(
+            id=organization_id,
+            name=organization.name,
+            building_id=organization.building_id,
+            phones=list(phones.values()),
+            activities=activities,
+        )
 
-    async def list_all(self):
+    @staticmethod
+    def _create_statement(
+        organization: Organization, organization_id: UUID, phones: dict[str, str], activity_ids: list[UUID],
+    ) -> Select:
         """
-        Получить список всех организаций
-        Подгружает телефоны, виды деятельности и здания
+        Запрос создания организации вместе с обновлением счётчиков организаций
+        Все CTE выполняются в одном выражении, внешние ключи проверяются в его конце.
+        Возвращает координаты здания (для сброса тайлов) и найденные виды деятельности:
+        по строке на вид или одну строку с NULL, если видов нет
         """
-        stmt = select(OrganizationModel).options(
-            selectinload(OrganizationModel.phones),
-            selectinload(OrganizationModel.activities),
-            selectinload(OrganizationModel.building),
+        building = select(BuildingModel.latitude, BuildingModel.longitude).where(
+            BuildingModel.id == organization.building_id
+        )
+        new_organization = (
+            insert(OrganizationModel)
+            .values(id=organization_id, name=organization.name, building_id=organization.building_id)
+            .returning(OrganizationModel.id)
+            .cte("new_organization")
+        )
+        # CTE, на которые не ссылается итоговый SELECT, добавляются явно
+        ctes = [
+            increment_building_count(organization.building_id)
+            .returning(BuildingOrganizationCountModel.building_id)
+            .cte("building_count"),
+        ]
+        if phones:
+            ctes.append(
+                insert(OrganizationPhoneModel)
+                .values([
+                    {"id": uuid4(), "organization_id": organization_id, "phone": phone, "phone_e164": phone_e164}
+                    for phone_e164, phone in phones.items()
+                ])
+                .returning(OrganizationPhoneModel.id)
+                .cte("new_phones")
+            )
+        if not activity_ids:
+            return building.add_cte(new_organization, *ctes)
+
+        found_activities = (
+            select(ActivityModel.id, ActivityModel.name, ActivityModel.parent_id, ActivityModel.path)
+            .where(ActivityModel.id.in_(activity_ids))
+            .cte("found_activities")
+        )
+        ctes.append(
+            insert(organization_activities)
+            .from_select(
+                ["organization_id", "activity_id"],
+                select(new_organization.c.id, found_activities.c.id),
+            )
+            .returning(organization_activities.c.activity_id)
+            .cte("new_links")
+        )
+        ctes.append(
+            increment_activity_counts(found_activities.c.path)
+            .returning(ActivityOrganizationCountModel.activity_id)
+            .cte("activity_counts")
+        )
+        return (
+            building
+            .add_columns(found_activities.c.id, found_activities.c.name, found_activities.c.parent_id)
+            .outerjoin(found_activities, true())
+            .add_cte(*ctes)
         )
-        res = await self.session.scalars(stmt)
-        return [map_organization_to_entity(model) for model in res.all()]
 
-    async def list_by_activity_id(self, activity_id: UUID) -> list[Organization]:
+    async def list_all(
+        self, limit: int, cursor: str | None = None, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
         """
-        Получить организации по ID вида деятельности
-        Учитываются все дочерние виды
+        Получить страницу всех организаций
+        Подгружает телефоны и виды деятельности
         """
-        activity_ids = await self.activity_repo.get_descendant(activity_id)
-        activity_ids.append(activity_id)
+        stmt = select(*ORGANIZATION_COLUMNS)
+        return await self._list_page(stmt, limit, cursor, include)
 
+    async def stream_all(
+        self, batch_size: int, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> AsyncIterator[list[Organization]]:
+        """
+        Выгрузить все организации пачками по batch_size
+        Строки читаются серверным курсором, в памяти держится только текущая пачка
+        """
         stmt = (
-            select(OrganizationModel)
-            .where(OrganizationModel.activities.any(ActivityModel.id.in_(activity_ids)))
-            .options(
-                selectinload(OrganizationModel.phones),
-                selectinload(OrganizationModel.activities),
-            )
-            .order_by(OrganizationModel.name.asc())
+            select(*ORGANIZATION_COLUMNS)
+            .order_by(OrganizationModel.name.asc(), OrganizationModel.id.asc())
+            .execution_options(yield_per=batch_size)
         )
-        res = await self.session.scalars(stmt)
-        return [map_organization_to_entity(model) for model in res.all()]
+        res = await self.session.stream(stmt)
+        async for rows in res.partitions():
+            yield await self._hydrate(rows, include)
+
+    async def list_by_activity_id(
+        self, activity_id: UUID, limit: int, cursor: str | None = None, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        """
+        Получить страницу организаций по ID вида деятельности
+        Учитываются все дочерние виды
+        """
+        stmt = select(*ORGANIZATION_COLUMNS).where(self._activity_subtree_clause(activity_id))
+        return await self._list_page(stmt, limit, cursor, include)
 
-    async def list_by_activity_name(self, activity_name: str) -> list[Organization]:
-        """Получить организации по названию вида деятельности"""
+    async def list_by_activity_name(
+        self, activity_name: str, limit: int, cursor: str | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        """Получить страницу организаций по названию вида деятельности"""
         try:
             activity = await self.activity_repo.get_by_name(activity_name)
         except Exception:
             raise ActivityNotFoundError
-        return await self.list_by_activity_id(activity.id)
+        return await self.list_by_activity_id(activity.id, limit, cursor, include)
+
+    async def list_by_building_id(
+        self, building_id: UUID, limit: int, cursor: str | None = None, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        """Получить страницу организаций, находящихся в конкретном здании"""
+        stmt = select(*ORGANIZATION_COLUMNS).where(OrganizationModel.building_id == building_id)
+        return await self._list_page(stmt, limit, cursor, include)
+
+    async def find_organization_by_name(
+        self, name: str, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> list[Organization]:
+        """Найти организации по точному совпадению имени"""
+        stmt = select(*ORGANIZATION_COLUMNS).where(OrganizationModel.name == name)
+        return await self._fetch(stmt, include)
 
-    async def list_by_building_id(self, building_id: UUID):
-        """Получить все организации, находящиеся в конкретном здании"""
+    async def find_by_phone(
+        self, phone_e164: str, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> list[Organization]:
+        """
+        Найти организации, которым принадлежит номер в формате E.164
+        Номер ищется по индексу phone_e164, организации - по первичному ключу
+        """
+        owners = select(OrganizationPhoneModel.organization_id).where(OrganizationPhoneModel.phone_e164 == phone_e164)
         stmt = (
-            select(OrganizationModel)
-            .options(
-                selectinload(OrganizationModel.phones),
-                selectinload(OrganizationModel.activities),
-                selectinload(OrganizationModel.building),
-            ).where(OrganizationModel.building_id == building_id)
+            select(*ORGANIZATION_COLUMNS)
+            .where(OrganizationModel.id.in_(owners))
+            .order_by(OrganizationModel.name, OrganizationModel.id)
         )
-        res = await self.session.scalars(stmt)
-        return [map_organization_to_entity(model) for model in res.all()]
+        return await self._fetch(stmt, include)
 
-    async def find_organization_by_name(self, name: str) -> list[Organization]:
-        """Найти организации по точному совпадению имени"""
+
+    async def search(
+        self, query: str, mode: OrganizationSearchMode, limit: int, cursor: str | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        """
+        Поиск организаций по части названия или с опечатками
+        Все режимы используют триграммный GIN-индекс по name. Результаты упорядочены
+        по убыванию похожести, keyset-пагинация идёт по (score, name, id)
+        """
+        name = OrganizationModel.name
+        if mode is OrganizationSearchMode.FUZZY:
+            # <% сравнивает запрос с наиболее похожим фрагментом названия
+            condition = literal(query).op("<%")(name)
+            score = func.word_similarity(query, name, type_=Float)
+        else:
+            pattern = _escape_like(query)
+            pattern = f"{pattern}%" if mode is OrganizationSearchMode.PREFIX else f"%{pattern}%"
+            condition = name.ilike(pattern, escape="\\")
+            score = func.similarity(name, query, type_=Float)
+
+        stmt = select(*ORGANIZATION_COLUMNS, score.label("score")).where(condition)
+        if cursor is not None:
+            last_score, last_name, last_id = decode_cursor(cursor, 3)
+            try:
+                last_score = float(last_score)
+            except ValueError:
+                raise InvalidCursorError
+            stmt = stmt.where(or_(
+                score < last_score,
+                and_(
+                    score == last_score,
+                    tuple_(OrganizationModel.name, OrganizationModel.id)
+                    > tuple_(literal(last_name), literal(parse_cursor_uuid(last_id))),
+                ),
+            ))
+        stmt = stmt.order_by(score.desc(), OrganizationModel.name.asc(), OrganizationModel.id.asc()).limit(limit + 1)
+        rows = (await self.session.execute(stmt)).all()
+        scores = {row.id: row.score for row in rows}
+        organizations = await self._hydrate(rows, include)
+        return build_page(organizations, limit, lambda org: (scores[org.id], org.name, org.id))
+
+    async def list_by_square(
+        self, lat_min: float, lon_min: float, lat_max: float, lon_max: float, limit: int, cursor: str | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        """Возвращает страницу организаций, которые находятся в прямоугольной области"""
         stmt = (
-            select(OrganizationModel)
-            .options(
-                selectinload(OrganizationModel.phones),
-                selectinload(OrganizationModel.activities),
-            )
-            .where(OrganizationModel.name == name)
+            select(*ORGANIZATION_COLUMNS)
+            .join(BuildingModel)
+            .where(BuildingsRepository.square_clause(lat_min, lon_min, lat_max, lon_max))
         )
-        res = await self.session.scalars(stmt)
-        return [map_organization_to_entity(m) for m in res.all()]
+        return await self._list_page(stmt, limit, cursor, include)
 
+    async def query(
+        self, filters: OrganizationFilters, limit: int, cursor: str | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        """
+        Получить страницу организаций, подходящих под все заданные фильтры
+        Фильтры - те же условия, что и у отдельных методов, собранные в один запрос;
+        условия по зданиям и видам деятельности подключаются полусоединениями
+        """
+        conditions: list[ColumnElement[bool]] = []
+        if filters.activity_id is not None:
+            conditions.append(self._activity_subtree_clause(filters.activity_id))
+        if filters.building_id is not None:
+            conditions.append(OrganizationModel.building_id == filters.building_id)
+        if filters.square is not None:
+            conditions.append(self._building_clause(BuildingsRepository.square_clause(*filters.square)))
+        if filters.radius is not None:
+            conditions.append(self._building_clause(BuildingsRepository.radius_clause(*filters.radius)))
+        if filters.name_prefix:
+            conditions.append(OrganizationModel.name.ilike(f"{_escape_like(filters.name_prefix)}%", escape="\\"))
+        stmt = select(*ORGANIZATION_COLUMNS).where(*conditions)
+        return await self._list_page(stmt, limit, cursor, include)
 
-    async def list_by_square( self, lat_min: float, lon_min: float, lat_max: float, lon_max: float ):
-        """Возвращает организации, которые находятся в прямоугольной области"""
+    async def list_by_radius(
+        self, latitude: float, longitude: float, radius: float, limit: int,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> list[Organization]:
+        """Возвращает ближайшие организации в радиусе radius метров, отсортированные по расстоянию"""
+        center = make_point(latitude, longitude)
         stmt = (
-            select(OrganizationModel)
+            select(*ORGANIZATION_COLUMNS)
             .join(BuildingModel)
-            .where(BuildingModel.latitude.between(lat_min, lat_max))
-            .where(BuildingModel.longitude.between(lon_min, lon_max))
-            .options(
-                selectinload(OrganizationModel.phones),
-                selectinload(OrganizationModel.activities),
-                selectinload(OrganizationModel.building),
+            .where(BuildingsRepository.radius_clause(latitude, longitude, radius))
+            .order_by(func.ST_Distance(BuildingModel.location, center), OrganizationModel.name)
+            .limit(limit)
+        )
+        return await self._fetch(stmt, include)
+
+    async def list_nearest(
+        self, latitude: float, longitude: float, k: int, activity_id: UUID | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> list[Organization]:
+        """
+        Возвращает k ближайших к точке организаций
+        Сортировка по оператору <-> использует KNN-обход GiST-индекса зданий,
+        при указании activity_id учитываются все дочерние виды деятельности
+        """
+        center = make_point(latitude, longitude)
+        stmt = (
+            select(*ORGANIZATION_COLUMNS)
+            .join(BuildingModel)
+            .order_by(BuildingModel.location.op("<->")(center), OrganizationModel.name)
+            .limit(k)
+        )
+        if activity_id is not None:
+            stmt = stmt.where(self._activity_subtree_clause(activity_id))
+        return await self._fetch(stmt, include)
+
+    async def count_by_building(self, building_id: UUID) -> int:
+        """Число организаций в здании - чтение счётчика по ключу"""
+        count = await self.session.scalar(
+            select(func.coalesce(BuildingOrganizationCountModel.organizations, 0))
+            .select_from(BuildingModel)
+            .outerjoin(BuildingOrganizationCountModel)
+            .where(BuildingModel.id == building_id)
+        )
+        if count is None:
+            raise BuildingNotFoundError
+        return count
+
+    async def count_by_activity(self, activity_id: UUID) -> int:
+        """Число организаций в поддереве вида деятельности - чтение счётчика по ключу"""
+        count = await self.session.scalar(
+            select(func.coalesce(ActivityOrganizationCountModel.organizations, 0))
+            .select_from(ActivityModel)
+            .outerjoin(ActivityOrganizationCountModel)
+            .where(ActivityModel.id == activity_id)
+        )
+        if count is None:
+            raise ActivityNotFoundError
+        return count
+
+    async def clusters(
+        self, lat_min: float, lon_min: float, lat_max: float, lon_max: float, cell_size: float, top_activities: int,
+    ) -> list[OrganizationCluster]:
+        """
+        Сгруппировать организации прямоугольной области по ячейкам сетки web mercator
+        со стороной cell_size метров. Для каждой ячейки - центр масс организаций,
+        их число и top_activities самых частых видов деятельности; всё считается в БД
+        """
+        located = (
+            select(
+                OrganizationModel.id.label("organization_id"),
+                BuildingModel.latitude,
+                BuildingModel.longitude,
+                func.floor(mercator_x_sql(BuildingModel.longitude) / cell_size).label("cell_x"),
+                func.floor(mercator_y_sql(BuildingModel.latitude) / cell_size).label("cell_y"),
+            )
+            .join(BuildingModel)
+            .where(BuildingsRepository.square_clause(lat_min, lon_min, lat_max, lon_max))
+            .cte("located")
+        )
+        cells = (
+            select(
+                located.c.cell_x,
+                located.c.cell_y,
+                func.count().label("count"),
+                func.avg(located.c.latitude).label("latitude"),
+                func.avg(located.c.longitude).label("longitude"),
             )
+            .group_by(located.c.cell_x, located.c.cell_y)
+            .cte("cells")
         )
+        links = func.count()
+        ranked = (
+            select(
+                located.c.cell_x,
+                located.c.cell_y,
+                organization_activities.c.activity_id,
+                links.label("count"),
+                func.row_number().over(
+                    partition_by=(located.c.cell_x, located.c.cell_y),
+                    order_by=(links.desc(), organization_activities.c.activity_id),
+                ).label("rank"),
+            )
+            .join(organization_activities, organization_activities.c.organization_id == located.c.organization_id)
+            .group_by(located.c.cell_x, located.c.cell_y, organization_activities.c.activity_id)
+            .cte("ranked")
+        )
+        # Одна строка на пару (ячейка, вид деятельности из топа); ячейки без видов - одной строкой
+        stmt = (
+            select(
+                cells.c.cell_x, cells.c.cell_y, cells.c.count, cells.c.latitude, cells.c.longitude,
+                ActivityModel.id.label("activity_id"), ActivityModel.name.label("activity_name"),
+                ranked.c.count.label("activity_count"),
+            )
+            .outerjoin(ranked, and_(
+                ranked.c.cell_x == cells.c.cell_x,
+                ranked.c.cell_y == cells.c.cell_y,
+                ranked.c.rank <= top_activities,
+            ))
+            .outerjoin(ActivityModel, ActivityModel.id == ranked.c.activity_id)
+            .order_by(cells.c.cell_y, cells.c.cell_x, ranked.c.rank)
+        )
+        rows = (await self.session.execute(stmt)).all()
+        with timed("mapping_seconds"):
+            clusters: dict[tuple[float, float], OrganizationCluster] = {}
+            for row in rows:
+                cluster = clusters.get((row.cell_x, row.cell_y))
+                if cluster is None:
+                    cluster = clusters[(row.cell_x, row.cell_y)] = OrganizationCluster(
+                        latitude=row.latitude, longitude=row.longitude, count=row.count, top_activities=[],
+                    )
+                if row.activity_id is not None:
+                    cluster.top_activities.append(
+                        ClusterActivity(id=row.activity_id, name=row.activity_name, count=row.activity_count)
+                    )
+            return list(clusters.values())
+
+    @staticmethod
+    def _activity_subtree_clause(activity_id: UUID) -> ColumnElement[bool]:
+        """
+        Условие принадлежности организации к виду деятельности или любому из его дочерних
+        Поддерево выбирается по материализованному пути в том же запросе
+        """
+        organization_ids = (
+            select(organization_activities.c.organization_id)
+            .join(ActivityModel, ActivityModel.id == organization_activities.c.activity_id)
+            .where(ActivitiesRepository.subtree_clause(activity_id))
+        )
+        return OrganizationModel.id.in_(organization_ids)
+
+    @staticmethod
+    def _building_clause(condition: ColumnElement[bool]) -> ColumnElement[bool]:
+        """Условие нахождения организации в здании, удовлетворяющем condition"""
+        return OrganizationModel.building_id.in_(select(BuildingModel.id).where(condition))
+
+    async def _list_page(
+        self, stmt: Select, limit: int, cursor: str | None, include: OrganizationIncludes,
+    ) -> Page[Organization]:
+        """
+        Выполнить запрос с keyset-пагинацией по (name, id)
+        Курсор указывает на последнюю организацию предыдущей страницы
+        """
+        if cursor is not None:
+            name, organization_id = decode_cursor(cursor, 2)
+            stmt = stmt.where(
+                tuple_(OrganizationModel.name, OrganizationModel.id)
+                > tuple_(literal(name), literal(parse_cursor_uuid(organization_id)))
+            )
+        stmt = stmt.order_by(OrganizationModel.name.asc(), OrganizationModel.id.asc()).limit(limit + 1)
+        organizations = await self._fetch(stmt, include)
+        return build_page(organizations, limit, lambda org: (org.name, org.id))
+
+    async def _fetch(self, stmt: Select, include: OrganizationIncludes) -> list[Organization]:
+        """Выполнить запрос по ORGANIZATION_COLUMNS и собрать организации"""
+        rows = (await self.session.execute(stmt)).all()
+        return await self._hydrate(rows, include)
+
+    async def _hydrate(self, rows: Sequence[Row], include: OrganizationIncludes) -> list[Organization]:
+        """
+        Достроить строки организаций связанными данными из include
+        Каждая связь - один запрос на всю пачку; незапрошенные связи не выбираются,
+        ORM-объекты не создаются
+        """
+        if not rows:
+            return []
+        ids = [row.id for row in rows]
+        phone_rows: Sequence[Row] = ()
+        if OrganizationInclude.PHONES in include:
+            phone_rows = (await self.session.execute(
+                select(OrganizationPhoneModel.organization_id, OrganizationPhoneModel.phone)
+                .where(OrganizationPhoneModel.organization_id.in_(ids))
+            )).all()
+        activity_rows: Sequence[Row] = ()
+        if OrganizationInclude.ACTIVITIES in include:
+            activity_rows = (await self.session.execute(
+                select(
+                    organization_activities.c.organization_id,
+                    ActivityModel.id, ActivityModel.name, ActivityModel.parent_id,
+                )
+                .join(ActivityModel, ActivityModel.id == organization_activities.c.activity_id)
+                .where(organization_activities.c.organization_id.in_(ids))
+            )).all()
+        building_rows: Sequence[Row] = ()
+        if OrganizationInclude.BUILDING in include:
+            building_ids = {row.building_id for row in rows}
+            building_rows = (await self.session.execute(
+                select(*BUILDING_COLUMNS).where(BuildingModel.id.in_(building_ids))
+            )).all()
 
-        res = await self.session.scalars(stmt)
-        return [map_organization_to_entity(model) for model in res.all()]
+        with timed("mapping_seconds"):
+            phones: defaultdict[UUID, list[str]] = defaultdict(list)
+            for organization_id, phone in phone_rows:
+                phones[organization_id].append(phone)
+            activities: defaultdict[UUID, list[Activity]] = defaultdict(list)
+            for organization_id, activity_id, name, parent_id in activity_rows:
+                activities[organization_id].append(Activity(id=activity_id, name=name, parent_id=parent_id))
+            buildings: dict[UUID, Building] = {row.id: map_building_row_to_entity(row) for row in building_rows}
+            return [
+                map_organization_row_to_entity(row, phones[row.id], activities[row.id], buildings.get(row.building_id))
+                for row in rows
+            ]
 
+def _escape_like(value: str) -> str:
+    """Экранировать спецсимволы LIKE, чтобы запрос искался буквально"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,50 @@
+import base64
+import json
+from collections.abc import Callable, Sequence
+from typing import Any, TypeVar
+from uuid import UUID
+
+from configuration.exceptions import InvalidCursorError
+from domain.entities.pagination import Page
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*values: Any) -> str:
+    """Упаковать значения ключа сортировки в непрозрачный курсор"""
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    """Распаковать курсор, ожидая ровно size значений"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise InvalidCursorError
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError
+    return values
+
+
+def parse_cursor_uuid(value: str) -> UUID:
+    """Разобрать UUID из значения курсора"""
+    try:
+        return UUID(value)
+    except ValueError:
+        raise InvalidCursorError
+
+
+def build_page(items: Sequence[T], limit: int, cursor_key: Callable[[T], tuple]) -> Page[T]:
+    """
+    Сформировать страницу из limit + 1 выбранных строк
+    Лишняя строка означает, что есть следующая страница
+    """
+    has_more = len(items) > limit
+    items = list(items[:limit])
+    next_cursor = encode_cursor(*cursor_key(items[-1])) if has_more else None
+    return Page(items=items, next_cursor=next_cursor)
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from uuid import UUID
 
 from domain.entities.activities import Activity
+from domain.entities.batch import BatchResult
 from infrastructure.repositories.activities import ActivitiesRepository
 
 
@@ -17,6 +18,10 @@ class ActivitiesService:
 
         return await self.repository.get_by_id(activity_id)
 
+    async def get_many(self, activity_ids: list[UUID]) -> BatchResult[Activity]:
+
+        return await self.repository.get_many(activity_ids)
+
     async def get_by_name(self, name: str) -> Activity | None:
 
         return await self.repository.get_by_name(name)
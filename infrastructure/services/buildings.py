@@ -1,7 +1,9 @@
 from dataclasses import dataclass
 from uuid import UUID
 
+from domain.entities.batch import BatchResult
 from domain.entities.buildings import Building
+from domain.entities.pagination import Page
 from infrastructure.repositories.buildings import BuildingsRepository
 
 
@@ -15,11 +17,19 @@ class BuildingService:
     async def get_building_by_id(self, building_id: UUID) -> Building:
         return await self.repository.get_by_id(building_id=building_id)
 
-    async def list_all_buildings(self) -> list[Building]:
-        return await self.repository.list_all()
+    async def get_many(self, building_ids: list[UUID]) -> BatchResult[Building]:
+        return await self.repository.get_many(building_ids)
 
-    async def list_buildings_in_square(self, lat_min: float, lon_min: float, lat_max: float, lon_max: float,) -> list[Building]:
-        buildings = await self.repository.list_by_square(lat_min, lon_min, lat_max, lon_max)
-        if not buildings:
-            return []
-        return buildings
\ No newline at end of file
+    async def list_all_buildings(self, limit: int, cursor: str | None = None) -> Page[Building]:
+        return await self.repository.list_all(limit, cursor)
+
+    async def list_buildings_in_square(
+        self, lat_min: float, lon_min: float, lat_max: float, lon_max: float, limit: int, cursor: str | None = None,
+    ) -> Page[Building]:
+        return await self.repository.list_by_square(lat_min, lon_min, lat_max, lon_max, limit, cursor)
+
+    async def get_tile(self, z: int, x: int, y: int) -> bytes:
+        return await self.repository.tile(z, x, y)
+
+    async def list_buildings_in_radius(self, latitude: float, longitude: float, radius: float, limit: int) -> list[Building]:
+        return await self.repository.list_by_radius(latitude, longitude, radius, limit)
@@ -0,0 +1,205 @@
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from domain.entities.bulk_import import (
+    ImportKind, ImportFormat, ImportReport, BuildingImportRow, ActivityImportRow, OrganizationImportRow,
+)
+from domain.phones import is_valid_phone
+from infrastructure.repositories.bulk_import import BulkImportRepository
+
+# Разделитель списков (телефоны, виды деятельности) в ячейках CSV
+CSV_LIST_SEPARATOR = ";"
+# Сколько строк файла может занимать одна запись CSV (значения с переводами строк)
+MAX_CSV_RECORD_LINES = 100
+
+
+class RowFormatError(ValueError):
+    """Строка файла не соответствует ожидаемому формату"""
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Разбить поток байтов на строки без загрузки всего тела в память
+    Строки не декодируются: ошибка кодировки относится к своей строке, а не ко всей загрузке
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+
+def _decode(line: bytes) -> str:
+    try:
+        return line.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise RowFormatError(f"Некорректная кодировка, ожидается UTF-8: {e.reason}")
+
+
+async def read_records(
+    lines: AsyncIterable[bytes], fmt: ImportFormat,
+) -> AsyncIterator[tuple[int, dict[str, Any] | RowFormatError]]:
+    """
+    Прочитать записи файла как словари
+    Для CSV первая строка - заголовок, значения в кавычках могут содержать переводы строк
+    (номер записи - номер её первой строки); пустые строки пропускаются
+    """
+    header: list[str] | None = None
+    line_no = 0
+    # Незавершённая запись CSV: значение в кавычках продолжается на следующей строке
+    pending: list[str] = []
+    pending_line = 0
+    async for raw in lines:
+        line_no += 1
+        try:
+            line = _decode(raw)
+        except RowFormatError as e:
+            yield (pending_line if pending else line_no), e
+            pending = []
+            continue
+        if fmt is ImportFormat.NDJSON:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, RowFormatError(f"Некорректный JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_no, RowFormatError("Ожидается JSON-объект")
+                continue
+            yield line_no, record
+            continue
+
+        if not pending:
+            if not line.strip():
+                continue
+            pending_line = line_no
+        pending.append(line)
+        text = "\n".join(pending)
+        # Кавычки внутри значения удваиваются, поэтому нечётное число - значение не закрыто
+        if text.count('"') % 2:
+            if len(pending) >= MAX_CSV_RECORD_LINES:
+                yield pending_line, RowFormatError(f"Значение в кавычках длиннее {MAX_CSV_RECORD_LINES} строк")
+                pending = []
+            continue
+        pending = []
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        if len(values) != len(header):
+            yield pending_line, RowFormatError(f"Ожидается столбцов: {len(header)}, получено: {len(values)}")
+            continue
+        yield pending_line, dict(zip(header, values))
+    if pending:
+        yield pending_line, RowFormatError("Не закрыта кавычка в значении")
+
+
+def _required_str(record: dict[str, Any], key: str) -> str:
+    value = record.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise RowFormatError(f"Поле '{key}' обязательно")
+    return value.strip()
+
+
+def _float(record: dict[str, Any], key: str, bound: float) -> float:
+    try:
+        value = float(record.get(key))
+    except (TypeError, ValueError):
+        raise RowFormatError(f"Поле '{key}' должно быть числом")
+    if not -bound <= value <= bound:
+        raise RowFormatError(f"Поле '{key}' должно быть в диапазоне [-{bound}, {bound}]")
+    return value
+
+
+def _str_list(record: dict[str, Any], key: str) -> list[str]:
+    value = record.get(key)
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(CSV_LIST_SEPARATOR)
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise RowFormatError(f"Поле '{key}' должно быть списком строк")
+    return [item.strip() for item in value if item.strip()]
+
+
+def parse_building(line: int, record: dict[str, Any]) -> BuildingImportRow:
+    return BuildingImportRow(
+        line=line,
+        address=_required_str(record, "address"),
+        latitude=_float(record, "latitude", 90),
+        longitude=_float(record, "longitude", 180),
+    )
+
+
+def parse_activity(line: int, record: dict[str, Any]) -> ActivityImportRow:
+    parent = record.get("parent")
+    if parent is not None and not isinstance(parent, str):
+        raise RowFormatError("Поле 'parent' должно быть строкой")
+    return ActivityImportRow(line=line, name=_required_str(record, "name"), parent_name=(parent or "").strip() or None)
+
+
+def parse_organization(line: int, record: dict[str, Any]) -> OrganizationImportRow:
+    phones = _str_list(record, "phones")
+    invalid = [phone for phone in phones if not is_valid_phone(phone)]
+    if invalid:
+        raise RowFormatError(f"Некорректные номера телефонов: {', '.join(invalid)}")
+    return OrganizationImportRow(
+        line=line,
+        name=_required_str(record, "name"),
+        building_address=_required_str(record, "building_address"),
+        phones=phones,
+        activity_names=_str_list(record, "activities"),
+    )
+
+
+PARSERS: dict[ImportKind, Callable[[int, dict[str, Any]], Any]] = {
+    ImportKind.BUILDINGS: parse_building,
+    ImportKind.ACTIVITIES: parse_activity,
+    ImportKind.ORGANIZATIONS: parse_organization,
+}
+
+
+@dataclass
+class BulkImportService:
+    repository: BulkImportRepository
+    batch_size: int
+
+    async def import_stream(self, kind: ImportKind, fmt: ImportFormat, chunks: AsyncIterable[bytes]) -> ImportReport:
+        """
+        Загрузить записи из потока пакетами по batch_size строк
+        Тело запроса не читается целиком: в памяти только текущий пакет
+        """
+        report = ImportReport(kind=kind)
+        parse = PARSERS[kind]
+        batch = []
+        async for line, record in read_records(iter_lines(chunks), fmt):
+            report.processed += 1
+            try:
+                if isinstance(record, RowFormatError):
+                    raise record
+                batch.append(parse(line, record))
+            except RowFormatError as e:
+                report.add_error(line, str(e))
+                continue
+            if len(batch) >= self.batch_size:
+                await self._flush(kind, batch, report)
+                batch = []
+        if batch:
+            await self._flush(kind, batch, report)
+        return report
+
+    async def _flush(self, kind: ImportKind, batch: list, report: ImportReport) -> None:
+        if kind is ImportKind.BUILDINGS:
+            await self.repository.import_buildings(batch, report)
+        elif kind is ImportKind.ACTIVITIES:
+            await self.repository.import_activities(batch, report)
+        else:
+            await self.repository.import_organizations(batch, report)
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from domain.entities.jobs import Job, JobKind
+from infrastructure.jobs.runner import JobRunner
+from infrastructure.repositories.jobs import JobsRepository
+
+
+@dataclass
+class JobsService:
+    repository: JobsRepository
+    runner: JobRunner
+
+    async def enqueue(self, kind: JobKind, payload: dict[str, Any] | None = None, data: bytes | None = None) -> Job:
+        job = await self.repository.enqueue(kind, payload or {}, data)
+        self.runner.notify()
+        return job
+
+    async def get(self, job_id: UUID) -> Job:
+        return await self.repository.get(job_id)
@@ -1,7 +1,11 @@
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from uuid import UUID
 
-from domain.entities.organizations import Organization
+from domain.entities.organizations import Organization, OrganizationSearchMode, OrganizationFilters, \
+    OrganizationIncludes, DEFAULT_INCLUDE, OrganizationCluster
+from domain.entities.batch import BatchResult
+from domain.entities.pagination import Page
 from infrastructure.repositories.organizations import OrganizationsRepository
 
 
@@ -12,23 +16,83 @@ class OrganizationsService:
     async def create(self, org: Organization) -> Organization:
         return await self.repository.create(org)
 
-    async def get_by_id(self, org_id: UUID) -> Organization | None:
-        return await self.repository.get_by_id(org_id)
+    async def get_by_id(self, org_id: UUID, include: OrganizationIncludes = DEFAULT_INCLUDE) -> Organization | None:
+        return await self.repository.get_by_id(org_id, include)
 
-    async def list_all(self) -> list[Organization]:
-        return await self.repository.list_all()
+    async def get_many(
+        self, org_ids: list[UUID], include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> BatchResult[Organization]:
+        return await self.repository.get_many(org_ids, include)
 
-    async def list_by_building(self, building_id: UUID) -> list[Organization]:
-        return await self.repository.list_by_building_id(building_id)
+    async def list_all(
+        self, limit: int, cursor: str | None = None, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        return await self.repository.list_all(limit, cursor, include)
 
-    async def list_by_activity_id(self, activity_id: UUID) -> list[Organization]:
-        return await self.repository.list_by_activity_id(activity_id)
+    def stream_all(
+        self, batch_size: int, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> AsyncIterator[list[Organization]]:
+        return self.repository.stream_all(batch_size, include)
 
-    async def list_by_activity_name(self, activity_name: str) -> list[Organization]:
-        return await self.repository.list_by_activity_name(activity_name)
+    async def search(
+        self, query: str, mode: OrganizationSearchMode, limit: int, cursor: str | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        return await self.repository.search(query, mode, limit, cursor, include)
 
-    async def find_by_name(self, name: str) -> list[Organization]:
-        return await self.repository.find_organization_by_name(name)
+    async def query(
+        self, filters: OrganizationFilters, limit: int, cursor: str | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        return await self.repository.query(filters, limit, cursor, include)
 
-    async def list_by_square(self, lat_min: float, lon_min: float, lat_max: float, lon_max: float):
-        return await self.repository.list_by_square(lat_min, lon_min, lat_max, lon_max)
\ No newline at end of file
+    async def list_by_building(
+        self, building_id: UUID, limit: int, cursor: str | None = None, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        return await self.repository.list_by_building_id(building_id, limit, cursor, include)
+
+    async def list_by_activity_id(
+        self, activity_id: UUID, limit: int, cursor: str | None = None, include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        return await self.repository.list_by_activity_id(activity_id, limit, cursor, include)
+
+    async def list_by_activity_name(
+        self, activity_name: str, limit: int, cursor: str | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        return await self.repository.list_by_activity_name(activity_name, limit, cursor, include)
+
+    async def find_by_name(self, name: str, include: OrganizationIncludes = DEFAULT_INCLUDE) -> list[Organization]:
+        return await self.repository.find_organization_by_name(name, include)
+
+    async def find_by_phone(self, phone_e164: str, include: OrganizationIncludes = DEFAULT_INCLUDE) -> list[Organization]:
+        return await self.repository.find_by_phone(phone_e164, include)
+
+    async def list_by_square(
+        self, lat_min: float, lon_min: float, lat_max: float, lon_max: float, limit: int, cursor: str | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> Page[Organization]:
+        return await self.repository.list_by_square(lat_min, lon_min, lat_max, lon_max, limit, cursor, include)
+
+    async def list_by_radius(
+        self, latitude: float, longitude: float, radius: float, limit: int,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> list[Organization]:
+        return await self.repository.list_by_radius(latitude, longitude, radius, limit, include)
+
+    async def list_nearest(
+        self, latitude: float, longitude: float, k: int, activity_id: UUID | None = None,
+        include: OrganizationIncludes = DEFAULT_INCLUDE,
+    ) -> list[Organization]:
+        return await self.repository.list_nearest(latitude, longitude, k, activity_id, include)
+
+    async def count_by_building(self, building_id: UUID) -> int:
+        return await self.repository.count_by_building(building_id)
+
+    async def count_by_activity(self, activity_id: UUID) -> int:
+        return await self.repository.count_by_activity(activity_id)
+
+    async def clusters(
+        self, lat_min: float, lon_min: float, lat_max: float, lon_max: float, cell_size: float, top_activities: int,
+    ) -> list[OrganizationCluster]:
+        return await self.repository.clusters(lat_min, lon_min, lat_max, lon_max, cell_size, top_activities)
@@ -1,19 +1,88 @@
 import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
 
 import uvicorn
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from starlette import status
 from starlette.middleware.cors import CORSMiddleware
 
+from configuration.base import get_settings, ProjectSettings
+from configuration.exceptions import InvalidCursorError
 from configuration.security import require_api_key
-from presentation.api.routes import building_router, activity_router, organization_router
+from infrastructure.cache.activity_tree import ActivityTree
+from infrastructure.cache.response import ResponseCache, create_cache_backend
+from infrastructure.db.database import Database
+from infrastructure.db.warmup import warm_up
+from infrastructure.jobs.handlers import JobContext
+from infrastructure.jobs.runner import JobRunner
+from infrastructure.metrics.prometheus import RequestMetricsRegistry
+from presentation.api.routes import building_router, activity_router, organization_router, diagnostics_router, \
+    import_router, metrics_router, health_router, tile_router, job_router
+from presentation.api.middleware import RequestMetricsMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up_until_ready(app: FastAPI, config: ProjectSettings) -> None:
+    """
+    Прогревать процесс, пока не получится; до этого /health/ready отвечает 503
+    Соединений не больше размера пула: сверх него пул их не сохраняет
+    """
+    connections = min(config.db_warmup_connections, config.db_pool_size)
+    while True:
+        try:
+            await warm_up(app.state.database, connections, app.state.activity_tree, app.state.response_cache)
+        except Exception:
+            logger.exception("Прогрев не удался, повтор через %s с", config.db_warmup_retry_seconds)
+            await asyncio.sleep(config.db_warmup_retry_seconds)
+        else:
+            app.state.ready = True
+            return
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Создать подключения, кэши и исполнителя фоновых задач при старте и остановить их при выходе"""
+    config = get_settings()
+    app.state.ready = False
+    app.state.database = Database(config)
+    app.state.activity_tree = ActivityTree(ttl=config.activity_tree_ttl)
+    app.state.response_cache = ResponseCache(
+        backend=create_cache_backend(config, app.state.database),
+        ttl=config.response_cache_ttl,
+        enabled=config.response_cache_enabled,
+    )
+    app.state.job_runner = JobRunner(JobContext(
+        database=app.state.database,
+        tree=app.state.activity_tree,
+        cache=app.state.response_cache,
+        config=config,
+    ))
+    # Прогрев идёт в фоне: сервер уже принимает пробы, но не готов к трафику
+    warmup_task = asyncio.create_task(_warm_up_until_ready(app, config))
+    app.state.job_runner.start()
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup_task
+        await app.state.job_runner.stop()
+        await app.state.database.dispose()
+
 
 app = FastAPI(
     title='Secunda test API',
     description='API для тестового задания secunda',
     version='0.1.0',
-    dependencies=[Depends(require_api_key)],
+    lifespan=lifespan,
 )
 
+app.state.metrics_registry = RequestMetricsRegistry()
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,12 +90,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=['Server-Timing'],
 )
+app.add_middleware(RequestMetricsMiddleware, registry=app.state.metrics_registry)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": "Некорректный курсор пагинации"})
 
 
-app.include_router(building_router.router)
-app.include_router(activity_router.router)
-app.include_router(organization_router.router)
+api_dependencies = [Depends(require_api_key)]
+app.include_router(building_router.router, dependencies=api_dependencies)
+app.include_router(activity_router.router, dependencies=api_dependencies)
+app.include_router(organization_router.router, dependencies=api_dependencies)
+app.include_router(tile_router.router, dependencies=api_dependencies)
+app.include_router(diagnostics_router.router, dependencies=api_dependencies)
+app.include_router(import_router.router, dependencies=api_dependencies)
+app.include_router(job_router.router, dependencies=api_dependencies)
+app.include_router(metrics_router.router, dependencies=api_dependencies)
+app.include_router(health_router.router)
 
 
 async def start_app():
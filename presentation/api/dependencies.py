@@ -1,32 +1,178 @@
+from dataclasses import dataclass
 from typing import Annotated
+from uuid import UUID
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Query, Request
+from starlette import status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from infrastructure.db.database import get_db_session
+from configuration.base import get_settings
+from domain.entities.organizations import OrganizationInclude, OrganizationIncludes, DEFAULT_INCLUDE, OrganizationFilters
+from infrastructure.cache.activity_tree import ActivityTree
+from infrastructure.cache.response import ResponseCache
+from infrastructure.db.database import get_routed_db_session, get_db_session
+from infrastructure.jobs.runner import JobRunner
 from infrastructure.repositories.activities import ActivitiesRepository
+from infrastructure.repositories.bulk_import import BulkImportRepository
 from infrastructure.repositories.buildings import BuildingsRepository
+from infrastructure.repositories.jobs import JobsRepository
 from infrastructure.repositories.organizations import OrganizationsRepository
+from infrastructure.repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from infrastructure.services.activities import ActivitiesService
+from infrastructure.services.bulk_import import BulkImportService
 from infrastructure.services.buildings import BuildingService
+from infrastructure.services.jobs import JobsService
 from infrastructure.services.organizations import OrganizationsService
 
 
-def get_building_service(session: Annotated[AsyncSession, Depends(get_db_session)]) -> BuildingService:
+# Максимальный радиус геопоиска зданий и организаций
+MAX_RADIUS_METERS = 100_000
+
+
+def get_response_cache(request: Request) -> ResponseCache:
+    """Получить кэш ответов из состояния приложения."""
+    return request.app.state.response_cache
+
+
+def get_building_service(
+    session: Annotated[AsyncSession, Depends(get_routed_db_session)],
+    cache: Annotated[ResponseCache, Depends(get_response_cache)],
+) -> BuildingService:
     """Получить сервис для работы со зданиями."""
-    repository = BuildingsRepository(session)
+    repository = BuildingsRepository(session, cache)
     return BuildingService(repository=repository)
 
 
-def get_activities_service(session: Annotated[AsyncSession, Depends(get_db_session)]) -> ActivitiesService:
+def get_activity_tree(request: Request) -> ActivityTree:
+    """Получить кэш дерева видов деятельности из состояния приложения."""
+    return request.app.state.activity_tree
+
+
+def get_activities_service(
+    session: Annotated[AsyncSession, Depends(get_routed_db_session)],
+    tree: Annotated[ActivityTree, Depends(get_activity_tree)],
+    cache: Annotated[ResponseCache, Depends(get_response_cache)],
+) -> ActivitiesService:
     """Получить сервис для работы со зданиями."""
-    repository = ActivitiesRepository(session)
+    repository = ActivitiesRepository(session, tree, cache)
     return ActivitiesService(repository=repository)
 
 def get_organizations_service(
-    session: Annotated[AsyncSession, Depends(get_db_session)],
-    activities_service: Annotated[ActivitiesService, Depends(get_activities_service)]
+    session: Annotated[AsyncSession, Depends(get_routed_db_session)],
+    activities_service: Annotated[ActivitiesService, Depends(get_activities_service)],
+    cache: Annotated[ResponseCache, Depends(get_response_cache)],
 ) -> OrganizationsService:
     """Получить сервис для работы с организациями."""
-    organization_repository = OrganizationsRepository(session, activities_service.repository)
-    return OrganizationsService(repository=organization_repository)
\ No newline at end of file
+    organization_repository = OrganizationsRepository(session, activities_service.repository, cache)
+    return OrganizationsService(repository=organization_repository)
+
+
+def get_bulk_import_service(
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    tree: Annotated[ActivityTree, Depends(get_activity_tree)],
+    cache: Annotated[ResponseCache, Depends(get_response_cache)],
+) -> BulkImportService:
+    """Получить сервис пакетной загрузки данных."""
+    repository = BulkImportRepository(session, tree, cache)
+    return BulkImportService(repository=repository, batch_size=get_settings().bulk_import_batch_size)
+
+
+def get_job_runner(request: Request) -> JobRunner:
+    """Получить исполнителя фоновых задач из состояния приложения."""
+    return request.app.state.job_runner
+
+
+def get_jobs_service(
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    runner: Annotated[JobRunner, Depends(get_job_runner)],
+) -> JobsService:
+    """Получить сервис фоновых задач; состояние задач читается из основной БД."""
+    return JobsService(repository=JobsRepository(session), runner=runner)
+
+
+@dataclass
+class Pagination:
+    limit: int
+    cursor: str | None
+
+
+def get_pagination(
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE, description="Размер страницы")] = DEFAULT_PAGE_SIZE,
+    cursor: Annotated[str | None, Query(description="Курсор из next_cursor предыдущей страницы")] = None,
+) -> Pagination:
+    """Получить параметры keyset-пагинации из запроса."""
+    return Pagination(limit=limit, cursor=cursor)
+
+
+def get_organization_include(
+    include: Annotated[str | None, Query(
+        description="Связанные данные через запятую: building, phones, activities. "
+                    "Пустое значение - только id, name и building_id; по умолчанию phones,activities",
+    )] = None,
+) -> OrganizationIncludes:
+    """Получить набор связанных данных, которые нужно загрузить и вернуть вместе с организациями."""
+    if include is None:
+        return DEFAULT_INCLUDE
+    values = {value.strip() for value in include.split(",") if value.strip()}
+    try:
+        return frozenset(OrganizationInclude(value) for value in values)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Допустимые значения include: {', '.join(OrganizationInclude)}",
+        )
+
+
+def get_bbox(
+    bbox: Annotated[str, Query(
+        description="Прямоугольник через запятую: lon_min,lat_min,lon_max,lat_max (порядок GeoJSON)",
+    )],
+) -> tuple[float, float, float, float]:
+    """Получить прямоугольник из параметра bbox как (lat_min, lon_min, lat_max, lon_max)."""
+    try:
+        lon_min, lat_min, lon_max, lat_max = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="bbox должен содержать четыре числа: lon_min,lat_min,lon_max,lat_max",
+        )
+    if not (-90 <= lat_min <= lat_max <= 90 and -180 <= lon_min <= lon_max <= 180):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Некорректный bbox: минимум должен быть не больше максимума, широта в [-90, 90], долгота в [-180, 180]",
+        )
+    return lat_min, lon_min, lat_max, lon_max
+
+
+def get_organization_filters(
+    activity_id: Annotated[UUID | None, Query(description="ID вида деятельности (учитываются дочерние)")] = None,
+    building_id: Annotated[UUID | None, Query(description="ID здания")] = None,
+    lat_min: Annotated[float | None, Query(ge=-90, le=90, description="Прямоугольник: минимальная широта")] = None,
+    lon_min: Annotated[float | None, Query(ge=-180, le=180, description="Прямоугольник: минимальная долгота")] = None,
+    lat_max: Annotated[float | None, Query(ge=-90, le=90, description="Прямоугольник: максимальная широта")] = None,
+    lon_max: Annotated[float | None, Query(ge=-180, le=180, description="Прямоугольник: максимальная долгота")] = None,
+    lat: Annotated[float | None, Query(ge=-90, le=90, description="Радиус: широта центра")] = None,
+    lon: Annotated[float | None, Query(ge=-180, le=180, description="Радиус: долгота центра")] = None,
+    radius: Annotated[float | None, Query(gt=0, le=MAX_RADIUS_METERS, description="Радиус в метрах")] = None,
+    name_prefix: Annotated[str | None, Query(min_length=1, max_length=255, description="Начало названия")] = None,
+) -> OrganizationFilters:
+    """Получить фильтры комбинированного запроса организаций; заданные фильтры объединяются через И."""
+    square = (lat_min, lon_min, lat_max, lon_max)
+    if any(v is not None for v in square) and any(v is None for v in square):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Для прямоугольника нужны lat_min, lon_min, lat_max и lon_max",
+        )
+    circle = (lat, lon, radius)
+    if any(v is not None for v in circle) and any(v is None for v in circle):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Для поиска в радиусе нужны lat, lon и radius",
+        )
+    return OrganizationFilters(
+        activity_id=activity_id,
+        building_id=building_id,
+        square=square if lat_min is not None else None,
+        radius=circle if lat is not None else None,
+        name_prefix=name_prefix,
+    )
@@ -0,0 +1,52 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infrastructure.metrics.prometheus import RequestMetricsRegistry
+from infrastructure.metrics.request import start_request, end_request
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestMetricsMiddleware:
+    """
+    Собирает метрики каждого HTTP-запроса: число SQL-запросов, время в БД,
+    ожидание пула, сборку сущностей и сериализацию. Отдаёт их в заголовке
+    Server-Timing и складывает в реестр для /metrics с меткой шаблона маршрута
+    """
+
+    def __init__(self, app: ASGIApp, registry: RequestMetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics, token = start_request()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Для потоковых ответов заголовок отражает работу до первого байта тела
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", metrics.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            self.registry.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                metrics,
+                time.perf_counter() - started,
+            )
+            end_request(token)
@@ -1 +1,2 @@
-from . import building_router, activity_router, organization_router
\ No newline at end of file
+from . import building_router, activity_router, organization_router, diagnostics_router, import_router, metrics_router, \
+    health_router, tile_router, job_router
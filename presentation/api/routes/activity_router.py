@@ -6,8 +6,12 @@ from starlette import status
 from domain.entities.activities import Activity
 from configuration.exceptions import ParentActivityNotFoundError, ActivityDepthLimitError, ActivityNotFoundError, ActivityHasChildrenError
 from infrastructure.services.activities import ActivitiesService
+from infrastructure.db.database import mark_read_only
 from presentation.api.dependencies import get_activities_service
-from presentation.api.schemas.activities import ActivityResponse, ActivityCreate, ActivitiesListResponse, ActivitySubtreeIdsResponse
+from presentation.api.schemas.activities import ActivityResponse, ActivityCreate, ActivitiesListResponse, ActivitySubtreeIdsResponse, \
+    ActivitiesBatchResponse
+from presentation.api.schemas.batch import BatchRequest
+from presentation.api.serialization import activities_batch_json, json_response
 
 router = APIRouter(prefix='/activities', tags=['activities'])
 
@@ -30,6 +34,15 @@ async def create_activity(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Cant create activity with deep >= 3")
     return _to_activity_response(created)
 
+@router.post("/batch", response_model=ActivitiesBatchResponse, dependencies=[Depends(mark_read_only)])
+async def get_activities_batch(
+    data: BatchRequest,
+    service: ActivitiesService = Depends(get_activities_service),
+):
+    """Получить деятельности по списку ID (порядок сохраняется, ненайденные ID - в missing_ids)"""
+    batch = await service.get_many(data.ids)
+    return json_response(activities_batch_json(batch))
+
 @router.get("/{activity_id}", response_model=ActivityResponse)
 async def get_activity_by_id(
     activity_id: UUID,
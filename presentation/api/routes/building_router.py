@@ -1,13 +1,20 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from starlette import status
 
 from domain.entities.buildings import Building
 from configuration.exceptions import DuplicateBuildingAddressError, BuildingCreateError, BuildingNotFoundError
+from infrastructure.cache.response import ResponseCache, CacheTag
+from infrastructure.db.database import mark_read_only
+from infrastructure.repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from infrastructure.services.buildings import BuildingService
-from presentation.api.dependencies import get_building_service
-from presentation.api.schemas.buildings import BuildingsResponse, BuildingsCreate, BuildingsListResponse
+from presentation.api.dependencies import get_building_service, get_pagination, Pagination, get_response_cache, \
+    MAX_RADIUS_METERS
+from presentation.api.schemas.batch import BatchRequest
+from presentation.api.serialization import buildings_list_json, json_response, buildings_batch_json
+from presentation.api.schemas.buildings import BuildingsResponse, BuildingsCreate, BuildingsListResponse, \
+    BuildingsBatchResponse
 
 router = APIRouter(prefix='/buildings', tags=['buildings'])
 
@@ -28,6 +35,12 @@ async def create_building(building_data: BuildingsCreate, building_service: Buil
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Ошибка при создании здания: {e.msg}")
     return _building_entity_to_response(building=building)
 
+@router.post('/batch', response_model=BuildingsBatchResponse, dependencies=[Depends(mark_read_only)])
+async def get_buildings_batch(data: BatchRequest, building_service: BuildingService = Depends(get_building_service)):
+    """Получить здания по списку ID (порядок сохраняется, ненайденные ID - в missing_ids)"""
+    batch = await building_service.get_many(data.ids)
+    return json_response(buildings_batch_json(batch))
+
 @router.get('/{building_id}', response_model=BuildingsResponse)
 async def get_building(building_id: UUID, building_service: BuildingService = Depends(get_building_service)):
     """Получить пользователя по ID"""
@@ -39,26 +52,45 @@ async def get_building(building_id: UUID, building_service: BuildingService = De
 
 
 @router.get('/', response_model=BuildingsListResponse)
-async def list_all_buildings(building_service: BuildingService = Depends(get_building_service)):
-    """Получить список всех зданий"""
-    buildings = await building_service.list_all_buildings()
-    return BuildingsListResponse(
-        buildings=[_building_entity_to_response(building) for building in buildings]
-    )
+async def list_all_buildings(
+    pagination: Pagination = Depends(get_pagination),
+    building_service: BuildingService = Depends(get_building_service),
+):
+    """Получить страницу всех зданий"""
+    page = await building_service.list_all_buildings(pagination.limit, pagination.cursor)
+    return json_response(buildings_list_json(page.items, page.next_cursor))
 
 @router.get("/geo/square", response_model=BuildingsListResponse)
 async def get_buildings_in_square(
+    request: Request,
     lat_min: float,
     lon_min: float,
     lat_max: float,
     lon_max: float,
+    pagination: Pagination = Depends(get_pagination),
     building_service: BuildingService = Depends(get_building_service),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
     """Получить здания, находящиеся в пределах прямоугольной области"""
-    buildings = await building_service.list_buildings_in_square(lat_min, lon_min, lat_max, lon_max)
-    return BuildingsListResponse(
-        buildings=[_building_entity_to_response(b) for b in buildings]
-    )
+    async def render() -> bytes:
+        page = await building_service.list_buildings_in_square(
+            lat_min, lon_min, lat_max, lon_max, pagination.limit, pagination.cursor,
+        )
+        return buildings_list_json(page.items, page.next_cursor)
+
+    return await cache.respond(request, (CacheTag.BUILDINGS,), render)
+
+@router.get("/geo/radius", response_model=BuildingsListResponse)
+async def get_buildings_in_radius(
+    lat: float = Query(..., ge=-90, le=90, description='Широта центра'),
+    lon: float = Query(..., ge=-180, le=180, description='Долгота центра'),
+    radius: float = Query(..., gt=0, le=MAX_RADIUS_METERS, description='Радиус в метрах'),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description='Максимальное число зданий'),
+    building_service: BuildingService = Depends(get_building_service),
+):
+    """Получить ближайшие здания в заданном радиусе, отсортированные по расстоянию"""
+    buildings = await building_service.list_buildings_in_radius(lat, lon, radius, limit)
+    return json_response(buildings_list_json(buildings))
 
 def _building_entity_to_response(building: Building) -> BuildingsResponse:
     """Преобразовать доменную сущность в модель ответа"""
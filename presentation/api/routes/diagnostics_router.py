@@ -0,0 +1,18 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends
+
+from infrastructure.db.database import Database, get_database
+from presentation.api.schemas.diagnostics import PoolStatusResponse, PoolsStatusResponse
+
+router = APIRouter(prefix='/diagnostics', tags=['diagnostics'])
+
+
+@router.get('/pool', response_model=PoolsStatusResponse)
+async def get_pool_status(database: Database = Depends(get_database)):
+    """Получить метрики пулов соединений с основной БД и репликой"""
+    pools = database.pool_statuses()
+    return PoolsStatusResponse(
+        primary=PoolStatusResponse(**asdict(pools["primary"])),
+        replica=PoolStatusResponse(**asdict(pools["replica"])) if "replica" in pools else None,
+    )
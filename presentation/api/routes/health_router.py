@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from starlette import status
+
+from presentation.api.schemas.diagnostics import HealthResponse
+
+# Пробы оркестратора ходят без API-ключа
+router = APIRouter(prefix='/health', tags=['diagnostics'])
+
+
+@router.get('/live', response_model=HealthResponse)
+async def live():
+    """Процесс запущен и обрабатывает запросы"""
+    return HealthResponse(status="ok")
+
+
+@router.get(
+    '/ready',
+    response_model=HealthResponse,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": HealthResponse}},
+)
+async def ready(request: Request):
+    """Прогрев завершён: соединения открыты, частые запросы подготовлены"""
+    if not request.app.state.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "warming_up"})
+    return HealthResponse(status="ok")
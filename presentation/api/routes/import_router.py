@@ -0,0 +1,48 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette import status
+
+from domain.entities.bulk_import import ImportKind, ImportFormat
+from infrastructure.services.bulk_import import BulkImportService
+from presentation.api.dependencies import get_bulk_import_service
+from presentation.api.schemas.bulk_import import ImportReportResponse
+
+router = APIRouter(prefix='/import', tags=['import'])
+
+CONTENT_TYPE_FORMATS = {
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+    "text/csv": ImportFormat.CSV,
+}
+
+
+@router.post('/{kind}', response_model=ImportReportResponse)
+async def bulk_import(
+    kind: ImportKind,
+    request: Request,
+    fmt: ImportFormat | None = Query(None, alias='format', description='Формат файла (по умолчанию из Content-Type)'),
+    import_service: BulkImportService = Depends(get_bulk_import_service),
+):
+    """
+    Загрузить здания, виды деятельности или организации из CSV или NDJSON
+    Тело читается потоком и записывается пакетами; ошибки строк возвращаются в отчёте.
+    Для больших файлов - POST /jobs/import/{kind}: загрузка идёт фоновой задачей
+    """
+    fmt = resolve_import_format(request, fmt)
+    report = await import_service.import_stream(kind, fmt, request.stream())
+    return ImportReportResponse(**asdict(report))
+
+
+def resolve_import_format(request: Request, fmt: ImportFormat | None) -> ImportFormat:
+    """Формат файла из параметра format или Content-Type"""
+    if fmt is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        fmt = CONTENT_TYPE_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Укажите формат: параметр format или Content-Type text/csv / application/x-ndjson",
+        )
+    return fmt
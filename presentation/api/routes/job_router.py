@@ -0,0 +1,68 @@
+from dataclasses import asdict
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette import status
+
+from configuration.base import get_settings
+from configuration.exceptions import JobNotFoundError
+from domain.entities.bulk_import import ImportKind, ImportFormat
+from domain.entities.jobs import Job, JobKind
+from infrastructure.services.jobs import JobsService
+from presentation.api.dependencies import get_jobs_service
+from presentation.api.routes.import_router import resolve_import_format
+from presentation.api.schemas.jobs import JobResponse
+
+router = APIRouter(prefix='/jobs', tags=['jobs'])
+
+
+@router.post('/import/{kind}', response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_import(
+    kind: ImportKind,
+    request: Request,
+    fmt: ImportFormat | None = Query(None, alias='format', description='Формат файла (по умолчанию из Content-Type)'),
+    service: JobsService = Depends(get_jobs_service),
+):
+    """
+    Поставить пакетную загрузку в очередь фоновых задач
+    Тело сохраняется в задаче, отчёт загрузки - в её result
+    """
+    fmt = resolve_import_format(request, fmt)
+    max_bytes = get_settings().jobs_import_max_bytes
+    data = bytearray()
+    async for chunk in request.stream():
+        data += chunk
+        if len(data) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Файл больше {max_bytes} байт: разбейте его на части",
+            )
+    job = await service.enqueue(JobKind.IMPORT, {"kind": kind, "format": fmt}, bytes(data))
+    return _to_job_response(job)
+
+
+@router.post('/recount-organizations', response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_recount_organizations(service: JobsService = Depends(get_jobs_service)):
+    """Поставить в очередь пересчёт счётчиков организаций по зданиям и видам деятельности"""
+    return _to_job_response(await service.enqueue(JobKind.RECOUNT_ORGANIZATIONS))
+
+
+@router.post('/warm-up', response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_warm_up(service: JobsService = Depends(get_jobs_service)):
+    """Поставить в очередь прогрев процесса, который захватит задачу"""
+    return _to_job_response(await service.enqueue(JobKind.WARM_UP))
+
+
+@router.get('/{job_id}', response_model=JobResponse)
+async def get_job(job_id: UUID, service: JobsService = Depends(get_jobs_service)):
+    """Получить состояние фоновой задачи"""
+    try:
+        job = await service.get(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Задача с ID {job_id} не найдена")
+    return _to_job_response(job)
+
+
+def _to_job_response(job: Job) -> JobResponse:
+    """Преобразовать доменную сущность в модель ответа"""
+    return JobResponse(**asdict(job))
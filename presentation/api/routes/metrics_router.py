@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import PlainTextResponse
+
+from infrastructure.db.database import Database, get_database
+from infrastructure.metrics.prometheus import RequestMetricsRegistry, render_gauges
+
+router = APIRouter(tags=['diagnostics'])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def get_metrics_registry(request: Request) -> RequestMetricsRegistry:
+    return request.app.state.metrics_registry
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def get_metrics(
+    registry: RequestMetricsRegistry = Depends(get_metrics_registry),
+    database: Database = Depends(get_database),
+):
+    """Метрики запросов и пулов соединений в текстовом формате Prometheus"""
+    pools = database.pool_statuses()
+    body = registry.render() + "".join((
+        render_gauges("db_pool_checked_out", "Выданные соединения", "pool",
+                      {name: status.checked_out for name, status in pools.items()}),
+        render_gauges("db_pool_overflow", "Соединения сверх размера пула", "pool",
+                      {name: status.overflow for name, status in pools.items()}),
+        render_gauges("db_pool_timeouts", "Истечения ожидания соединения", "pool",
+                      {name: status.timeouts for name, status in pools.items()}),
+    ))
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,19 +1,38 @@
+from collections.abc import AsyncIterator
 from uuid import UUID
 
-from fastapi import HTTPException, Depends, APIRouter
+from fastapi import HTTPException, Depends, APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
 from starlette import status
 
+from configuration.base import get_settings
 from domain.entities.activities import Activity
-from domain.entities.organizations import Organization
-from configuration.exceptions import OrganizationCreateError, ActivityNotFoundError
+from domain.entities.organizations import Organization, OrganizationSearchMode, OrganizationIncludes, OrganizationInclude, \
+    OrganizationFilters, DEFAULT_INCLUDE
+from domain.phones import normalize_phone
+from configuration.exceptions import OrganizationCreateError, ActivityNotFoundError, BuildingNotFoundError
+from infrastructure.cache.response import ResponseCache, CacheTag
+from infrastructure.db.geo import cluster_cell_size, mercator_xy
+from infrastructure.db.database import mark_read_only
+from infrastructure.repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from infrastructure.services.organizations import OrganizationsService
-from presentation.api.dependencies import get_organizations_service
-from presentation.api.routes.activity_router import _to_activity_response
-from presentation.api.schemas.organization import OrganizationResponse, OrganizationCreate, OrganizationsListResponse
+from presentation.api.dependencies import get_organizations_service, get_pagination, Pagination, get_response_cache, \
+    get_organization_include, get_bbox, get_organization_filters, MAX_RADIUS_METERS
+from presentation.api.schemas.batch import BatchRequest
+from presentation.api.serialization import organizations_list_json, organization_json, json_response, \
+    organizations_batch_json, organization_clusters_json
+from presentation.api.schemas.organization import OrganizationResponse, OrganizationCreate, OrganizationsListResponse, \
+    OrganizationsBatchResponse, OrganizationClustersResponse, OrganizationCountResponse
 
 
 router = APIRouter(prefix='/organization', tags=['organization'])
 
+# Короче трёх символов триграммный индекс не помогает
+MIN_SEARCH_LENGTH = 3
+MAX_CLUSTER_ZOOM = 22
+# Больше ячеек карта не покажет, а ответ и агрегация растут
+MAX_CLUSTER_CELLS = 4096
+
 @router.post("/", response_model=OrganizationResponse, status_code=status.HTTP_201_CREATED)
 async def create_organization(
     data: OrganizationCreate,
@@ -31,44 +50,156 @@ async def create_organization(
         created = await service.create(org_entity)
     except OrganizationCreateError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Ошибка при создании организации: {e.msg}")
-    return _to_organization_response(created)
+    # Та же форма, что у GET /organization/{id} с include по умолчанию
+    return json_response(organization_json(created, DEFAULT_INCLUDE), status_code=status.HTTP_201_CREATED)
+
+@router.post("/batch", response_model=OrganizationsBatchResponse, dependencies=[Depends(mark_read_only)])
+async def get_organizations_batch(
+    data: BatchRequest,
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """Получить организации по списку ID (порядок сохраняется, ненайденные ID - в missing_ids)"""
+    batch = await service.get_many(data.ids, include)
+    return json_response(organizations_batch_json(batch, include))
 
 @router.get("/", response_model=OrganizationsListResponse)
-async def list_all_organizations(service: OrganizationsService = Depends(get_organizations_service)):
-    """Получить список всех организаций"""
-    items = await service.list_all()
-    return OrganizationsListResponse(organizations=[_to_organization_response(o) for o in items])
+async def list_all_organizations(
+    pagination: Pagination = Depends(get_pagination),
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """Получить страницу всех организаций"""
+    page = await service.list_all(pagination.limit, pagination.cursor, include)
+    return json_response(organizations_list_json(page.items, page.next_cursor, include=include))
 
 
 @router.get("/building/{building_id}", response_model=OrganizationsListResponse)
-async def list_by_building_by_id(building_id: UUID, service: OrganizationsService = Depends(get_organizations_service)):
+async def list_by_building_by_id(
+    request: Request,
+    building_id: UUID,
+    pagination: Pagination = Depends(get_pagination),
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+    cache: ResponseCache = Depends(get_response_cache),
+):
     """Получить организации, находящиеся в конкретном здании"""
-    items = await service.list_by_building(building_id)
-    return OrganizationsListResponse(organizations=[_to_organization_response(o) for o in items])
+    async def render() -> bytes:
+        page = await service.list_by_building(building_id, pagination.limit, pagination.cursor, include)
+        return organizations_list_json(page.items, page.next_cursor, include=include)
+
+    return await cache.respond(request, _cache_tags(include), render)
 
 
 @router.get("/by-activity/{activity_id}", response_model=OrganizationsListResponse)
-async def list_by_activity_id(activity_id: UUID, service: OrganizationsService = Depends(get_organizations_service)):
+async def list_by_activity_id(
+    request: Request,
+    activity_id: UUID,
+    pagination: Pagination = Depends(get_pagination),
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+    cache: ResponseCache = Depends(get_response_cache),
+):
     """Получить организации по ID вида деятельности"""
-    items = await service.list_by_activity_id(activity_id)
-    return OrganizationsListResponse(organizations=[_to_organization_response(o) for o in items])
+    async def render() -> bytes:
+        page = await service.list_by_activity_id(activity_id, pagination.limit, pagination.cursor, include)
+        return organizations_list_json(page.items, page.next_cursor, include=include)
+
+    return await cache.respond(request, _cache_tags(include), render)
+
+
+@router.get("/count/by-building/{building_id}", response_model=OrganizationCountResponse)
+async def count_by_building(
+    building_id: UUID,
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """Число организаций в здании"""
+    try:
+        count = await service.count_by_building(building_id)
+    except BuildingNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Здание с ID {building_id} не найдено")
+    return OrganizationCountResponse(id=building_id, organizations=count)
+
+
+@router.get("/count/by-activity/{activity_id}", response_model=OrganizationCountResponse)
+async def count_by_activity(
+    activity_id: UUID,
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """Число организаций вида деятельности с учётом всех дочерних видов"""
+    try:
+        count = await service.count_by_activity(activity_id)
+    except ActivityNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Деятельность с ID {activity_id} не найдена")
+    return OrganizationCountResponse(id=activity_id, organizations=count)
 
 
 @router.get("/by-activity-name", response_model=OrganizationsListResponse)
-async def list_by_activity_name(name: str, service: OrganizationsService = Depends(get_organizations_service)):
+async def list_by_activity_name(
+    name: str,
+    pagination: Pagination = Depends(get_pagination),
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
     """Получить организации по названию вида деятельности"""
     try:
-        items = await service.list_by_activity_name(name)
+        page = await service.list_by_activity_name(name, pagination.limit, pagination.cursor, include)
     except ActivityNotFoundError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Деятельность '{name}' не найдена")
-    return OrganizationsListResponse(organizations=[_to_organization_response(o) for o in items])
+    return json_response(organizations_list_json(page.items, page.next_cursor, include=include))
 
 
 @router.get("/search/name", response_model=OrganizationsListResponse)
-async def find_by__name(name: str, service: OrganizationsService = Depends(get_organizations_service)):
+async def find_by__name(
+    name: str,
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
     """Найти организации по точному совпадению имени"""
-    items = await service.find_by_name(name)
-    return OrganizationsListResponse(organizations=[_to_organization_response(o) for o in items])
+    items = await service.find_by_name(name, include)
+    return json_response(organizations_list_json(items, include=include))
+
+@router.get("/by-phone/{phone}", response_model=OrganizationsListResponse)
+async def find_by_phone(
+    phone: str,
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """Найти организации по номеру телефона в любой записи (+7 (495) 111-11-11, 84951111111, ...)"""
+    phone_e164 = normalize_phone(phone)
+    if phone_e164 is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Некорректный номер: {phone}")
+    items = await service.find_by_phone(phone_e164, include)
+    return json_response(organizations_list_json(items, include=include))
+
+@router.get("/search", response_model=OrganizationsListResponse)
+async def search_organizations(
+    q: str = Query(..., min_length=MIN_SEARCH_LENGTH, max_length=255, description="Строка поиска"),
+    mode: OrganizationSearchMode = Query(OrganizationSearchMode.SUBSTRING, description="Режим поиска"),
+    pagination: Pagination = Depends(get_pagination),
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """
+    Найти организации по началу названия, его части или с опечатками (fuzzy)
+    Результаты упорядочены по похожести на запрос
+    """
+    page = await service.search(q.strip(), mode, pagination.limit, pagination.cursor, include)
+    return json_response(organizations_list_json(page.items, page.next_cursor, include=include))
+
+@router.get("/query", response_model=OrganizationsListResponse)
+async def query_organizations(
+    filters: OrganizationFilters = Depends(get_organization_filters),
+    pagination: Pagination = Depends(get_pagination),
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """
+    Найти организации по любому сочетанию фильтров одним запросом:
+    вид деятельности (с дочерними), здание, прямоугольник или радиус, начало названия
+    """
+    page = await service.query(filters, pagination.limit, pagination.cursor, include)
+    return json_response(organizations_list_json(page.items, page.next_cursor, include=include))
 
 @router.get("/geo/square", response_model=OrganizationsListResponse)
 async def get_organizations_in_square(
@@ -76,25 +207,106 @@ async def get_organizations_in_square(
     lon_min: float,
     lat_max: float,
     lon_max: float,
+    pagination: Pagination = Depends(get_pagination),
+    include: OrganizationIncludes = Depends(get_organization_include),
     service: OrganizationsService = Depends(get_organizations_service),
 ):
     """Найти организации в пределах прямоугольной области"""
-    items = await service.list_by_square(lat_min, lon_min, lat_max, lon_max)
-    return OrganizationsListResponse(organizations=[_to_organization_response(o) for o in items])
+    page = await service.list_by_square(
+        lat_min, lon_min, lat_max, lon_max, pagination.limit, pagination.cursor, include,
+    )
+    return json_response(organizations_list_json(page.items, page.next_cursor, include=include))
+
+@router.get("/geo/radius", response_model=OrganizationsListResponse)
+async def get_organizations_in_radius(
+    lat: float = Query(..., ge=-90, le=90, description="Широта центра"),
+    lon: float = Query(..., ge=-180, le=180, description="Долгота центра"),
+    radius: float = Query(..., gt=0, le=MAX_RADIUS_METERS, description="Радиус в метрах"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Максимальное число организаций"),
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """Найти ближайшие организации в заданном радиусе, отсортированные по расстоянию"""
+    items = await service.list_by_radius(lat, lon, radius, limit, include)
+    return json_response(organizations_list_json(items, include=include))
+
+@router.get("/geo/nearest", response_model=OrganizationsListResponse)
+async def get_nearest_organizations(
+    lat: float = Query(..., ge=-90, le=90, description="Широта точки"),
+    lon: float = Query(..., ge=-180, le=180, description="Долгота точки"),
+    k: int = Query(10, ge=1, le=MAX_PAGE_SIZE, description="Количество ближайших организаций"),
+    activity_id: UUID | None = Query(None, description="ID вида деятельности (учитываются дочерние)"),
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """Найти k ближайших к точке организаций, опционально с фильтром по виду деятельности"""
+    items = await service.list_nearest(lat, lon, k, activity_id, include)
+    return json_response(organizations_list_json(items, include=include))
+
+@router.get("/geo/clusters", response_model=OrganizationClustersResponse)
+async def get_organization_clusters(
+    request: Request,
+    bbox: tuple[float, float, float, float] = Depends(get_bbox),
+    zoom: int = Query(..., ge=0, le=MAX_CLUSTER_ZOOM, description="Уровень масштаба карты"),
+    top: int = Query(3, ge=0, le=10, description="Сколько самых частых видов деятельности вернуть для ячейки"),
+    service: OrganizationsService = Depends(get_organizations_service),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Сгруппировать организации области по ячейкам сетки для кластеров на карте
+    Размер ячейки зависит от zoom, поэтому ответ не растёт с плотностью точек
+    """
+    cell_size = cluster_cell_size(zoom)
+    lat_min, lon_min, lat_max, lon_max = bbox
+    x_min, y_min = mercator_xy(lat_min, lon_min)
+    x_max, y_max = mercator_xy(lat_max, lon_max)
+    if (x_max - x_min) / cell_size * (y_max - y_min) / cell_size > MAX_CLUSTER_CELLS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Область слишком велика для этого zoom: уменьшите bbox или zoom",
+        )
+
+    async def render() -> bytes:
+        clusters = await service.clusters(lat_min, lon_min, lat_max, lon_max, cell_size, top)
+        return organization_clusters_json(clusters, cell_size)
+
+    return await cache.respond(request, (CacheTag.ORGANIZATIONS, CacheTag.BUILDINGS, CacheTag.ACTIVITIES), render)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_organizations(
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
+    """
+    Выгрузить все организации в формате NDJSON (одна организация на строку)
+    Ответ пишется по мере чтения из БД, память ограничена размером пачки
+    """
+    async def lines() -> AsyncIterator[bytes]:
+        async for organizations in service.stream_all(get_settings().export_batch_size, include):
+            yield b"".join(
+                organization_json(org, include) + b"\n" for org in organizations
+            )
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="organizations.ndjson"'},
+    )
+
 
 @router.get("/{organization_id}", response_model=OrganizationResponse)
-async def get_organization_by_id(organization_id: UUID, service: OrganizationsService = Depends(get_organizations_service)):
+async def get_organization_by_id(
+    organization_id: UUID,
+    include: OrganizationIncludes = Depends(get_organization_include),
+    service: OrganizationsService = Depends(get_organizations_service),
+):
     """Получить организацию по её ID"""
-    org = await service.get_by_id(organization_id)
+    org = await service.get_by_id(organization_id, include)
     if not org:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Организация с ID {organization_id} не найдена")
-    return _to_organization_response(org)
-
-def _to_organization_response(org: Organization) -> OrganizationResponse:
-    return OrganizationResponse(
-        id=org.id,
-        name=org.name,
-        building_id=org.building_id,
-        phones=list(org.phones or []),
-        activities=[_to_activity_response(a) for a in (org.activities or [])],
-    )
+    return json_response(organization_json(org, include))
+
+def _cache_tags(include: OrganizationIncludes) -> tuple[CacheTag, ...]:
+    """Теги кэша ответа со списком организаций: здания влияют на ответ, только если встроены"""
+    tags = (CacheTag.ORGANIZATIONS, CacheTag.ACTIVITIES)
+    return (*tags, CacheTag.BUILDINGS) if OrganizationInclude.BUILDING in include else tags
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
+from starlette import status
+
+from infrastructure.cache.response import ResponseCache, CacheTag, MAX_TILE_ZOOM, tile_generation_key
+from infrastructure.services.buildings import BuildingService
+from presentation.api.dependencies import get_building_service, get_response_cache
+
+router = APIRouter(prefix='/tiles', tags=['tiles'])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+@router.get(
+    '/{z}/{x}/{y}.mvt',
+    response_class=Response,
+    responses={status.HTTP_200_OK: {"content": {MVT_MEDIA_TYPE: {}}}},
+)
+async def get_tile(
+    request: Request,
+    z: int = Path(..., ge=0, le=MAX_TILE_ZOOM, description="Уровень масштаба"),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    building_service: BuildingService = Depends(get_building_service),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Векторный тайл зданий с числом организаций и их видами деятельности
+    Кэшируется по z/x/y и сбрасывается при записи зданий и организаций внутри тайла
+    """
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Тайла {z}/{x}/{y} не существует")
+
+    async def render() -> bytes:
+        return await building_service.get_tile(z, x, y)
+
+    return await cache.respond(
+        request,
+        (CacheTag.ACTIVITIES, CacheTag.TILES),
+        render,
+        media_type=MVT_MEDIA_TYPE,
+        generation_keys=(tile_generation_key(z, x, y),),
+    )
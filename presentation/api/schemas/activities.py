@@ -21,6 +21,12 @@ class ActivitiesListResponse(BaseModel):
     activities: list[ActivityResponse]
 
 
+class ActivitiesBatchResponse(BaseModel):
+    """Виды деятельности по списку ID (в порядке запроса) и ненайденные ID."""
+    activities: list[ActivityResponse]
+    missing_ids: list[UUID] = Field(..., description="ID, для которых ничего не найдено")
+
+
 class ActivitySubtreeIdsResponse(BaseModel):
     """ID всех активностей поддерева (включая корень)."""
     ids: list[UUID]
\ No newline at end of file
@@ -0,0 +1,10 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from infrastructure.repositories.batch import MAX_BATCH_SIZE
+
+
+class BatchRequest(BaseModel):
+    """Запрос записей по списку ID."""
+    ids: list[UUID] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE, description="ID записей")
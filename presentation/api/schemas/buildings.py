@@ -22,5 +22,10 @@ class BuildingsCreate(BaseModel):
 
 class BuildingsListResponse(BaseModel):
     buildings: list[BuildingsResponse]
+    next_cursor: str | None = Field(None, description='Курсор следующей страницы (если есть)')
 
 
+class BuildingsBatchResponse(BaseModel):
+    """Здания по списку ID (в порядке запроса) и ненайденные ID."""
+    buildings: list[BuildingsResponse]
+    missing_ids: list[UUID] = Field(..., description='ID, для которых ничего не найдено')
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+
+from domain.entities.bulk_import import ImportKind
+
+
+class ImportRowErrorResponse(BaseModel):
+    """Ошибка загрузки строки файла."""
+    line: int = Field(..., description="Номер строки в файле (с 1)")
+    message: str = Field(..., description="Описание ошибки")
+
+
+class ImportReportResponse(BaseModel):
+    """Итог пакетной загрузки."""
+    kind: ImportKind = Field(..., description="Тип загружаемых записей")
+    processed: int = Field(..., description="Прочитано записей")
+    inserted: int = Field(..., description="Добавлено записей")
+    failed: int = Field(..., description="Записей с ошибками")
+    errors: list[ImportRowErrorResponse] = Field(..., description="Ошибки строк (не больше 1000)")
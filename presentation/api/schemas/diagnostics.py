@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+
+
+class PoolStatusResponse(BaseModel):
+    """Состояние пула соединений с БД."""
+    size: int = Field(..., description="Размер пула")
+    checked_in: int = Field(..., description="Свободные соединения в пуле")
+    checked_out: int = Field(..., description="Выданные соединения")
+    overflow: int = Field(..., description="Соединения сверх размера пула")
+    max_overflow: int = Field(..., description="Максимум соединений сверх размера пула")
+    acquisitions: int = Field(..., description="Сколько раз выдавалось соединение")
+    timeouts: int = Field(..., description="Сколько раз истекло ожидание соединения")
+    total_wait_seconds: float = Field(..., description="Суммарное время ожидания соединения")
+    max_wait_seconds: float = Field(..., description="Максимальное время ожидания соединения")
+
+
+class PoolsStatusResponse(BaseModel):
+    """Состояние пулов основной БД и реплики."""
+    primary: PoolStatusResponse
+    replica: PoolStatusResponse | None = Field(None, description="Пул реплики (если настроена)")
+
+
+class HealthResponse(BaseModel):
+    """Состояние процесса для проб оркестратора."""
+    status: str = Field(..., description="ok или warming_up")
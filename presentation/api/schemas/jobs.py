@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from domain.entities.jobs import JobKind, JobStatus
+
+
+class JobResponse(BaseModel):
+    """Состояние фоновой задачи."""
+    id: UUID
+    kind: JobKind = Field(..., description="Тип задачи")
+    status: JobStatus = Field(..., description="queued, running, succeeded или failed")
+    payload: dict[str, Any] = Field(..., description="Параметры задачи")
+    result: dict[str, Any] | None = Field(None, description="Результат (например, отчёт загрузки)")
+    error: str | None = Field(None, description="Описание ошибки для failed")
+    attempts: int = Field(..., description="Сколько раз задача захватывалась исполнителем")
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
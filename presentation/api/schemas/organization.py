@@ -1,20 +1,10 @@
-import re
 from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
 
+from domain.phones import is_valid_phone
 from presentation.api.schemas.activities import ActivityResponse
-
-PHONE_REGEX = re.compile(
-    r"""
-    ^\s*                   
-    (?:\+?7|8)                 # код страны (+7, 7 или 8)
-    [\s\-()]*                  # возможные пробелы и скобки
-    (?:\d[\s\-()]*){10}        # ровно 10 цифр после кода страны
-    \s*$                       
-    """,
-    re.VERBOSE
-)
+from presentation.api.schemas.buildings import BuildingsResponse
 
 
 class OrganizationCreate(BaseModel):
@@ -32,7 +22,7 @@ class OrganizationCreate(BaseModel):
         validated = []
         for phone in phones:
             phone = phone.strip()
-            if not PHONE_REGEX.match(phone):
+            if not is_valid_phone(phone):
                 raise ValueError(
                     f"Некорректный формат номера: {phone}. Допустимые форматы: +79991234567, 8 (999) 123-45-67, +7 999 123 4567"
                 )
@@ -41,13 +31,50 @@ class OrganizationCreate(BaseModel):
 
 
 class OrganizationResponse(BaseModel):
-    """Ответ с данными организации (неплоский, с активностями)."""
+    """
+    Ответ с данными организации (неплоский, с активностями).
+    Поля phones, activities и building присутствуют, только если запрошены в include.
+    """
     id: UUID
     name: str
     building_id: UUID
-    phones: list[str]
-    activities: list[ActivityResponse]
+    phones: list[str] | None = Field(None, description="Телефоны (include=phones)")
+    activities: list[ActivityResponse] | None = Field(None, description="Виды деятельности (include=activities)")
+    building: BuildingsResponse | None = Field(None, description="Здание (include=building)")
 
 
 class OrganizationsListResponse(BaseModel):
-    organizations: list[OrganizationResponse]
\ No newline at end of file
+    organizations: list[OrganizationResponse]
+    next_cursor: str | None = Field(None, description="Курсор следующей страницы (если есть)")
+
+
+class OrganizationCountResponse(BaseModel):
+    """Число организаций в здании или поддереве вида деятельности."""
+    id: UUID = Field(..., description="ID здания или вида деятельности")
+    organizations: int = Field(..., description="Число организаций")
+
+
+class ClusterActivityResponse(BaseModel):
+    """Вид деятельности в ячейке кластеризации."""
+    id: UUID
+    name: str
+    count: int = Field(..., description="Организаций этого вида в ячейке")
+
+
+class OrganizationClusterResponse(BaseModel):
+    """Ячейка сетки: центр масс организаций, их число и самые частые виды деятельности."""
+    latitude: float
+    longitude: float
+    count: int = Field(..., description="Организаций в ячейке")
+    top_activities: list[ClusterActivityResponse]
+
+
+class OrganizationClustersResponse(BaseModel):
+    clusters: list[OrganizationClusterResponse]
+    cell_size: float = Field(..., description="Сторона ячейки в метрах проекции web mercator")
+
+
+class OrganizationsBatchResponse(BaseModel):
+    """Организации по списку ID (в порядке запроса) и ненайденные ID."""
+    organizations: list[OrganizationResponse]
+    missing_ids: list[UUID] = Field(..., description="ID, для которых ничего не найдено")
@@ -0,0 +1,116 @@
+from typing import TypedDict
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from domain.entities.activities import Activity
+from domain.entities.batch import BatchResult
+from domain.entities.buildings import Building
+from domain.entities.organizations import Organization, OrganizationInclude, OrganizationIncludes, DEFAULT_INCLUDE, \
+    OrganizationCluster
+from infrastructure.metrics.request import timed
+
+
+class OrganizationsListBody(TypedDict):
+    """Тело ответа OrganizationsListResponse"""
+    organizations: list[Organization]
+    next_cursor: str | None
+
+
+class BuildingsListBody(TypedDict):
+    """Тело ответа BuildingsListResponse"""
+    buildings: list[Building]
+    next_cursor: str | None
+
+
+class OrganizationClustersBody(TypedDict):
+    """Тело ответа OrganizationClustersResponse"""
+    clusters: list[OrganizationCluster]
+    cell_size: float
+
+
+class OrganizationsBatchBody(TypedDict):
+    organizations: list[Organization]
+    missing_ids: list[UUID]
+
+
+class BuildingsBatchBody(TypedDict):
+    buildings: list[Building]
+    missing_ids: list[UUID]
+
+
+class ActivitiesBatchBody(TypedDict):
+    activities: list[Activity]
+    missing_ids: list[UUID]
+
+
+# Сериализаторы собираются один раз при импорте. Сущности кодируются в JSON
+# напрямую, без промежуточных моделей ответа и повторной валидации
+_organization = TypeAdapter(Organization)
+_organizations_list = TypeAdapter(OrganizationsListBody)
+_buildings_list = TypeAdapter(BuildingsListBody)
+_organization_clusters = TypeAdapter(OrganizationClustersBody)
+_organizations_batch = TypeAdapter(OrganizationsBatchBody)
+_buildings_batch = TypeAdapter(BuildingsBatchBody)
+_activities_batch = TypeAdapter(ActivitiesBatchBody)
+
+
+def _organization_exclude(include: OrganizationIncludes) -> set[str] | None:
+    """Поля организации, которые не были запрошены и не попадают в ответ"""
+    return {str(field) for field in OrganizationInclude if field not in include} or None
+
+
+def _organizations_exclude(key: str, include: OrganizationIncludes) -> dict | None:
+    fields = _organization_exclude(include)
+    return {key: {"__all__": fields}} if fields else None
+
+
+@timed("serialization_seconds")
+def organization_json(organization: Organization, include: OrganizationIncludes = DEFAULT_INCLUDE) -> bytes:
+    return _organization.dump_json(organization, exclude=_organization_exclude(include))
+
+
+@timed("serialization_seconds")
+def organizations_list_json(
+    organizations: list[Organization], next_cursor: str | None = None, include: OrganizationIncludes = DEFAULT_INCLUDE,
+) -> bytes:
+    return _organizations_list.dump_json(
+        {"organizations": organizations, "next_cursor": next_cursor},
+        exclude=_organizations_exclude("organizations", include),
+    )
+
+
+@timed("serialization_seconds")
+def buildings_list_json(buildings: list[Building], next_cursor: str | None = None) -> bytes:
+    return _buildings_list.dump_json({"buildings": buildings, "next_cursor": next_cursor})
+
+
+@timed("serialization_seconds")
+def organization_clusters_json(clusters: list[OrganizationCluster], cell_size: float) -> bytes:
+    return _organization_clusters.dump_json({"clusters": clusters, "cell_size": cell_size})
+
+
+@timed("serialization_seconds")
+def organizations_batch_json(
+    batch: BatchResult[Organization], include: OrganizationIncludes = DEFAULT_INCLUDE,
+) -> bytes:
+    return _organizations_batch.dump_json(
+        {"organizations": batch.items, "missing_ids": batch.missing_ids},
+        exclude=_organizations_exclude("organizations", include),
+    )
+
+
+@timed("serialization_seconds")
+def buildings_batch_json(batch: BatchResult[Building]) -> bytes:
+    return _buildings_batch.dump_json({"buildings": batch.items, "missing_ids": batch.missing_ids})
+
+
+@timed("serialization_seconds")
+def activities_batch_json(batch: BatchResult[Activity]) -> bytes:
+    return _activities_batch.dump_json({"activities": batch.items, "missing_ids": batch.missing_ids})
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    """Ответ с уже закодированным JSON; response_model маршрута при этом не применяется"""
+    return Response(content=body, status_code=status_code, media_type="application/json")
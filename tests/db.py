@@ -0,0 +1,32 @@
+"""
+Сессия для тестов с БД из настроек (.env)
+Всё, что тест записал (в том числе через commit репозиториев), откатывается;
+без настроек или доступной БД тест пропускается
+"""
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configuration.base import get_settings
+from infrastructure.db.database import Database
+
+
+@asynccontextmanager
+async def rollback_session() -> AsyncIterator[tuple[Database, AsyncSession]]:
+    try:
+        database = Database(get_settings())
+    except Exception as e:
+        pytest.skip(f"Нет настроек БД: {e}")
+    try:
+        async with database.engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                yield database, AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+            finally:
+                await transaction.rollback()
+    except OSError as e:
+        pytest.skip(f"БД недоступна: {e}")
+    finally:
+        await database.dispose()
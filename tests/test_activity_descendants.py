@@ -0,0 +1,44 @@
+"""
+Поддерево вида деятельности, созданного другим процессом после загрузки
+кэша дерева. Нужна БД из настроек (.env); данные откатываются
+"""
+import asyncio
+import uuid
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("asyncpg")
+
+from sqlalchemy import insert  # noqa: E402
+
+from infrastructure.cache.activity_tree import ActivityTree  # noqa: E402
+from infrastructure.cache.response import ResponseCache, InMemoryCacheBackend  # noqa: E402
+from infrastructure.db.models import ActivityModel  # noqa: E402
+from infrastructure.db.types import child_path  # noqa: E402
+from infrastructure.repositories.activities import ActivitiesRepository  # noqa: E402
+from tests.db import rollback_session  # noqa: E402
+
+
+async def _descendants_of_unknown_root() -> tuple[set[uuid.UUID], set[uuid.UUID], list[uuid.UUID]]:
+    async with rollback_session() as (_, session):
+        cache = ResponseCache(backend=InMemoryCacheBackend(max_entries=1), ttl=0, enabled=False)
+        repository = ActivitiesRepository(session, ActivityTree(ttl=3600), cache)
+        # Дерево загружено до появления новых видов деятельности
+        await repository.tree.ensure_loaded(session)
+
+        prefix = f"descendants-{uuid.uuid4().hex}"
+        root_id, leaf_id = uuid.uuid4(), uuid.uuid4()
+        root_path = child_path(None, root_id)
+        await session.execute(insert(ActivityModel.__table__), [
+            {"id": root_id, "name": f"{prefix}-root", "parent_id": None, "path": root_path},
+            {"id": leaf_id, "name": f"{prefix}-leaf", "parent_id": root_id, "path": child_path(root_path, leaf_id)},
+        ])
+        descendants = set(await repository.get_descendant(root_id))
+        return descendants, {root_id, leaf_id}, await repository.get_descendant(uuid.uuid4())
+
+
+def test_unknown_root_reloads_tree():
+    descendants, expected, missing = asyncio.run(_descendants_of_unknown_root())
+    assert descendants == expected
+    assert missing == []
@@ -0,0 +1,88 @@
+"""
+Пакет загрузки, для которого многострочный INSERT превысил бы лимит
+параметров asyncpg (32767). Нужна БД из настроек (.env);
+все данные создаются в транзакции, которая откатывается
+"""
+import asyncio
+import uuid
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("asyncpg")
+
+from sqlalchemy import select, func  # noqa: E402
+
+from domain.entities.bulk_import import (  # noqa: E402
+    ImportKind, ImportReport, BuildingImportRow, ActivityImportRow, OrganizationImportRow,
+)
+from infrastructure.cache.activity_tree import ActivityTree  # noqa: E402
+from infrastructure.cache.response import ResponseCache, InMemoryCacheBackend  # noqa: E402
+from infrastructure.db.models import (  # noqa: E402
+    OrganizationModel, OrganizationPhoneModel, organization_activities,
+)
+from infrastructure.repositories.bulk_import import BulkImportRepository  # noqa: E402
+from tests.db import rollback_session  # noqa: E402
+
+DRIVER_MAX_PARAMETERS = 32767
+# 4 параметра на здание и телефон: оба INSERT одной строкой не поместились бы
+BUILDINGS = 9000
+ORGANIZATIONS = 3000
+PHONES_PER_ORGANIZATION = 3
+
+
+async def _import() -> tuple[list[ImportReport], int, int]:
+    prefix = f"bulk-batch-{uuid.uuid4().hex}"
+    reports = []
+    async with rollback_session() as (_, session):
+        cache = ResponseCache(backend=InMemoryCacheBackend(max_entries=1), ttl=0, enabled=False)
+        repository = BulkImportRepository(session, ActivityTree(ttl=0), cache)
+
+        report = ImportReport(kind=ImportKind.BUILDINGS)
+        await repository.import_buildings([
+            BuildingImportRow(line=i, address=f"{prefix}-{i}", latitude=55.0, longitude=37.0)
+            for i in range(BUILDINGS)
+        ], report)
+        reports.append(report)
+
+        report = ImportReport(kind=ImportKind.ACTIVITIES)
+        await repository.import_activities([ActivityImportRow(line=1, name=prefix, parent_name=None)], report)
+        reports.append(report)
+
+        report = ImportReport(kind=ImportKind.ORGANIZATIONS)
+        await repository.import_organizations([
+            OrganizationImportRow(
+                line=i,
+                name=f"{prefix}-{i}",
+                building_address=f"{prefix}-{i}",
+                phones=[f"+7 (9{j}0) {i:07d}" for j in range(PHONES_PER_ORGANIZATION)],
+                activity_names=[prefix],
+            )
+            for i in range(ORGANIZATIONS)
+        ], report)
+        reports.append(report)
+
+        imported = select(OrganizationModel.id).where(OrganizationModel.name.startswith(prefix))
+        phones = await session.scalar(
+            select(func.count()).select_from(OrganizationPhoneModel)
+            .where(OrganizationPhoneModel.organization_id.in_(imported))
+        )
+        links = await session.scalar(
+            select(func.count()).select_from(organization_activities)
+            .where(organization_activities.c.organization_id.in_(imported))
+        )
+    return reports, phones, links
+
+
+def test_batch_larger_than_driver_parameter_limit():
+    assert BUILDINGS * 4 > DRIVER_MAX_PARAMETERS
+    assert ORGANIZATIONS * PHONES_PER_ORGANIZATION * 4 > DRIVER_MAX_PARAMETERS
+
+    reports, phones, links = asyncio.run(_import())
+
+    buildings, activities, organizations = reports
+    assert (buildings.inserted, buildings.failed) == (BUILDINGS, 0)
+    assert (activities.inserted, activities.failed) == (1, 0)
+    assert (organizations.inserted, organizations.failed) == (ORGANIZATIONS, 0)
+    assert phones == ORGANIZATIONS * PHONES_PER_ORGANIZATION
+    assert links == ORGANIZATIONS
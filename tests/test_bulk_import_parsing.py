@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from domain.entities.bulk_import import ImportFormat  # noqa: E402
+from infrastructure.services.bulk_import import iter_lines, read_records, RowFormatError  # noqa: E402
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _records(data: bytes, fmt: ImportFormat) -> list:
+    async def collect() -> list:
+        return [record async for record in read_records(iter_lines(_chunks(data)), fmt)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_quoted_value_with_newline_is_one_record():
+    data = 'name,address\n"ООО ""Рога""\nи копыта",Москва\nИП,Казань\n'.encode()
+    assert _records(data, ImportFormat.CSV) == [
+        (2, {"name": 'ООО "Рога"\nи копыта', "address": "Москва"}),
+        (4, {"name": "ИП", "address": "Казань"}),
+    ]
+
+
+def test_csv_unclosed_quote_is_row_error():
+    records = _records(b'name,address\n"open,x\n', ImportFormat.CSV)
+    assert len(records) == 1
+    assert records[0][0] == 2 and isinstance(records[0][1], RowFormatError)
+
+
+@pytest.mark.parametrize("fmt, data, lines", [
+    (ImportFormat.NDJSON, b'{"name": "a"}\n\xff\xfe\n{"name": "b"}\n', [1, 2, 3]),
+    (ImportFormat.CSV, b'name\na\n\xff\xfe\nb\n', [2, 3, 4]),
+])
+def test_invalid_utf8_is_row_error(fmt, data, lines):
+    records = _records(data, fmt)
+    assert [line for line, _ in records] == lines
+    assert isinstance(records[1][1], RowFormatError)
+    assert records[2][1] == {"name": "b"}
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+pytest.importorskip("geoalchemy2")
+
+from infrastructure.db.geo import haversine_distance, square_prefilter_circle  # noqa: E402
+
+WORLD = (-90.0, -180.0, 90.0, 180.0)
+# Точки на краях карты, которые терялись при окружности вокруг центра мира
+FAR_POINTS = [(43.1155, 131.8855), (53.0375, 158.6559), (34.0522, -118.2437), (-33.8688, 151.2093)]
+
+
+def test_world_bbox_has_no_prefilter_circle():
+    assert square_prefilter_circle(*WORLD) is None
+
+
+def test_wide_bbox_has_no_prefilter_circle():
+    assert square_prefilter_circle(0.0, -100.0, 10.0, 100.0) is None
+
+
+@pytest.mark.parametrize("point", FAR_POINTS)
+def test_world_bbox_keeps_far_points(point):
+    circle = square_prefilter_circle(*WORLD)
+    if circle is not None:
+        center_lat, center_lon, radius = circle
+        assert haversine_distance(center_lat, center_lon, *point) <= radius
+
+
+def test_prefilter_circle_covers_bbox():
+    rng = random.Random(0)
+    for _ in range(2000):
+        lat_min, lat_max = sorted(rng.uniform(-90, 90) for _ in range(2))
+        lon_min = rng.uniform(-180, 180)
+        lon_max = min(180.0, lon_min + rng.uniform(0, 360))
+        circle = square_prefilter_circle(lat_min, lon_min, lat_max, lon_max)
+        if circle is None:
+            continue
+        center_lat, center_lon, radius = circle
+        for _ in range(20):
+            lat, lon = rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max)
+            assert haversine_distance(center_lat, center_lon, lat, lon) <= radius
@@ -0,0 +1,188 @@
+"""
+Регрессия каскада selectin: число SQL-запросов на выборку организаций, зданий
+и видов деятельности не должно зависеть от их количества. Нужна БД из настроек (.env);
+все данные создаются в транзакции, которая откатывается
+"""
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("asyncpg")
+
+from sqlalchemy import event, insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from domain.entities.organizations import OrganizationInclude, OrganizationFilters, OrganizationSearchMode  # noqa: E402
+from infrastructure.cache.activity_tree import ActivityTree  # noqa: E402
+from infrastructure.cache.response import ResponseCache, InMemoryCacheBackend  # noqa: E402
+from infrastructure.db.models import (  # noqa: E402
+    BuildingModel, ActivityModel, OrganizationModel, OrganizationPhoneModel, organization_activities,
+)
+from infrastructure.db.types import child_path  # noqa: E402
+from infrastructure.repositories.activities import ActivitiesRepository  # noqa: E402
+from infrastructure.repositories.buildings import BuildingsRepository  # noqa: E402
+from infrastructure.repositories.organizations import OrganizationsRepository  # noqa: E402
+from tests.db import rollback_session  # noqa: E402
+
+ALL_INCLUDES = frozenset(OrganizationInclude)
+LATITUDE, LONGITUDE = 55.75, 37.62
+SQUARE = (LATITUDE - 0.01, LONGITUDE - 0.01, LATITUDE + 0.01, LONGITUDE + 0.01)
+# Пачка выгрузки больше тестовой базы: запросы считаются для одной пачки
+STREAM_BATCH_SIZE = 100_000
+
+
+@dataclass
+class Seed:
+    prefix: str
+    building_ids: list[uuid.UUID]
+    root_id: uuid.UUID
+    root_name: str
+    activity_ids: list[uuid.UUID]
+    organization_ids: list[uuid.UUID]
+
+
+@dataclass
+class Repositories:
+    organizations: OrganizationsRepository
+    buildings: BuildingsRepository
+    activities: ActivitiesRepository
+
+
+async def _seed(session: AsyncSession, count: int) -> Seed:
+    """
+    count зданий, видов деятельности (детей одного корня) и организаций;
+    все организации в первом здании, у каждой два телефона, корень и свой вид деятельности
+    """
+    prefix = f"query-count-{uuid.uuid4().hex}"
+    building_ids = [uuid.uuid4() for _ in range(count)]
+    await session.execute(insert(BuildingModel.__table__), [
+        {"id": building_id, "address": f"{prefix}-{i}", "latitude": LATITUDE, "longitude": LONGITUDE}
+        for i, building_id in enumerate(building_ids)
+    ])
+    root_id = uuid.uuid4()
+    root_path = child_path(None, root_id)
+    activity_ids = [uuid.uuid4() for _ in range(count)]
+    await session.execute(insert(ActivityModel.__table__), [
+        {"id": root_id, "name": f"{prefix}-root", "parent_id": None, "path": root_path},
+        *(
+            {"id": activity_id, "name": f"{prefix}-{i}", "parent_id": root_id,
+             "path": child_path(root_path, activity_id)}
+            for i, activity_id in enumerate(activity_ids)
+        ),
+    ])
+    organization_ids = [uuid.uuid4() for _ in range(count)]
+    await session.execute(insert(OrganizationModel.__table__), [
+        {"id": organization_id, "name": f"{prefix}-{i}", "building_id": building_ids[0]}
+        for i, organization_id in enumerate(organization_ids)
+    ])
+    await session.execute(insert(OrganizationPhoneModel.__table__), [
+        {"id": uuid.uuid4(), "organization_id": organization_id, "phone": phone, "phone_e164": phone_e164}
+        for i, organization_id in enumerate(organization_ids)
+        for phone, phone_e164 in (
+            (f"+7 (900) {i:07d}", f"+7900{i:07d}"),
+            (f"+7 (901) {i:07d}", f"+7901{i:07d}"),
+        )
+    ])
+    await session.execute(insert(organization_activities), [
+        {"organization_id": organization_id, "activity_id": activity_id}
+        for organization_id, leaf_id in zip(organization_ids, activity_ids)
+        for activity_id in (root_id, leaf_id)
+    ])
+    return Seed(prefix, building_ids, root_id, f"{prefix}-root", activity_ids, organization_ids)
+
+
+async def _count_statements(count: int, query: Callable[[Repositories, Seed], Awaitable[object]]) -> int:
+    statements = 0
+
+    def on_execute(*args) -> None:
+        nonlocal statements
+        statements += 1
+
+    async with rollback_session() as (database, session):
+        cache = ResponseCache(backend=InMemoryCacheBackend(max_entries=1), ttl=0, enabled=False)
+        activities = ActivitiesRepository(session, ActivityTree(ttl=0), cache)
+        repositories = Repositories(
+            organizations=OrganizationsRepository(session, activities, cache),
+            buildings=BuildingsRepository(session, cache),
+            activities=activities,
+        )
+        seed = await _seed(session, count)
+        event.listen(database.engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            await query(repositories, seed)
+        finally:
+            event.remove(database.engine.sync_engine, "before_cursor_execute", on_execute)
+    return statements
+
+
+async def _stream_all(repos: Repositories, seed: Seed) -> list:
+    return [batch async for batch in repos.organizations.stream_all(STREAM_BATCH_SIZE, include=ALL_INCLUDES)]
+
+
+# Название -> (наибольшее число запросов, выборка). Выборка организаций - запрос
+# организаций и по одному на телефоны, виды деятельности и здания
+QUERIES: dict[str, tuple[int, Callable[[Repositories, Seed], Awaitable[object]]]] = {
+    "organizations.get_by_id": (4, lambda repos, seed: repos.organizations.get_by_id(
+        seed.organization_ids[0], include=ALL_INCLUDES,
+    )),
+    "organizations.get_many": (4, lambda repos, seed: repos.organizations.get_many(
+        seed.organization_ids, include=ALL_INCLUDES,
+    )),
+    "organizations.list_all": (4, lambda repos, seed: repos.organizations.list_all(
+        limit=len(seed.organization_ids), include=ALL_INCLUDES,
+    )),
+    "organizations.list_by_building_id": (4, lambda repos, seed: repos.organizations.list_by_building_id(
+        seed.building_ids[0], limit=len(seed.organization_ids), include=ALL_INCLUDES,
+    )),
+    "organizations.list_by_activity_id": (4, lambda repos, seed: repos.organizations.list_by_activity_id(
+        seed.root_id, limit=len(seed.organization_ids), include=ALL_INCLUDES,
+    )),
+    # Плюс поиск вида деятельности по названию
+    "organizations.list_by_activity_name": (5, lambda repos, seed: repos.organizations.list_by_activity_name(
+        seed.root_name, limit=len(seed.organization_ids), include=ALL_INCLUDES,
+    )),
+    "organizations.list_by_square": (4, lambda repos, seed: repos.organizations.list_by_square(
+        *SQUARE, limit=len(seed.organization_ids), include=ALL_INCLUDES,
+    )),
+    "organizations.search": (4, lambda repos, seed: repos.organizations.search(
+        seed.prefix, OrganizationSearchMode.PREFIX, limit=len(seed.organization_ids), include=ALL_INCLUDES,
+    )),
+    "organizations.query": (4, lambda repos, seed: repos.organizations.query(
+        OrganizationFilters(
+            activity_id=seed.root_id, building_id=seed.building_ids[0], square=SQUARE, name_prefix=seed.prefix,
+        ),
+        limit=len(seed.organization_ids), include=ALL_INCLUDES,
+    )),
+    "organizations.list_nearest": (4, lambda repos, seed: repos.organizations.list_nearest(
+        LATITUDE, LONGITUDE, k=len(seed.organization_ids), activity_id=seed.root_id, include=ALL_INCLUDES,
+    )),
+    "organizations.clusters": (1, lambda repos, seed: repos.organizations.clusters(
+        *SQUARE, cell_size=100.0, top_activities=3,
+    )),
+    "organizations.stream_all": (4, _stream_all),
+    "buildings.get_many": (1, lambda repos, seed: repos.buildings.get_many(seed.building_ids)),
+    "buildings.list_all": (1, lambda repos, seed: repos.buildings.list_all(limit=len(seed.building_ids))),
+    "buildings.list_by_square": (1, lambda repos, seed: repos.buildings.list_by_square(
+        *SQUARE, limit=len(seed.building_ids),
+    )),
+    "buildings.list_by_radius": (1, lambda repos, seed: repos.buildings.list_by_radius(
+        LATITUDE, LONGITUDE, radius=1000.0, limit=len(seed.building_ids),
+    )),
+    "activities.get_many": (1, lambda repos, seed: repos.activities.get_many(seed.activity_ids)),
+    "activities.get_children_list": (1, lambda repos, seed: repos.activities.get_children_list(seed.root_id)),
+    # Кэш дерева с ttl=0 перечитывается одним запросом
+    "activities.get_descendant": (1, lambda repos, seed: repos.activities.get_descendant(seed.root_id)),
+}
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_statements_do_not_grow_with_rows(name: str):
+    max_statements, query = QUERIES[name]
+    few = asyncio.run(_count_statements(2, query))
+    many = asyncio.run(_count_statements(50, query))
+    assert few == many
+    assert many <= max_statements
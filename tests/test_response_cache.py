@@ -0,0 +1,71 @@
+import asyncio
+import uuid
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from infrastructure.cache.response import InMemoryCacheBackend  # noqa: E402
+
+
+def test_counters_are_bounded():
+    backend = InMemoryCacheBackend(max_entries=1, max_counters=10)
+
+    async def touch() -> None:
+        for i in range(1000):
+            await backend.incr(f"generation:tile:22/{i}/0")
+
+    asyncio.run(touch())
+    assert len(backend._counters) == 10
+
+
+def test_evicted_counter_reads_as_bumped():
+    backend = InMemoryCacheBackend(max_entries=1, max_counters=2)
+
+    async def scenario() -> tuple[int, int]:
+        await backend.incr("a")
+        [before] = await backend.counters(["a"])
+        await backend.counters(["b"])
+        await backend.counters(["c"])
+        [after] = await backend.counters(["a"])
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert after > before
+
+
+def test_postgres_counters_are_shared_between_backends():
+    pytest.importorskip("asyncpg")
+    from sqlalchemy import delete
+
+    from configuration.base import get_settings
+    from infrastructure.cache.response import PostgresCacheBackend
+    from infrastructure.db.database import Database
+    from infrastructure.db.models import CacheGenerationModel
+
+    try:
+        database = Database(get_settings())
+    except Exception as e:
+        pytest.skip(f"Нет настроек БД: {e}")
+    key = f"generation:test:{uuid.uuid4().hex}"
+
+    async def scenario() -> tuple[int, int]:
+        # Два бэкенда - как два воркера с общей БД
+        writer = PostgresCacheBackend(database.engine, max_entries=1)
+        reader = PostgresCacheBackend(database.engine, max_entries=1)
+        try:
+            [before] = await reader.counters([key])
+            await writer.incr(key, key)
+            [after] = await reader.counters([key])
+        finally:
+            async with database.engine.begin() as conn:
+                await conn.execute(delete(CacheGenerationModel).where(CacheGenerationModel.key == key))
+            await database.dispose()
+        return before, after
+
+    try:
+        before, after = asyncio.run(scenario())
+    except OSError as e:
+        pytest.skip(f"БД недоступна: {e}")
+    assert (before, after) == (0, 1)